@@ -2,4 +2,15 @@ from django_adobesign.backend import AdobeSignBackend
 
 
 class DemoAdobeSignBackend(AdobeSignBackend):
-    pass
+    def update_signature_state(self, signature, agreement, participant_sets):
+        statuses = {participant_set['id']: participant_set['status']
+                    for participant_set in participant_sets}
+        signers = [signer for signer in signature.signers.all()
+                   if signer.signature_backend_id in statuses]
+        for signer in signers:
+            signer.current_status = statuses[signer.signature_backend_id]
+        signature.signers.model.objects.bulk_update(signers,
+                                                    ['current_status'])
+        if agreement.get('status'):
+            signature.state = agreement['status']
+            signature.save(update_fields=['state'])
@@ -3,7 +3,7 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django_anysign import api as django_anysign
 
-from django_adobesign.client import AdobeSignClient
+from django_adobesign.pool import get_client
 
 
 class SignatureType(django_anysign.SignatureType):
@@ -51,8 +51,10 @@ class SignatureType(django_anysign.SignatureType):
     @property
     def signature_backend_options(self):
         return {
-            'adobesign_client': AdobeSignClient(self.api_root_url,
-                                                self.access_token)
+            'adobesign_client': get_client(self.api_root_url,
+                                           self.access_token,
+                                           rediscover=True),
+            'signing_url_cache': 'default',
         }
 
 
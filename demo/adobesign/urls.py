@@ -30,5 +30,6 @@ urlpatterns = [
     path('signer', views.CreateSigner.as_view(), name='signer'),
     path('sign/<int:pk>', views.Sign.as_view(), name='sign'),
     path('signed/<int:pk>', views.DemoSignerReturnView.as_view(),
-         name='signed')
+         name='signed'),
+    path('webhook', views.DemoWebhookView.as_view(), name='webhook'),
 ]
@@ -1,29 +1,41 @@
 import logging
+import shutil
 
 from adobesign.backend import DemoAdobeSignBackend
 from adobesign.models import Signer
+from django.db.models import Q
 from django.urls import reverse, reverse_lazy
 from django.views.generic import TemplateView, CreateView, UpdateView, \
     RedirectView
 from django.views.generic.detail import SingleObjectMixin
 from time import sleep
 
-from django_adobesign.client import AdobeSignClient, AdobeSignOAuthSession
+from django_adobesign import mirror
+from django_adobesign.client import AdobeSignOAuthSession, \
+    WEBHOOK_EVENTS_SIGNER_ACTIONS
 from django_adobesign.exceptions import AdobeSignException
 from django_adobesign.exceptions import AdobeSignNoMoreSignerException
-from django_adobesign.views import SignerReturnView
+from django_adobesign.hedging import Hedger
+from django_adobesign.pool import get_client
+from django_adobesign.views import SignerReturnView, WebhookView
+from django_adobesign.webhooks import WebhookEventApplier
 from .models import Signature, SignatureType
 
 ADOBESIGN_ACCOUNT_TYPE = 'self'
+SIGNED_STATUSES = ('COMPLETED', 'WAITING_FOR_OTHERS')
+# Signers wait for signing urls: hedge slow lookups
+SIGNING_URL_HEDGER = Hedger(methods=('get_signing_url',))
 
 
 def get_adobesign_backend(signature_type, api_user=None,
                           on_behalf_of_user=None):
-    adobe_client = AdobeSignClient(root_url=signature_type.api_root_url,
-                                   access_token=signature_type.access_token,
-                                   api_user=api_user,
-                                   on_behalf_of_user=on_behalf_of_user)
-    return DemoAdobeSignBackend(adobe_client)
+    adobe_client = get_client(root_url=signature_type.api_root_url,
+                              access_token=signature_type.access_token,
+                              api_user=api_user,
+                              on_behalf_of_user=on_behalf_of_user,
+                              rediscover=True,
+                              hedger=SIGNING_URL_HEDGER)
+    return DemoAdobeSignBackend(adobe_client, signing_url_cache='default')
 
 
 class SettingsCreate(CreateView):
@@ -70,30 +82,30 @@ class HomeView(TemplateView):
         return None, None
 
     def get_signers_status(self, signature_id, signature_type):
+        """Read signers status from the local mirror, which is filled from
+        AdobeSign on first display and then kept fresh by webhooks."""
         signers = []
         if signature_id:
-            backend = get_adobesign_backend(signature_type)
-
-            next_signer_mail, next_signer_url = \
-                self.get_next_signer_with_retry(backend, signature_id,
-                                                nb_try=1, wait=0)
-
-            signers_data = backend.get_all_signers(signature_id)
-            if 'participantSets' in signers_data:
-                for signer_data in signers_data['participantSets']:
-                    if 'name' in signer_data:
-                        name = signer_data['name']
-                    else:
-                        name = signer_data['memberInfos'][0]['name']
-                    email = signer_data['memberInfos'][0]['email']
-                    url = next_signer_url \
-                        if email == next_signer_mail else None
-                    signers.append({'name': name,
-                                    'status': signer_data['status'],
-                                    'order': signer_data['order'],
-                                    'mail': email,
-                                    'url': url})
-            signers.sort(key=lambda x: x['order'])
+            participant_sets = mirror.get_participant_sets(signature_id)
+            if not participant_sets.exists():
+                mirror.refresh_agreement(
+                    get_adobesign_backend(signature_type), signature_id)
+
+            next_signer_mail, next_signer_url = None, None
+            if mirror.get_next_participant_set(signature_id):
+                backend = get_adobesign_backend(signature_type)
+                next_signer_mail, next_signer_url = \
+                    self.get_next_signer_with_retry(backend, signature_id,
+                                                    nb_try=1, wait=0)
+
+            for participant_set in participant_sets:
+                url = next_signer_url \
+                    if participant_set.email == next_signer_mail else None
+                signers.append({'name': participant_set.name,
+                                'status': participant_set.status,
+                                'order': participant_set.order,
+                                'mail': participant_set.email,
+                                'url': url})
         return signers
 
     def get_latest_signature(self, signature_type):
@@ -109,7 +121,8 @@ class HomeView(TemplateView):
             # Just for demo disply
             for signer in latest_signatures[-1]['signers']:
                 db_signer = signature.signers.get(
-                    signing_order=signer['order'], email=signer['mail'])
+                    signing_order=signer['order'],
+                    email__iexact=signer['mail'])
                 signer['current_status'] = db_signer.current_status
                 signer['signature_backend_id'] = db_signer.signature_backend_id
         return latest_signatures
@@ -210,17 +223,23 @@ class Sign(RedirectView, SingleObjectMixin):
         backend = get_adobesign_backend(signature_type)
         backend.create_signature(
             signature=signature,
+            webhook_handler_url=self.request.build_absolute_uri(
+                reverse('webhook')),
+            webhook_events=WEBHOOK_EVENTS_SIGNER_ACTIONS,
+            webhook_options={'include_participants_info': True},
             post_sign_redirect_url=self.request.build_absolute_uri(
                 reverse('signed', kwargs={'pk': signature.pk})))
         return reverse('home')
 
 
 class DemoSignerReturnView(SignerReturnView):
+    spool_signed_document = True
+
     def replace_document(self, signed_document):
         # Replace old document by signed one.
         filename = self.signature.document.name
-        with open(filename, 'wb') as fd:
-            fd.write(signed_document)
+        with signed_document, open(filename, 'wb') as fd:
+            shutil.copyfileobj(signed_document, fd)
 
     def update_signer(self, signer, status, message=''):
         signer.current_status = status
@@ -240,4 +259,31 @@ class DemoSignerReturnView(SignerReturnView):
         return reverse('home')
 
     def has_already_signed(self, signer):
-        return signer.current_status in ('COMPLETED', 'WAITING_FOR_OTHERS')
+        return signer.current_status in SIGNED_STATUSES
+
+    def get_already_signed_filter(self):
+        return Q(current_status__in=SIGNED_STATUSES)
+
+
+class DemoWebhookEventApplier(WebhookEventApplier):
+    signature_update_fields = ['state']
+    signer_update_fields = ['current_status']
+    update_mirror = True
+
+    def set_signature_status(self, signature, status):
+        signature.state = status
+
+    def set_signer_status(self, signer, status):
+        signer.current_status = status
+
+
+class DemoWebhookView(WebhookView):
+    event_applier = DemoWebhookEventApplier()
+    handled_events = WEBHOOK_EVENTS_SIGNER_ACTIONS
+    signing_url_cache = 'default'
+
+    def get_client_id(self):
+        signature_type = SignatureType.objects.last()
+        if signature_type is None or not signature_type.application_id:
+            return super(DemoWebhookView, self).get_client_id()
+        return signature_type.application_id
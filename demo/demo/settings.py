@@ -36,6 +36,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'adobesign',
+    'django_adobesign',
     "sslserver"
 ]
 
@@ -125,7 +126,7 @@ ADOBESIGN_WEB_ROOT_URL = os.environ.get('ADOBESIGN_WEB_ROOT_URL',
 
 ANYSIGN = {
     'BACKENDS': {
-        'adobesign': 'django_adobesign.backend.AdobeSignBackend',
+        'adobesign': 'adobesign.backend.DemoAdobeSignBackend',
     },
     'SIGNATURE_TYPE_MODEL': 'adobesign.models.SignatureType',
     'SIGNATURE_MODEL': 'adobesign.models.Signature',
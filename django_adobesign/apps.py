@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class AdobeSignConfig(AppConfig):
+    default_auto_field = 'django.db.models.AutoField'
+    name = 'django_adobesign'
+    verbose_name = 'AdobeSign'
@@ -0,0 +1,172 @@
+"""Async AdobeSign calls, for ASGI views.
+
+Requires ``httpx``.
+
+"""
+from functools import wraps
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+
+from django_adobesign.client import get_request_attributes
+from django_adobesign.deadline import check_deadline, get_remaining, \
+    get_timeout
+from django_adobesign.exceptions import AdobeSignDeadlineExceeded, \
+    get_adobe_exception
+from django_adobesign.tracing import start_span
+
+
+def handle_adobe_exception(function):
+    @wraps(function)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await function(*args, **kwargs)
+        except httpx.HTTPError as e:
+            raise get_adobe_exception(e)
+
+    return wrapper
+
+
+class AsyncAdobeSignClient(object):
+    """Async counterpart of the lookups of
+    :class:`~django_adobesign.client.AdobeSignClient` used when a signer
+    returns.
+
+    Urls, headers, timeout, ``dispatcher`` and access point rediscovery
+    come from the sync ``client``, calls are traced like sync calls, see
+    :meth:`send`. ``http`` is the ``httpx.AsyncClient`` sending requests,
+    use the async client as an async context manager to create and close
+    one.
+
+    """
+
+    def __init__(self, client, http=None):
+        if httpx is None:
+            raise ImproperlyConfigured('AsyncAdobeSignClient requires httpx')
+        self.client = client
+        self.http = http
+
+    async def __aenter__(self):
+        if self.http is None:
+            self.http = httpx.AsyncClient(timeout=self.client.timeout,
+                                          follow_redirects=True)
+            self._owns_http = True
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if getattr(self, '_owns_http', False):
+            await self.http.aclose()
+            self.http = None
+            self._owns_http = False
+
+    async def send(self, method, url, stream=False, **kwargs):
+        """Async :meth:`AdobeSignClient.send
+        <django_adobesign.client.AdobeSignClient.send>`, within the client
+        ``dispatcher`` quota and deadline, in a tracing span.
+
+        With ``stream``, the response body is not read, close the response
+        with ``aclose()``.
+        """
+        dispatcher = self.client.dispatcher
+        if dispatcher is not None and \
+                not await dispatcher.acquire_async(timeout=get_remaining()):
+            raise AdobeSignDeadlineExceeded(
+                'AdobeSign deadline exceeded waiting for the API quota')
+        kwargs.setdefault('headers', self.client.get_headers())
+        timeout = get_timeout(self.client.timeout)
+        with start_span('http') as span:
+            if span.is_recording():
+                for key, value in get_request_attributes(method, url,
+                                                         kwargs).items():
+                    span.set_attribute('adobesign.' + key, value)
+            request = self.http.build_request(method.upper(), url,
+                                              timeout=timeout, **kwargs)
+            try:
+                response = await self.http.send(request, stream=stream)
+            except httpx.TimeoutException as exception:
+                if timeout == self.client.timeout:
+                    raise
+                raise AdobeSignDeadlineExceeded(
+                    'AdobeSign deadline exceeded waiting for {}'.format(url),
+                    cause=exception)
+            if span.is_recording():
+                span.set_attribute('adobesign.status_code',
+                                   response.status_code)
+                if response.headers.get('Content-Length'):
+                    span.set_attribute(
+                        'adobesign.response_size',
+                        int(response.headers['Content-Length']))
+        if stream and response.status_code >= 400:
+            # Read errors, to check their code
+            await response.aread()
+        self.client.pause_on_rate_limit(response)
+        return response
+
+    async def request(self, method, url, **kwargs):
+        """Async :meth:`AdobeSignClient.request
+        <django_adobesign.client.AdobeSignClient.request>`."""
+        response = await self.send(method, url, **kwargs)
+        if not self.client.needs_rediscovery(response):
+            return response
+        url = await sync_to_async(self.client.rediscover_url,
+                                  thread_sensitive=False)(url)
+        if url is None:
+            return response
+        await response.aclose()
+        return await self.send(method, url, **kwargs)
+
+    async def get_json(self, urlpath):
+        response = await self.request('get', self.client.build_url(urlpath))
+        response.raise_for_status()
+        return response.json()
+
+    @handle_adobe_exception
+    async def get_signer(self, agreement_id, signer_id):
+        """
+        Return the signer with the given signer_id who belongs to the agreement
+        corresponding to the agreement_id.
+        """
+        return await self.get_json('agreements/{}/members/participantSets/{}'
+                                   .format(agreement_id, signer_id))
+
+    @handle_adobe_exception
+    async def get_documents(self, agreement_id):
+        """
+        Return all document ids for a given agreement id
+        """
+        return await self.get_json(
+            'agreements/{}/documents'.format(agreement_id))
+
+    @handle_adobe_exception
+    async def get_document(self, agreement_id, document_id, spool=False):
+        """
+        Download a document
+
+        With ``spool``, return a file object spooled to disk above the
+        client ``spool_threshold`` instead of the document content
+        """
+        url = self.client.build_url('agreements/{}/documents/{}'
+                                    .format(agreement_id, document_id))
+        if not spool:
+            response = await self.request('get', url)
+            response.raise_for_status()
+            return response.content
+        fileobj = self.client.create_spooled_file()
+        response = await self.request('get', url, stream=True)
+        try:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                check_deadline()
+                fileobj.write(chunk)
+        except Exception:
+            fileobj.close()
+            raise
+        finally:
+            await response.aclose()
+        fileobj.seek(0)
+        return fileobj
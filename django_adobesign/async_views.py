@@ -0,0 +1,141 @@
+"""Async views, for ASGI deployments.
+
+Requires Django 3.1 or later and ``httpx``.
+
+"""
+import asyncio
+from functools import update_wrapper
+
+import django
+from django.core.exceptions import ImproperlyConfigured
+
+if django.VERSION < (3, 1):  # pragma: no cover
+    raise ImproperlyConfigured('django_adobesign.async_views requires '
+                               'Django 3.1 or later')
+
+from asgiref.sync import sync_to_async  # noqa: E402
+from django.http import HttpResponseGone, \
+    HttpResponsePermanentRedirect, HttpResponseRedirect  # noqa: E402
+
+from django_adobesign.deadline import deadline  # noqa: E402
+from django_adobesign.exceptions import AdobeSignException  # noqa: E402
+from django_adobesign.tracing import start_span  # noqa: E402
+from django_adobesign.views import SignerReturnView  # noqa: E402
+
+
+class AsyncSignerReturnView(SignerReturnView):
+    """Async :class:`SignerReturnView`, for ASGI deployments.
+
+    Routing is the one of :meth:`get_redirect_url`, see
+    :meth:`get_redirect_url_async`. AdobeSign is called with
+    :class:`~django_adobesign.async_client.AsyncAdobeSignClient` (requires
+    ``httpx``), so waiting signers do not hold a thread: override
+    :meth:`get_signer_status_async` and :meth:`get_signed_document_async`
+    to change these lookups. Database accesses and the sync hooks
+    (:meth:`update_signer`, :meth:`get_signer_signed_url`...) run with
+    ``sync_to_async``.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super(AsyncSignerReturnView, cls).as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        # Django calls coroutine functions on the event loop
+        update_wrapper(async_view, view)
+        async_view.view_class = view.view_class
+        async_view.view_initkwargs = view.view_initkwargs
+        return async_view
+
+    async def dispatch(self, request, *args, **kwargs):
+        response = super(AsyncSignerReturnView, self).dispatch(
+            request, *args, **kwargs)
+        if asyncio.iscoroutine(response):
+            response = await response
+        return response
+
+    async def get(self, request, *args, **kwargs):
+        with deadline(self.deadline):
+            url = await self.get_redirect_url_async(*args, **kwargs)
+        if url is None:
+            return HttpResponseGone()
+        if self.permanent:
+            return HttpResponsePermanentRedirect(url)
+        return HttpResponseRedirect(url)
+
+    def get_async_client(self):
+        """Return the async client of :attr:`backend`."""
+        from django_adobesign.async_client import AsyncAdobeSignClient
+
+        client = self.backend.adobesign_client
+        # Resolve the access point out of the event loop
+        client.root_url
+        return AsyncAdobeSignClient(client)
+
+    async def get_redirect_url_async(self, *args, **kwargs):
+        """Async :meth:`get_redirect_url`."""
+        client = await sync_to_async(self.get_async_client)()
+        async with client:
+            self.async_client = client
+            signer = await sync_to_async(self.get_current_signer)()
+            if not signer:
+                return await sync_to_async(self.get_signer_error_url)(
+                    'No more signer')
+            status = await self.get_signer_status_async(signer)
+            if status == 'WAITING_FOR_MY_SIGNATURE':
+                return await sync_to_async(self.get_signer_error_url)(
+                    'User mismatch')
+            if status == 'CANCELLED':
+                await sync_to_async(self.next_signer_changed)(status)
+                await sync_to_async(self.signer_cancelled)(signer, status)
+                return await sync_to_async(self.get_signer_canceled_url)(
+                    status)
+
+            if status == 'COMPLETED':
+                if not await sync_to_async(self.backend.is_last_signer)(
+                        signer):
+                    raise AdobeSignException(
+                        'Consistency issue, agreement {} is complete, '
+                        'remaining signers have been found'.format(
+                            self.signature.signature_backend_id))
+                await sync_to_async(self.next_signer_changed)(status)
+                await self.signer_signed_async(status, signer)
+                await sync_to_async(self.update_signature)(status)
+                return await sync_to_async(self.get_signer_signed_url)(
+                    status)
+            if status == 'WAITING_FOR_OTHERS':
+                await sync_to_async(self.next_signer_changed)(status)
+                await self.signer_signed_async(status, signer)
+                return await sync_to_async(self.get_signer_signed_url)(
+                    status)
+
+            await sync_to_async(self.update_signer)(signer, status)
+            return await sync_to_async(self.get_signer_error_url)()
+
+    async def get_signer_status_async(self, signer):
+        """Return the AdobeSign status of ``signer``."""
+        agreement_id = self.signature.signature_backend_id
+        with start_span('get_signer_status', agreement_id=agreement_id):
+            adobe_signer = await self.async_client.get_signer(
+                agreement_id, signer.signature_backend_id)
+        return adobe_signer.get('status')
+
+    async def get_signed_document_async(self):
+        """Async :meth:`get_signed_document`."""
+        agreement_id = self.signature.signature_backend_id
+        documents = await self.async_client.get_documents(agreement_id)
+        # In our model, there is only one doc.
+        return await self.async_client.get_document(
+            agreement_id, documents['documents'][0]['id'],
+            spool=self.spool_signed_document)
+
+    async def signer_signed_async(self, status, signer):
+        """Async :meth:`signer_signed`, downloading the signed document with
+        :meth:`get_signed_document_async` unless it is deferred."""
+        if self.defer_signed_document:
+            return await sync_to_async(self.signer_signed)(status, signer)
+        signed_document = await self.get_signed_document_async()
+        await sync_to_async(self.save_signed_document)(signed_document,
+                                                       status, signer)
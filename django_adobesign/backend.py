@@ -1,15 +1,65 @@
+import csv
+import hashlib
+import io
+import logging
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.core.cache import caches
+from django.db import router, transaction
+from django.db.models import Q
+from django.utils import timezone
 from django_anysign import api as django_anysign
 
+from django_adobesign.concurrency import map_in_threads, \
+    run_in_background, run_later
+from django_adobesign.deadline import bounded
+from django_adobesign.dispatch import BACKGROUND, priority
+from django_adobesign.events import agreement_event_store
+from django_adobesign.exceptions import AdobeSignException, \
+    AdobeSignNoMoreSignerException
+from django_adobesign.ratelimit import call_with_rate_limit
+from django_adobesign.tracing import set_span_attribute, traced
+
+logger = logging.getLogger(__name__)
+
+
+def get_signing_url_cache_key(agreement_id):
+    """Return the cache key of the next signer url of ``agreement_id``."""
+    return 'adobesign:signing_url:{}'.format(agreement_id)
+
 
 class AdobeSignBackend(django_anysign.SignatureBackend):
+    #: Seconds after which the claim of a crashed signature creation
+    #: expires, see :meth:`claim_creation_progress`.
+    creation_claim_timeout = 600
+
     def __init__(self, adobesign_client, name='AdobeSign', code='adobesign',
-                 url_namespace='anysign'):
+                 url_namespace='anysign', event_store=None,
+                 signing_url_cache=None, signing_url_timeout=120,
+                 deadline=None):
         """Setup.
 
         Additional keyword arguments are passed to
         :class:`~django_adobesign.client.AdobeSignCient` constructor, in order
         to setup :attr:`adobesign client`.
 
+        ``event_store`` is the
+        :class:`~django_adobesign.events.AgreementEventStore` caching
+        agreement events, the store shared by the process by default.
+
+        ``signing_url_cache`` is the alias of the Django cache keeping next
+        signer urls for ``signing_url_timeout`` seconds, see
+        :meth:`prefetch_next_signer_url`. Urls are not cached by default.
+
+        ``deadline`` is the time budget, in seconds, of interactive
+        operations such as :meth:`create_signature`: their AdobeSign calls
+        share it, see :mod:`django_adobesign.deadline`.
+
         """
         super(AdobeSignBackend, self).__init__(
             name=name,
@@ -17,6 +67,11 @@ class AdobeSignBackend(django_anysign.SignatureBackend):
             url_namespace=url_namespace,
         )
         self.adobesign_client = adobesign_client
+        self.event_store = event_store or agreement_event_store
+        self.signing_url_cache = caches[signing_url_cache] \
+            if signing_url_cache else None
+        self.signing_url_timeout = signing_url_timeout
+        self.deadline = deadline
 
     def get_adobesign_participants(self, signature):
         """Return list of AdobeSign's Signers for Signature instance.
@@ -35,47 +90,363 @@ class AdobeSignBackend(django_anysign.SignatureBackend):
             jsonified_signers.append(signer)
         return jsonified_signers
 
+    @traced
+    @bounded
     def create_signature(self, signature, webhook_handler_url,
                          post_sign_redirect_url=None,
                          post_sign_redirect_delay=0, send_mail=True,
-                         **extra_data):
+                         webhook_events=None, webhook_options=None,
+                         template_key=None, **extra_data):
         """Register ``signature`` in AdobeSign service, return updated object.
         This method calls ``save()`` on ``signature`` and ``signer``.
 
+        ``webhook_events`` is the list of events the agreement webhook
+        subscribes to, all events by default. ``webhook_options`` are passed
+        to
+        :meth:`~django_adobesign.client.AdobeSignClient.post_webhooks`,
+        e.g. ``{'include_participants_info': True}``.
+
+        With ``template_key``, the document is a recurring template: it is
+        uploaded once as a library document, see
+        :meth:`get_library_document_id`.
+
+        With ``django_adobesign`` in ``INSTALLED_APPS``, completed steps are
+        recorded (see :meth:`get_creation_progress`): after a failure, a
+        retry resumes from the last completed step instead of creating
+        another agreement, and calling again once the signature is created
+        does nothing. Concurrent calls for the same signature fail with
+        :class:`~django_adobesign.exceptions.AdobeSignException`, see
+        :meth:`claim_creation_progress`. Progress rolled back with a failed
+        transaction would be lost, so it is not recorded when called in an
+        atomic block (e.g. with ``ATOMIC_REQUESTS``): a retry then creates
+        another agreement.
+
         """
-        document = next(signature.signature_documents())
+        progress = self.get_creation_progress(signature)
+        self.claim_creation_progress(progress)
+        try:
+            return self._create_signature(
+                signature, progress, webhook_handler_url,
+                post_sign_redirect_url=post_sign_redirect_url,
+                post_sign_redirect_delay=post_sign_redirect_delay,
+                send_mail=send_mail, webhook_events=webhook_events,
+                webhook_options=webhook_options, template_key=template_key,
+                **extra_data)
+        finally:
+            self.release_creation_progress(progress)
 
-        # Upload document
-        response = self.adobesign_client.upload_document(document)
-        transient_document_id = response.get('transientDocumentId')
-        result = self.adobesign_client.post_agreement(
-            transient_document_id=transient_document_id,
-            name=str(signature),
-            participants=self.get_adobesign_participants(signature),
-            post_sign_redirect_url=post_sign_redirect_url,
-            post_sign_redirect_delay=post_sign_redirect_delay,
-            send_mail=send_mail,
-            **extra_data)
+    def _create_signature(self, signature, progress, webhook_handler_url,
+                          post_sign_redirect_url, post_sign_redirect_delay,
+                          send_mail, webhook_events, webhook_options,
+                          template_key, **extra_data):
+        if progress.webhook_posted:
+            if progress.agreement_id == signature.signature_backend_id:
+                return signature
+            # The signature is sent again
+            progress.transient_document_id = progress.agreement_id = ''
+            progress.signers_mapped = progress.webhook_posted = False
+
+        if not progress.agreement_id:
+            document = next(signature.signature_documents())
+            library_document_id = None
+            if template_key:
+                library_document_id = self.get_library_document_id(
+                    template_key, document, name=str(signature))
+            elif not progress.transient_document_id:
+                # Upload document
+                response = self.adobesign_client.upload_document(document)
+                progress.transient_document_id = response.get(
+                    'transientDocumentId')
+                self.save_creation_progress(progress)
+            result = self.adobesign_client.post_agreement(
+                transient_document_id=progress.transient_document_id or None,
+                library_document_id=library_document_id,
+                name=str(signature),
+                participants=self.get_adobesign_participants(signature),
+                post_sign_redirect_url=post_sign_redirect_url,
+                post_sign_redirect_delay=post_sign_redirect_delay,
+                send_mail=send_mail,
+                **extra_data)
+            progress.agreement_id = result['id']
+            self.save_creation_progress(progress)
 
         # Update signature instance with record_id
-        signature.signature_backend_id = result['id']
-        signature.save(update_fields=['signature_backend_id'])
+        set_span_attribute('agreement_id', progress.agreement_id)
+        if signature.signature_backend_id != progress.agreement_id:
+            signature.signature_backend_id = progress.agreement_id
+            signature.save(update_fields=['signature_backend_id'])
 
-        # Update signers instance with external id
-        self.map_adobe_signer_to_signer(signature)
+        if not progress.signers_mapped:
+            # Update signers instance with external id
+            self.map_adobe_signer_to_signer(signature)
+            progress.signers_mapped = True
+            self.save_creation_progress(progress)
 
         # Create webhook for the new agreement
+        webhook_options = dict(webhook_options or {})
+        if webhook_events is not None:
+            webhook_options['events'] = webhook_events
         self.adobesign_client.post_webhooks(
             agreement_id=signature.signature_backend_id,
             webhook_handler_url=webhook_handler_url,
+            **webhook_options
         )
+        progress.webhook_posted = True
+        self.save_creation_progress(progress)
+        self.prefetch_next_signer_url(signature.signature_backend_id)
         return signature
 
-    def map_adobe_signer_to_signer(self, signature):
+    def get_creation_progress(self, signature):
+        """Return the recorded progress of :meth:`create_signature` for
+        ``signature``, a
+        :class:`~django_adobesign.models.SignatureCreation`.
+
+        Without ``django_adobesign`` in ``INSTALLED_APPS``, or in an atomic
+        block, progress is not persisted.
+
+        """
+        unsaved_progress = SimpleNamespace(
+            pk=None, transient_document_id='', agreement_id='',
+            signers_mapped=False, webhook_posted=False)
+        if not apps.is_installed('django_adobesign'):
+            return unsaved_progress
+        from django_adobesign.models import SignatureCreation
+
+        using = router.db_for_write(SignatureCreation)
+        if transaction.get_connection(using).in_atomic_block:
+            logger.warning('Creation progress of %s is not recorded in an '
+                           'atomic block', signature)
+            return unsaved_progress
+
+        signature_key = '{}:{}'.format(signature._meta.label_lower,
+                                       signature.pk)
+        progress, _ = SignatureCreation.objects.get_or_create(
+            signature_key=signature_key)
+        return progress
+
+    def claim_creation_progress(self, progress):
+        """Mark ``progress`` as in progress and reload it, so that another
+        call does not create a second agreement for the same signature.
+
+        Raise :class:`~django_adobesign.exceptions.AdobeSignException` when
+        the creation is already in progress. Claims older than
+        :attr:`creation_claim_timeout` are taken over.
+
+        """
+        if progress.pk is None:
+            return
+        now = timezone.now()
+        expired_at = now - timedelta(seconds=self.creation_claim_timeout)
+        claimed = type(progress).objects.filter(
+            Q(claimed_at__isnull=True) | Q(claimed_at__lt=expired_at),
+            pk=progress.pk,
+        ).update(claimed_at=now)
+        if not claimed:
+            raise AdobeSignException(
+                'Creation of {} is already in progress'.format(progress))
+        progress.refresh_from_db()
+
+    def release_creation_progress(self, progress):
+        if progress.pk is not None:
+            type(progress).objects.filter(
+                pk=progress.pk, claimed_at=progress.claimed_at,
+            ).update(claimed_at=None)
+
+    def save_creation_progress(self, progress):
+        if progress.pk is not None:
+            progress.save()
+
+    def get_document_checksum(self, document):
+        """Return SHA-256 of ``document`` content."""
+        checksum = hashlib.sha256()
+        content = document.bytes
+        if hasattr(content, 'read'):
+            content.seek(0)
+            for chunk in iter(lambda: content.read(64 * 1024), b''):
+                checksum.update(chunk)
+            content.seek(0)
+        else:
+            checksum.update(content)
+        return checksum.hexdigest()
+
+    def get_library_account(self):
+        """Return the account and user the library documents of
+        :attr:`adobesign client` belong to."""
+        user = self.adobesign_client.get_current_user()
+        return '{}:{}'.format(user['accountId'], user['id'])
+
+    @traced
+    @bounded
+    def get_library_document_id(self, template_key, document, name=None,
+                                checksum=None, refresh=False, account=None):
+        """Return the library document id of template ``template_key``.
+
+        The library document is created from ``document`` the first time,
+        and created again when ``document`` content changed (``checksum``
+        defaults to SHA-256 of the content) or with ``refresh``. Mapping is
+        stored in :class:`~django_adobesign.models.LibraryDocument`, which
+        requires ``django_adobesign`` in ``INSTALLED_APPS``, per
+        ``account`` (defaults to :meth:`get_library_account`).
+
+        """
+        from django_adobesign.models import LibraryDocument
+
+        if checksum is None:
+            checksum = self.get_document_checksum(document)
+        if account is None:
+            account = self.get_library_account()
+        library_document = LibraryDocument.objects.filter(
+            account=account, template_key=template_key).first()
+        if library_document and not refresh and \
+                library_document.checksum == checksum:
+            return library_document.library_document_id
+
+        response = self.adobesign_client.upload_document(document)
+        result = self.adobesign_client.post_library_document(
+            transient_document_id=response.get('transientDocumentId'),
+            name=name or template_key)
+        LibraryDocument.objects.update_or_create(
+            account=account, template_key=template_key,
+            defaults={'library_document_id': result['id'],
+                      'checksum': checksum,
+                      'refreshed_at': timezone.now()})
+        return result['id']
+
+    @traced
+    @priority(BACKGROUND)
+    def create_mega_signature(self, signatures, name, send_mail=True,
+                              max_workers=4, **extra_data):
+        """Send one document to many recipients with a single MegaSign.
+
+        ``signatures`` share the same document and have exactly one signer
+        each. The document and the recipients list are uploaded once, then
+        child agreements are mapped back to ``signatures`` and their signers
+        (see :meth:`map_mega_sign_agreements`). Return the MegaSign id.
+        Calls are made with background priority.
+
+        """
+        signatures = list(signatures)
+        signers = self.get_mega_sign_signers(signatures)
+        document = next(signatures[0].signature_documents())
+        response = self.adobesign_client.upload_document(document)
+        transient_document_id = response.get('transientDocumentId')
+
+        recipients = io.StringIO()
+        writer = csv.writer(recipients)
+        writer.writerow(['email'])
+        for signature in signatures:
+            writer.writerow([signers[signature.pk].email])
+        recipients_file = io.BytesIO(recipients.getvalue().encode('utf-8'))
+        recipients_file.name = 'recipients.csv'
+        recipients_file.bytes = recipients_file.getvalue()
+        response = self.adobesign_client.upload_document(
+            recipients_file, mime_type='text/csv')
+
+        result = self.adobesign_client.post_mega_sign(
+            transient_document_id=transient_document_id,
+            name=name,
+            recipients_transient_document_id=response.get(
+                'transientDocumentId'),
+            send_mail=send_mail,
+            **extra_data)
+        self.map_mega_sign_agreements(result['id'], signatures,
+                                      max_workers=max_workers)
+        return result['id']
+
+    def get_mega_sign_signers(self, signatures):
+        """Return the signer of each signature, by signature pk.
+
+        Raise :class:`AdobeSignException` when a signature does not have
+        exactly one signer.
+        """
+        signers = defaultdict(list)
+        for signer in django_anysign.get_signer_model().objects.filter(
+                signature__in=signatures):
+            signers[signer.signature_id].append(signer)
+        for signature in signatures:
+            count = len(signers.get(signature.pk, []))
+            if count != 1:
+                raise AdobeSignException(
+                    'MegaSign signature {} has {} signers instead of '
+                    'one'.format(signature.pk, count))
+        return {signature_id: signature_signers[0]
+                for signature_id, signature_signers in signers.items()}
+
+    @traced
+    @priority(BACKGROUND)
+    def map_mega_sign_agreements(self, mega_sign_id, signatures,
+                                 max_workers=4):
+        """Set child agreement ids of MegaSign ``mega_sign_id`` on
+        ``signatures``, and participant set ids on their signers, with bulk
+        updates. Return the number of mapped signatures.
+
+        Child agreements are created asynchronously by AdobeSign: call it
+        again later for signatures left without ``signature_backend_id``.
+
+        """
+        child_agreements = []
+        cursor = None
+        while True:
+            page = self.adobesign_client.get_mega_sign_agreements(
+                mega_sign_id, cursor=cursor)
+            child_agreements.extend(page.get('agreementList', []))
+            cursor = page.get('page', {}).get('nextCursor')
+            if not cursor:
+                break
+
+        def get_participant_set(child_agreement):
+            members = self.get_all_signers(child_agreement['id'])
+            return child_agreement['id'], members['participantSets'][0]
+
+        # Several signatures may share a recipient: map them in order
+        signers = self.get_mega_sign_signers(signatures)
+        pending = defaultdict(deque)
+        for signature in signatures:
+            if not signature.signature_backend_id:
+                signer = signers[signature.pk]
+                pending[signer.email.lower()].append((signature, signer))
+        if not pending:
+            return 0
+        mapped_ids = {signature.signature_backend_id
+                      for signature in signatures}
+        updated_signatures = []
+        updated_signers = []
+        for agreement_id, participant_set in map_in_threads(
+                get_participant_set,
+                [child_agreement for child_agreement in child_agreements
+                 if child_agreement['id'] not in mapped_ids],
+                max_workers):
+            email = participant_set['memberInfos'][0]['email'].lower()
+            if not pending[email]:
+                continue
+            signature, signer = pending[email].popleft()
+            signature.signature_backend_id = agreement_id
+            signer.signature_backend_id = participant_set['id']
+            updated_signatures.append(signature)
+            updated_signers.append(signer)
+
+        with transaction.atomic():
+            django_anysign.get_signature_model().objects.bulk_update(
+                updated_signatures, ['signature_backend_id'])
+            django_anysign.get_signer_model().objects.bulk_update(
+                updated_signers, ['signature_backend_id'])
+        return len(updated_signatures)
+
+    @traced
+    @bounded
+    def map_adobe_signer_to_signer(self, signature, participant_sets=None):
+        """Set AdobeSign participant set id on signers of ``signature``.
+
+        ``participant_sets`` may be given, e.g. from a webhook payload,
+        otherwise they are fetched from AdobeSign.
+
+        """
+        if participant_sets is None:
+            participant_sets = self.get_all_signers(
+                signature.signature_backend_id).get('participantSets', [])
         signers = {(signer.email.lower(), signer.signing_order): signer
                    for signer in signature.signers.all()}
-        for adobe_signer in self.get_all_signers(
-                signature.signature_backend_id).get('participantSets', []):
+        for adobe_signer in participant_sets:
             # retrieve the right adobe signer by email and order values
             # Can raise a KeyError if signer does not exist
             signer = signers[
@@ -84,6 +455,8 @@ class AdobeSignBackend(django_anysign.SignatureBackend):
             signer.signature_backend_id = adobe_signer['id']
             signer.save(update_fields=['signature_backend_id'])
 
+    @traced
+    @bounded
     def get_agreements(self, page_size=20, cursor=None, **extra_params):
         """
             Return all agreements associated to the given access token
@@ -104,30 +477,94 @@ class AdobeSignBackend(django_anysign.SignatureBackend):
                                                           **extra_params)
         return agreements or {'userAgreementList': [], 'page': {}}
 
+    @traced
+    @bounded
     def get_next_signers(self, agreement_id):
         """ Return the next signer list."""
         members = self.adobesign_client. \
             get_members(agreement_id, include_next_participant_set=True)
         return members.get('nextParticipantSets', [])
 
+    @traced
+    @bounded
     def get_next_signer_urls(self, agreement_id):
         """
             Return an array of urls for current signer set
         """
         return self.adobesign_client.get_signing_url(agreement_id)
 
+    @traced
+    @bounded
     def get_next_signer_url(self, agreement_id):
         """
             Return the first next signer url and mail if exists
+
+            With a ``signing_url_cache``, the url is served from the cache
         """
+        cache_key = self.get_signing_url_cache_key(agreement_id)
+        if self.signing_url_cache is not None:
+            cached = self.signing_url_cache.get(cache_key)
+            if cached:
+                return tuple(cached)
         next_signers_url = self.get_next_signer_urls(agreement_id)
         if 'signingUrlSetInfos' in next_signers_url:
             set_infos = next_signers_url['signingUrlSetInfos']
             if set_infos and set_infos[0]['signingUrls']:
-                return set_infos[0]['signingUrls'][0]['email'], \
-                       set_infos[0]['signingUrls'][0]['esignUrl']
+                next_signer_url = (set_infos[0]['signingUrls'][0]['email'],
+                                   set_infos[0]['signingUrls'][0]['esignUrl'])
+                if self.signing_url_cache is not None:
+                    self.signing_url_cache.set(cache_key, next_signer_url,
+                                               self.signing_url_timeout)
+                return next_signer_url
         return None, None
 
+    def get_signing_url_cache_key(self, agreement_id):
+        return get_signing_url_cache_key(agreement_id)
+
+    def invalidate_next_signer_url(self, agreement_id):
+        """Remove the cached next signer url of ``agreement_id``."""
+        if self.signing_url_cache is not None:
+            self.signing_url_cache.delete(
+                self.get_signing_url_cache_key(agreement_id))
+
+    def prefetch_next_signer_url(self, agreement_id, attempts=5, delay=1.):
+        """Cache the next signer url of ``agreement_id`` in the background,
+        return a future of ``(email, url)``, or ``None`` without
+        ``signing_url_cache``.
+
+        Right after creation or after a signer completed, AdobeSign may not
+        know the agreement or the next url yet: the lookup is tried
+        ``attempts`` times, waiting ``delay`` seconds, doubled after each
+        attempt, without holding a background worker. It stops when there
+        is no more signer.
+
+        """
+        if self.signing_url_cache is None:
+            return None
+        self.invalidate_next_signer_url(agreement_id)
+        result = Future()
+
+        def prefetch(attempt):
+            last = attempt == attempts - 1
+            try:
+                email, url = self.get_next_signer_url(agreement_id)
+            except AdobeSignNoMoreSignerException:
+                email, url, last = None, None, True
+            except Exception as exception:
+                if last or not isinstance(exception, AdobeSignException):
+                    result.set_exception(exception)
+                    return
+                email, url = None, None
+            if url or last:
+                result.set_result((email, url))
+            else:
+                run_later(delay * 2 ** attempt, prefetch, attempt + 1)
+
+        run_in_background(prefetch, 0)
+        return result
+
+    @traced
+    @bounded
     def get_all_signers(self, agreement_id):
         """
             Return the list of all signers info
@@ -135,11 +572,47 @@ class AdobeSignBackend(django_anysign.SignatureBackend):
         return self.adobesign_client. \
             get_members(agreement_id, include_next_participant_set=False)
 
-    def get_signer(self, argeement_id, signer_id):
-        return self.adobesign_client.get_signer(argeement_id, signer_id)
+    @traced
+    @bounded
+    def refresh_signature(self, signature):
+        """Fetch the state of ``signature`` from AdobeSign and record it.
 
-    def get_signer_status(self, argeement_id, signer_id):
-        signer = self.get_signer(argeement_id, signer_id)
+        The local mirror is updated, then :meth:`update_signature_state`.
+        Requires ``django_adobesign`` in ``INSTALLED_APPS``.
+
+        """
+        from django_adobesign import mirror
+
+        agreement_id = signature.signature_backend_id
+        set_span_attribute('agreement_id', agreement_id)
+        agreement = self.adobesign_client.get_agreement(agreement_id)
+        members = self.get_all_signers(agreement_id)
+        mirror.update_from_members(agreement_id, members,
+                                   name=agreement.get('name', ''),
+                                   status=agreement.get('status', ''))
+        self.update_signature_state(signature, agreement,
+                                    members.get('participantSets', []))
+
+    def update_signature_state(self, signature, agreement, participant_sets):
+        """Record ``agreement`` status and ``participant_sets`` in
+        ``signature`` and its signers, see :meth:`refresh_signature`.
+
+        Signature and signer models are defined by the project: this
+        method is required by :meth:`refresh_signature` and the
+        ``adobesign_backfill`` command.
+
+        """
+        raise NotImplementedError()
+
+    @traced
+    @bounded
+    def get_signer(self, agreement_id, signer_id):
+        return self.adobesign_client.get_signer(agreement_id, signer_id)
+
+    @traced
+    @bounded
+    def get_signer_status(self, agreement_id, signer_id):
+        signer = self.get_signer(agreement_id, signer_id)
         return signer.get('status')
 
     def is_last_signer(self, signer):
@@ -149,18 +622,192 @@ class AdobeSignBackend(django_anysign.SignatureBackend):
         return not signer.signature.signers.filter(
             signing_order__gt=signer.signing_order).exists()
 
-    def get_documents(self, agreement_id):
+    def get_documents(self, agreement_id, spool=False):
+        """Yield documents of ``agreement_id``.
+
+        With ``spool``, documents are file objects spooled to disk above
+        the client ``spool_threshold``, see
+        :meth:`~django_adobesign.client.AdobeSignClient.get_document`.
+
+        """
         documents_info = self.adobesign_client.get_documents(agreement_id)
         for doc_info in documents_info.get('documents', []):
             yield self.adobesign_client.get_document(agreement_id,
-                                                     doc_info['id'])
+                                                     doc_info['id'],
+                                                     spool=spool)
+
+    @traced
+    @bounded
+    def get_documents_concurrently(self, agreement_id, max_workers=4,
+                                   open_file=None, spool=False):
+        """Return all documents of ``agreement_id``, in order, downloaded
+        over at most ``max_workers`` threads.
+
+        Documents content is returned, unless ``open_file`` is given: then
+        each document is streamed to the file object returned by
+        ``open_file(document_info)`` and these file objects are returned.
+        With ``spool``, documents are returned as spooled file objects.
+
+        """
+        documents_info = self.adobesign_client.get_documents(agreement_id)
+
+        def download(doc_info):
+            if open_file is None:
+                return self.adobesign_client.get_document(
+                    agreement_id, doc_info['id'], spool=spool)
+            fileobj = open_file(doc_info)
+            self.adobesign_client.download_document(agreement_id,
+                                                    doc_info['id'], fileobj)
+            return fileobj
+
+        return map_in_threads(download, documents_info.get('documents', []),
+                              max_workers)
+
+    @traced
+    @bounded
+    def get_agreement_snapshot(self, agreement_id, max_workers=4):
+        """Return members, signing urls, events and documents info of
+        ``agreement_id``, fetched concurrently.
+
+        The result also has ``errors``, the :class:`AdobeSignException`
+        raised by failed calls (their value is ``None``), and ``timings``,
+        the duration of each call in seconds::
+
+            {'agreement_id': ..., 'members': {...}, 'signing_urls': {...},
+             'events': [...], 'documents': [...],
+             'errors': {'signing_urls': AdobeSignNoMoreSignerException()},
+             'timings': {'members': 0.12, ...}}
+
+        """
+        calls = (
+            ('members', lambda: self.adobesign_client.get_members(
+                agreement_id, include_next_participant_set=True)),
+            ('signing_urls', lambda: self.get_next_signer_urls(
+                agreement_id)),
+            ('events', lambda: self.get_events(agreement_id)),
+            ('documents', lambda: self.adobesign_client.get_documents(
+                agreement_id).get('documents', [])),
+        )
+
+        def call(item):
+            name, function = item
+            start = time.perf_counter()
+            try:
+                result, error = function(), None
+            except AdobeSignException as exception:
+                result, error = None, exception
+            return name, result, error, time.perf_counter() - start
+
+        snapshot = {'agreement_id': agreement_id, 'errors': {},
+                    'timings': {}}
+        for name, result, error, duration in map_in_threads(
+                call, calls, max_workers):
+            snapshot[name] = result
+            snapshot['timings'][name] = duration
+            if error is not None:
+                snapshot['errors'][name] = error
+        return snapshot
+
+    @traced
+    @priority(BACKGROUND)
+    def map_agreements(self, function, agreement_ids, tokens=1,
+                       max_workers=4, rate_limiter=None):
+        """Call ``function(agreement_id)`` for each of ``agreement_ids``,
+        over at most ``max_workers`` threads.
+
+        ``rate_limiter`` is a
+        :class:`~django_adobesign.ratelimit.RateLimiter` shared by the bulk
+        operations of the account, ``function`` making ``tokens`` calls
+        (see :func:`~django_adobesign.ratelimit.call_with_rate_limit`).
+        Without it, calls are only paced by the client ``dispatcher``.
+
+        A failed agreement does not stop the others, the result has the
+        return value of each succeeded agreement and the exception of each
+        failed one::
+
+            {'results': {'agreement_id1': ...},
+             'errors': {'agreement_id2': AdobeSignException()}}
+
+        """
+        def call(agreement_id):
+            try:
+                if rate_limiter is None:
+                    return function(agreement_id), None
+                return call_with_rate_limit(rate_limiter, function,
+                                            agreement_id, tokens=tokens), None
+            except Exception as exception:
+                return None, exception
+
+        agreement_ids = list(agreement_ids)
+        outcome = {'results': {}, 'errors': {}}
+        for agreement_id, (result, error) in zip(
+                agreement_ids,
+                map_in_threads(call, agreement_ids, max_workers)):
+            if error is None:
+                outcome['results'][agreement_id] = result
+            else:
+                outcome['errors'][agreement_id] = error
+        return outcome
+
+    def update_agreements_state(self, agreement_ids, state, comment=None,
+                                notify_others=True, **kwargs):
+        """Transition ``agreement_ids`` to ``state``, e.g. ``CANCELLED``,
+        see :meth:`map_agreements` for ``kwargs`` and the result."""
+        def update_state(agreement_id):
+            self.adobesign_client.update_agreement_state(
+                agreement_id, state, comment=comment,
+                notify_others=notify_others)
+
+        return self.map_agreements(update_state, agreement_ids, **kwargs)
+
+    def get_reminder_participant_ids(self, agreement_id):
+        """Return the ids of the members who have to act on
+        ``agreement_id``."""
+        members = self.adobesign_client.get_members(
+            agreement_id, include_next_participant_set=False)
+        return [member_info['id']
+                for participant_set in members.get('participantSets', [])
+                if participant_set.get('status', '').startswith(
+                    'WAITING_FOR_MY_')
+                for member_info in participant_set.get('memberInfos', [])]
+
+    def remind_agreements(self, agreement_ids, note=None, **kwargs):
+        """Remind the members who have to act on ``agreement_ids``, see
+        :meth:`map_agreements` for ``kwargs`` and the result (reminder ids,
+        ``None`` when nobody has to act)."""
+        def remind(agreement_id):
+            participant_ids = self.get_reminder_participant_ids(agreement_id)
+            if not participant_ids:
+                return None
+            return self.adobesign_client.post_reminder(
+                agreement_id, participant_ids, note=note).get('id')
+
+        return self.map_agreements(remind, agreement_ids, tokens=2,
+                                   **kwargs)
+
+    @traced
+    @bounded
+    def get_events(self, agreement_id, refresh=False):
+        """
+        Return events of the agreement, from the event store cache
+        """
+        return self.event_store.get_events(
+            agreement_id, refresh=refresh,
+            adobesign_client=self.adobesign_client)
 
+    @traced
+    @bounded
     def get_refuse_comment(self, agreement_id):
         """
         Return the refuse comment from agreement
         """
-        events = self.adobesign_client.get_events(agreement_id)
-        for event in events.get('events'):
-            if event.get('type') == "REJECTED":
-                # comment is mandatory
-                return event["comment"]
+        events = self.event_store.get_events_by_type(
+            agreement_id, 'REJECTED', adobesign_client=self.adobesign_client)
+        if not events:
+            # Cached events may predate the rejection
+            events = self.event_store.get_events_by_type(
+                agreement_id, 'REJECTED', refresh=True,
+                adobesign_client=self.adobesign_client)
+        if events:
+            # comment is mandatory
+            return events[0]["comment"]
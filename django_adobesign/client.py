@@ -1,16 +1,93 @@
+import hashlib
+import json
+import shutil
+import uuid
 from functools import wraps
-from os import path
+from os import path, SEEK_END
 from os.path import join, basename
+from tempfile import SpooledTemporaryFile
 
 import requests
 from requests import HTTPError
 from requests_oauthlib import OAuth2Session
 
-from django_adobesign.exceptions import get_adobe_exception
+from django_adobesign.deadline import check_deadline, get_remaining, \
+    get_timeout
+from django_adobesign.discovery import BASE_URIS_URL, SHARD_ERROR_CODES, \
+    base_uri_cache
+from django_adobesign.exceptions import AdobeSignDeadlineExceeded, \
+    get_adobe_exception
+from django_adobesign.hedging import hedged
+from django_adobesign.tracing import start_span
 
 ADOBE_OAUTH_TOKEN_URL = 'https://api.echosign.com/oauth/token'
 ADOBE_OAUTH_REFRESH_TOKEN_URL = 'https://api.echosign.com/oauth/refresh'
 
+#: Webhook subscription presets, see ``webhookSubscriptionEvents``
+WEBHOOK_EVENTS_ALL = ('AGREEMENT_ALL',)
+WEBHOOK_EVENTS_COMPLETION = (
+    'AGREEMENT_WORKFLOW_COMPLETED',
+    'AGREEMENT_REJECTED',
+    'AGREEMENT_EXPIRED',
+    'AGREEMENT_RECALLED',
+)
+WEBHOOK_EVENTS_SIGNER_ACTIONS = WEBHOOK_EVENTS_COMPLETION + (
+    'AGREEMENT_ACTION_REQUESTED',
+    'AGREEMENT_ACTION_COMPLETED',
+    'AGREEMENT_ACTION_DELEGATED',
+    'AGREEMENT_ACTION_REPLACED_SIGNER',
+)
+
+#: Documents larger than this many bytes are spooled to temporary files
+SPOOL_THRESHOLD = 8 * 1024 * 1024
+
+#: API path segments followed by a resource id
+RESOURCE_COLLECTIONS = ('agreements', 'documents', 'libraryDocuments',
+                        'megaSigns', 'participantSets', 'webhooks')
+
+
+def get_token_identity(access_token):
+    """Return a digest of ``access_token``, so that cache keys do not hold
+    tokens."""
+    return hashlib.sha256(access_token.encode()).hexdigest()
+
+
+def get_content_size(content):
+    """Return the size of ``content``, bytes or a file object."""
+    if not hasattr(content, 'read'):
+        return len(content)
+    position = content.tell()
+    content.seek(0, SEEK_END)
+    size = content.tell()
+    content.seek(position)
+    return size
+
+
+def get_request_attributes(method, url, kwargs):
+    """Return tracing attributes of a request: method, endpoint (url path
+    with ids replaced by ``{id}``), agreement id and payload size."""
+    attributes = {'method': method.upper()}
+    segments = url.split('/api/rest/v6/', 1)[-1].split('?')[0].split('/')
+    endpoint = []
+    for index, segment in enumerate(segments):
+        if index and segments[index - 1] in RESOURCE_COLLECTIONS:
+            if segments[index - 1] == 'agreements':
+                attributes['agreement_id'] = segment
+            segment = '{id}'
+        endpoint.append(segment)
+    attributes['endpoint'] = '/'.join(endpoint)
+    payload = [kwargs['json']] if kwargs.get('json') is not None else []
+    payload.extend(value for value in [kwargs.get('data')] + list(
+        (kwargs.get('files') or {}).values()) if value)
+    size = 0
+    for value in payload:
+        if isinstance(value, dict):
+            value = json.dumps(value).encode()
+        size += get_content_size(value)
+    if size:
+        attributes['request_size'] = size
+    return attributes
+
 
 class AdobeSignOAuthSession(object):
     def __init__(self, application_id, redirect_uri, account_type, state=None):
@@ -73,15 +150,194 @@ class AdobeSignClient(object):
     '''
     AdobeSign client use v6 api.
     See https://secure.na1.echosign.com/public/docs/restapi/v6
+
+    With ``root_url=None``, the API access point of the account is
+    discovered with the ``baseUris`` endpoint and cached per token in
+    ``base_uri_cache``. With ``rediscover`` (the default without
+    ``root_url``), the access point is discovered again when a call is
+    rejected as sent to the wrong shard, and the call is retried once on
+    the new access point. A call redirected to another access point and
+    successful is not sent again, the access point is used for next calls.
+
+    With a ``dispatcher``
+    (:class:`~django_adobesign.dispatch.PriorityDispatcher`), each call
+    waits for its share of the API quota, according to the current
+    priority class.
+
+    With a ``hedger`` (:class:`~django_adobesign.hedging.Hedger`), the
+    selected lookups send a second request when the first one is slow.
     '''
 
     def __init__(self, root_url, access_token, api_user=None,
-                 on_behalf_of_user=None, timeout=15):
-        self.root_url = root_url.strip('/')
+                 on_behalf_of_user=None, timeout=15,
+                 spool_threshold=SPOOL_THRESHOLD, session=None,
+                 rediscover=None, base_uri_cache=base_uri_cache,
+                 dispatcher=None, hedger=None):
+        self._root_url = root_url.strip('/') if root_url else None
         self.access_token = access_token
         self.on_behalf_of_user = on_behalf_of_user
         self.api_user = api_user
         self.timeout = timeout
+        self.spool_threshold = spool_threshold
+        self.session = session
+        self.rediscover = root_url is None if rediscover is None \
+            else rediscover
+        self.base_uri_cache = base_uri_cache
+        self.dispatcher = dispatcher
+        self.hedger = hedger
+        self._current_user = None
+
+    @property
+    def root_url(self):
+        if self._root_url is None:
+            self._root_url = self.discover_root_url()
+        return self._root_url
+
+    @root_url.setter
+    def root_url(self, root_url):
+        self._root_url = root_url.strip('/')
+
+    def get_base_uri_key(self):
+        return get_token_identity(self.access_token), self.api_user
+
+    @handle_adobe_exception
+    def discover_root_url(self, refresh=False):
+        """
+        Return the API access point of the account, from the cache unless
+        ``refresh``
+        """
+        key = self.get_base_uri_key()
+        if not refresh:
+            root_url = self.base_uri_cache.get(key)
+            if root_url:
+                return root_url
+        response = self.send(
+            'get', BASE_URIS_URL,
+            headers=self.get_headers(),
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        root_url = response.json()['apiAccessPoint'].strip('/')
+        self.base_uri_cache.set(key, root_url)
+        return root_url
+
+    @staticmethod
+    def is_shard_error(response):
+        """
+        Return True if ``response`` was rejected because the call was not
+        sent to the account shard
+        """
+        if response.status_code not in (400, 401, 403, 404):
+            return False
+        try:
+            return response.json().get('code') in SHARD_ERROR_CODES
+        except ValueError:
+            return False
+
+    def send(self, method, url, **kwargs):
+        """
+        Send a request with ``session`` if any, so that connections are
+        reused, else with a one-off connection, in a tracing span
+
+        Within a :func:`~django_adobesign.deadline.deadline`, the timeout is
+        capped by the time left.
+        """
+        if self.dispatcher is not None and \
+                not self.dispatcher.acquire(timeout=get_remaining()):
+            raise AdobeSignDeadlineExceeded(
+                'AdobeSign deadline exceeded waiting for the API quota')
+        timeout = kwargs.get('timeout')
+        if timeout is not None:
+            kwargs['timeout'] = get_timeout(timeout)
+        with start_span('http') as span:
+            if span.is_recording():
+                for key, value in get_request_attributes(method, url,
+                                                         kwargs).items():
+                    span.set_attribute('adobesign.' + key, value)
+            try:
+                response = getattr(self.session or requests, method)(
+                    url, **kwargs)
+            except requests.exceptions.Timeout as exception:
+                if kwargs.get('timeout') == timeout:
+                    raise
+                raise AdobeSignDeadlineExceeded(
+                    'AdobeSign deadline exceeded waiting for {}'.format(url),
+                    cause=exception)
+            if span.is_recording():
+                span.set_attribute('adobesign.status_code',
+                                   response.status_code)
+                if response.headers.get('Content-Length'):
+                    span.set_attribute(
+                        'adobesign.response_size',
+                        int(response.headers['Content-Length']))
+        self.pause_on_rate_limit(response)
+        return response
+
+    def pause_on_rate_limit(self, response):
+        """
+        Pause the ``dispatcher`` for the ``retryAfter`` delay of a rate
+        limit error
+        """
+        if self.dispatcher is None or response.status_code != 429:
+            return
+        try:
+            retry_after = response.json().get('retryAfter')
+        except ValueError:
+            retry_after = None
+        self.dispatcher.pause(retry_after or 1)
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a request, see :meth:`send`, on the account access point
+        """
+        response = self.send(method, url, **kwargs)
+        if not self.needs_rediscovery(response):
+            return response
+        url = self.rediscover_url(url)
+        if url is None:
+            return response
+        response.close()
+        for fileobj in [kwargs.get('data')] + list(
+                (kwargs.get('files') or {}).values()):
+            if hasattr(fileobj, 'seek'):
+                fileobj.seek(0)
+        return self.send(method, url, **kwargs)
+
+    def needs_rediscovery(self, response):
+        """
+        Return True if the call of ``response`` has to be sent again on a
+        rediscovered access point
+        """
+        if not self.rediscover:
+            return False
+        if response.history and 200 <= response.status_code < 300:
+            # The call was redirected to the account shard and succeeded:
+            # it must not be sent again
+            self.follow_redirection(response)
+            return False
+        return self.is_shard_error(response)
+
+    def rediscover_url(self, url):
+        """
+        Discover the access point again, return ``url`` on the new access
+        point, or ``None`` if it did not change
+        """
+        root_url = self._root_url
+        self._root_url = self.discover_root_url(refresh=True)
+        if self._root_url == root_url or not url.startswith(root_url):
+            return None
+        return self._root_url + url[len(root_url):]
+
+    def follow_redirection(self, response):
+        """
+        Use the access point ``response`` was redirected to for next calls
+        """
+        root_url, separator, _ = str(response.url).partition(
+            '/api/rest/v6/')
+        if not separator or root_url == self._root_url:
+            return
+        self._root_url = root_url
+        self.base_uri_cache.set(self.get_base_uri_key(), root_url)
 
     def build_url(self, urlpath):
         return path.join(self.root_url, 'api/rest/v6', urlpath)
@@ -94,24 +350,70 @@ class AdobeSignClient(object):
             header['x-on-behalf-of-user'] = self.on_behalf_of_user
         return header
 
+    def create_spooled_file(self):
+        """
+        Return a temporary file kept in memory up to ``spool_threshold``
+        bytes, then rolled over to disk
+        """
+        return SpooledTemporaryFile(max_size=self.spool_threshold)
+
+    def spool_multipart(self, data, name, content):
+        """
+        Return a spooled ``multipart/form-data`` body with ``data`` fields
+        and ``content`` as file ``name``, and its content type
+        """
+        boundary = uuid.uuid4().hex
+        body = self.create_spooled_file()
+        for key, value in data.items():
+            body.write('--{}\r\nContent-Disposition: form-data; '
+                       'name="{}"\r\n\r\n{}\r\n'
+                       .format(boundary, key, value).encode())
+        body.write('--{}\r\nContent-Disposition: form-data; name="{}"; '
+                   'filename="{}"\r\n\r\n'
+                   .format(boundary, name, data['File-Name']).encode())
+        if hasattr(content, 'read'):
+            content.seek(0)
+            shutil.copyfileobj(content, body)
+        else:
+            body.write(content)
+        body.write('\r\n--{}--\r\n'.format(boundary).encode())
+        body.seek(0)
+        return body, 'multipart/form-data; boundary={}'.format(boundary)
+
     @handle_adobe_exception
-    def upload_document(self, document):
+    def upload_document(self, document, mime_type='application/pdf'):
         """
             Upload a document and get a transient document id
+
+            Documents larger than ``spool_threshold`` are streamed from a
+            spooled multipart body instead of being encoded in memory
         """
         url = self.build_url(urlpath='transientDocuments')
         data = {
             'File-Name': basename(document.name),
-            'Mime-Type': 'application/pdf'
+            'Mime-Type': mime_type
         }
 
-        response = requests.post(
-            url,
-            headers=self.get_headers(),
-            files={'File': document.bytes},
-            data=data,
-            timeout=self.timeout
-        )
+        if get_content_size(document.bytes) > self.spool_threshold:
+            body, content_type = self.spool_multipart(data, 'File',
+                                                      document.bytes)
+            headers = self.get_headers()
+            headers['Content-Type'] = content_type
+            with body:
+                response = self.request(
+                    'post', url,
+                    headers=headers,
+                    data=body,
+                    timeout=self.timeout
+                )
+        else:
+            response = self.request(
+                'post', url,
+                headers=self.get_headers(),
+                files={'File': document.bytes},
+                data=data,
+                timeout=self.timeout
+            )
         response.raise_for_status()
         return response.json()
 
@@ -127,7 +429,8 @@ class AdobeSignClient(object):
     @handle_adobe_exception
     def post_agreement(self, transient_document_id, name, participants,
                        post_sign_redirect_url, post_sign_redirect_delay,
-                       send_mail, state='IN_PROCESS', **extra_data):
+                       send_mail, state='IN_PROCESS',
+                       library_document_id=None, **extra_data):
         '''
         Create signature with only one document
 
@@ -148,7 +451,10 @@ class AdobeSignClient(object):
         a delay will be redirected to your success page,
         :param post_sign_redirect_url: A publicly accessible url to which the
         user will be sent after successfully completing the signing process
-        :param document: file wrapper object
+        :param transient_document_id: id of the uploaded document, ignored
+        if ``library_document_id`` is given
+        :param library_document_id: id of a library document (template) to
+        use instead of an uploaded document
         :param name: name of document
         :param participants:  A list of one or more participant set.
         A participant set may have one or more participant.
@@ -164,10 +470,12 @@ class AdobeSignClient(object):
         # Send doc for signature
         url = self.build_url(urlpath='agreements')
 
+        if library_document_id:
+            file_info = {'libraryDocumentId': library_document_id}
+        else:
+            file_info = {'transientDocumentId': transient_document_id}
         data = {
-            'fileInfos': [{
-                'transientDocumentId': transient_document_id
-            }],
+            'fileInfos': [file_info],
             'name': name,
             'participantSetsInfo': participants,
             'signatureType': 'ESIGN',
@@ -189,8 +497,8 @@ class AdobeSignClient(object):
             }
 
         data.update(extra_data)
-        response = requests.post(
-            url,
+        response = self.request(
+            'post', url,
             headers=self.get_headers(),
             json=data,
             timeout=self.timeout
@@ -198,6 +506,128 @@ class AdobeSignClient(object):
         response.raise_for_status()
         return response.json()
 
+    @handle_adobe_exception
+    def post_library_document(self, transient_document_id, name,
+                              sharing_mode='USER',
+                              template_types=('DOCUMENT',), state='ACTIVE'):
+        """
+        Create a library document (template) from an uploaded document
+        """
+        url = self.build_url(urlpath='libraryDocuments')
+        data = {
+            'fileInfos': [{
+                'transientDocumentId': transient_document_id
+            }],
+            'name': name,
+            'sharingMode': sharing_mode,
+            'state': state,
+            'templateTypes': list(template_types)
+        }
+        response = self.request(
+            'post', url,
+            headers=self.get_headers(),
+            json=data,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    @handle_adobe_exception
+    def get_current_user(self):
+        """
+        Return the user the client acts as, with its ``id`` and
+        ``accountId``, fetched once per client
+        """
+        if self._current_user is None:
+            response = self.request(
+                'get', self.build_url('users/me'),
+                headers=self.get_headers(),
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            self._current_user = response.json()
+        return self._current_user
+
+    @handle_adobe_exception
+    @hedged
+    def get_library_document(self, library_document_id):
+        """
+        Return a library document
+        """
+        url = self.build_url('libraryDocuments/{}'.format(library_document_id))
+        response = self.request(
+            'get', url,
+            headers=self.get_headers(),
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    @handle_adobe_exception
+    def post_mega_sign(self, transient_document_id, name,
+                       recipients_transient_document_id, send_mail=True,
+                       state='IN_PROCESS', **extra_data):
+        '''
+        Send the same document to many recipients, one child agreement per
+        recipient
+
+        https://secure.na1.adobesign.com/public/docs/restapi/v6#!/megasigns/createMegasign
+
+        :param recipients_transient_document_id: transient document id of
+        a CSV file listing recipients, with an ``email`` column
+        :param extra_data: extra data to pass (see adobesign documentation)
+        '''
+        url = self.build_url(urlpath='megaSigns')
+        data = {
+            'fileInfos': [{
+                'transientDocumentId': transient_document_id
+            }],
+            'name': name,
+            'childAgreementsInfo': {
+                'fileInfo': {
+                    'transientDocumentId': recipients_transient_document_id
+                }
+            },
+            'signatureType': 'ESIGN',
+            'state': state
+        }
+        if not send_mail:
+            data['emailOption'] = {
+                'sendOptions': {
+                    'completionEmails': 'NONE',
+                    'inFlightEmails': 'NONE',
+                    'initEmails': 'NONE'
+                }
+            }
+        data.update(extra_data)
+        response = self.request(
+            'post', url,
+            headers=self.get_headers(),
+            json=data,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    @handle_adobe_exception
+    def get_mega_sign_agreements(self, mega_sign_id, page_size=100,
+                                 cursor=None):
+        """
+        Return the child agreements of a MegaSign with pagination
+        """
+        url = self.build_url('megaSigns/{}/agreements'.format(mega_sign_id))
+        params = {'pageSize': page_size}
+        if cursor:
+            params['cursor'] = cursor
+        response = self.request(
+            'get', url,
+            headers=self.get_headers(),
+            params=params,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
     @handle_adobe_exception
     def get_agreements(self, page_size, cursor=None, **extra_params):
         """
@@ -209,8 +639,8 @@ class AdobeSignClient(object):
             params['cursor'] = cursor
         params.update(extra_params)
         url = self.build_url(path_url)
-        response = requests.get(
-            url,
+        response = self.request(
+            'get', url,
             headers=self.get_headers(),
             params=params,
             timeout=self.timeout
@@ -219,6 +649,22 @@ class AdobeSignClient(object):
         return response.json()
 
     @handle_adobe_exception
+    @hedged
+    def get_agreement(self, agreement_id):
+        """
+        Return the current status and information of an agreement
+        """
+        url = self.build_url('agreements/{}'.format(agreement_id))
+        response = self.request(
+            'get', url,
+            headers=self.get_headers(),
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    @handle_adobe_exception
+    @hedged
     def get_members(self, agreement_id, include_next_participant_set):
         """
         Return members of a given agreement id
@@ -228,8 +674,8 @@ class AdobeSignClient(object):
         url = self.build_url('agreements/{}/members'.format(agreement_id))
         params = {
             'includeNextParticipantSet': include_next_participant_set}
-        response = requests.get(
-            url,
+        response = self.request(
+            'get', url,
             params=params,
             headers=self.get_headers(),
             timeout=self.timeout
@@ -238,14 +684,15 @@ class AdobeSignClient(object):
         return response.json()
 
     @handle_adobe_exception
+    @hedged
     def get_signing_url(self, agreement_id):
         """
         Return the next signing url for the agreement
         corresponding to the agreement_id.
         """
         url = self.build_url('agreements/{}/signingUrls'.format(agreement_id))
-        response = requests.get(
-            url,
+        response = self.request(
+            'get', url,
             headers=self.get_headers(),
             timeout=self.timeout
         )
@@ -253,6 +700,7 @@ class AdobeSignClient(object):
         return response.json()
 
     @handle_adobe_exception
+    @hedged
     def get_signer(self, agreement_id, signer_id):
         """
         Return the signer with the given signer_id who belongs to the agreement
@@ -260,8 +708,8 @@ class AdobeSignClient(object):
         """
         url = self.build_url('agreements/{}/members/participantSets/{}'
                              .format(agreement_id, signer_id))
-        response = requests.get(
-            url,
+        response = self.request(
+            'get', url,
             headers=self.get_headers(),
             timeout=self.timeout
         )
@@ -276,8 +724,8 @@ class AdobeSignClient(object):
         """
         url = self.build_url('agreements/{}/members/participantSets/{}'
                              .format(agreement_id, signer_id))
-        response = requests.put(
-            url,
+        response = self.request(
+            'put', url,
             headers=self.get_headers(),
             json=participant,
             timeout=self.timeout
@@ -285,13 +733,61 @@ class AdobeSignClient(object):
         response.raise_for_status()
 
     @handle_adobe_exception
+    def update_agreement_state(self, agreement_id, state, comment=None,
+                               notify_others=True):
+        """
+        Transition the agreement to ``state``, e.g. ``CANCELLED`` with the
+        cancellation ``comment``, notifying participants with
+        ``notify_others``
+        """
+        url = self.build_url('agreements/{}/state'.format(agreement_id))
+        data = {'state': state}
+        if state == 'CANCELLED':
+            data['agreementCancellationInfo'] = {
+                'notifyOthers': notify_others}
+            if comment:
+                data['agreementCancellationInfo']['comment'] = comment
+        response = self.request(
+            'put', url,
+            headers=self.get_headers(),
+            json=data,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+
+    @handle_adobe_exception
+    def post_reminder(self, agreement_id, participant_ids, note=None,
+                      **extra_data):
+        """
+        Remind participants ``participant_ids`` of the agreement to act,
+        return the reminder id
+        """
+        url = self.build_url('agreements/{}/reminders'.format(agreement_id))
+        data = {
+            'recipientParticipantIds': list(participant_ids),
+            'status': 'ACTIVE',
+        }
+        if note:
+            data['note'] = note
+        data.update(extra_data)
+        response = self.request(
+            'post', url,
+            headers=self.get_headers(),
+            json=data,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    @handle_adobe_exception
+    @hedged
     def get_documents(self, agreement_id, **extra_data):
         """
         Return all document ids for a given agreement id
         """
         url = self.build_url('agreements/{}/documents'.format(agreement_id))
-        response = requests.get(
-            url,
+        response = self.request(
+            'get', url,
             headers=self.get_headers(),
             data=extra_data,
             timeout=self.timeout
@@ -300,14 +796,26 @@ class AdobeSignClient(object):
         return response.json()
 
     @handle_adobe_exception
-    def get_document(self, agreement_id, document_id):
+    def get_document(self, agreement_id, document_id, spool=False):
         """
         Download a document
+
+        With ``spool``, return a file object spooled to disk above
+        ``spool_threshold`` bytes instead of the document content
         """
+        if spool:
+            fileobj = self.create_spooled_file()
+            try:
+                self.download_document(agreement_id, document_id, fileobj)
+            except Exception:
+                fileobj.close()
+                raise
+            fileobj.seek(0)
+            return fileobj
         url = self.build_url('agreements/{}/documents/{}'
                              .format(agreement_id, document_id))
-        response = requests.get(
-            url,
+        response = self.request(
+            'get', url,
             headers=self.get_headers(),
             timeout=self.timeout
         )
@@ -315,13 +823,36 @@ class AdobeSignClient(object):
         return response.content
 
     @handle_adobe_exception
+    def download_document(self, agreement_id, document_id, fileobj,
+                          chunk_size=64 * 1024):
+        """
+        Download a document into ``fileobj`` by chunks, return its size
+        """
+        url = self.build_url('agreements/{}/documents/{}'
+                             .format(agreement_id, document_id))
+        size = 0
+        with self.request(
+            'get', url,
+            headers=self.get_headers(),
+            stream=True,
+            timeout=self.timeout
+        ) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                check_deadline()
+                fileobj.write(chunk)
+                size += len(chunk)
+        return size
+
+    @handle_adobe_exception
+    @hedged
     def get_events(self, agreement_id):
         """
         Retrieves the events information for an agreement.
         """
         url = self.build_url('agreements/{}/events'.format(agreement_id))
-        response = requests.get(
-            url,
+        response = self.request(
+            'get', url,
             headers=self.get_headers(),
             timeout=self.timeout
         )
@@ -329,13 +860,29 @@ class AdobeSignClient(object):
         return response.json()
 
     def rebuild_with_token(self, access_token):
-        return AdobeSignClient(self.root_url, access_token, self.api_user,
-                               self.on_behalf_of_user)
-    
+        return AdobeSignClient(self._root_url, access_token, self.api_user,
+                               self.on_behalf_of_user,
+                               spool_threshold=self.spool_threshold,
+                               session=self.session,
+                               rediscover=self.rediscover,
+                               base_uri_cache=self.base_uri_cache,
+                               dispatcher=self.dispatcher,
+                               hedger=self.hedger)
+
     @handle_adobe_exception
-    def post_webhooks(self, agreement_id, webhook_handler_url):
+    def post_webhooks(self, agreement_id, webhook_handler_url,
+                      events=WEBHOOK_EVENTS_ALL,
+                      include_detailed_info=False,
+                      include_participants_info=False,
+                      include_signed_documents=False):
         """
         Create a a new webhook
+
+        ``events`` is the list of subscribed events, e.g.
+        :data:`WEBHOOK_EVENTS_COMPLETION` to be notified of completion only.
+        ``include_*`` parameters ask AdobeSign to embed agreement details,
+        participant sets and signed documents in the notification payload, so
+        that the webhook handler does not have to fetch them.
         """
         url = self.build_url('webhooks')
         data = {
@@ -344,11 +891,19 @@ class AdobeSignClient(object):
             "state": "ACTIVE",
             "resourceType": "AGREEMENT",
             "resourceId": agreement_id,
-            "webhookSubscriptionEvents": ["AGREEMENT_ALL"],
+            "webhookSubscriptionEvents": list(events),
             "webhookUrlInfo": {"url": webhook_handler_url},
         }
-        response = requests.post(
-            url,
+        conditional_params = {
+            "includeDetailedInfo": include_detailed_info,
+            "includeParticipantsInfo": include_participants_info,
+            "includeSignedDocuments": include_signed_documents,
+        }
+        if any(conditional_params.values()):
+            data["webhookConditionalParams"] = {
+                "webhookAgreementEvents": conditional_params}
+        response = self.request(
+            'post', url,
             headers=self.get_headers(),
             json=data, timeout=self.timeout
         )
@@ -0,0 +1,98 @@
+"""Helpers to run AdobeSign calls outside of the current thread.
+
+Calls run in a copy of the caller context, so that they belong to its
+current tracing span. Background tasks outlive the caller: they are not
+bound by its deadline.
+
+"""
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from django.db import connection
+
+from django_adobesign.deadline import no_deadline
+
+logger = logging.getLogger(__name__)
+
+#: Number of threads of the shared background executor
+BACKGROUND_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_background_executor():
+    """Return the process-wide executor used for background work."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=BACKGROUND_WORKERS,
+                thread_name_prefix='adobesign')
+        return _executor
+
+
+def close_db_connection(function):
+    """Close the database connection of the worker thread after
+    ``function``."""
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        try:
+            return function(*args, **kwargs)
+        finally:
+            connection.close()
+
+    return wrapper
+
+
+def run_in_background(function, *args, **kwargs):
+    """Run ``function`` in the background executor, return a future.
+
+    Exceptions are logged, and raised by ``future.result()``.
+
+    """
+    @close_db_connection
+    def task():
+        try:
+            with no_deadline():
+                return function(*args, **kwargs)
+        except Exception:
+            logger.exception('AdobeSign background task %r failed',
+                             function)
+            raise
+
+    return get_background_executor().submit(
+        contextvars.copy_context().run, task)
+
+
+def run_later(delay, function, *args, **kwargs):
+    """Run ``function`` in the background executor after ``delay``
+    seconds, see :func:`run_in_background`.
+
+    No worker is held while waiting.
+
+    """
+    context = contextvars.copy_context()
+    timer = threading.Timer(delay, context.run,
+                            (run_in_background, function) + args, kwargs)
+    timer.daemon = True
+    timer.start()
+    return timer
+
+
+def map_in_threads(function, items, max_workers):
+    """Return ``[function(item) for item in items]``, computed over at most
+    ``max_workers`` threads."""
+    items = list(items)
+    if len(items) <= 1 or max_workers <= 1:
+        return [function(item) for item in items]
+    function = close_db_connection(function)
+    contexts = [contextvars.copy_context() for _ in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items)),
+                            thread_name_prefix='adobesign') as executor:
+        return list(executor.map(
+            lambda context, item: context.run(function, item),
+            contexts, items))
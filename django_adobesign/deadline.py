@@ -0,0 +1,105 @@
+"""Time budget of multi-call AdobeSign operations.
+
+Client calls made in a ``deadline(seconds)`` block use the remaining time
+as timeout when it is shorter than the client ``timeout``, and fail with
+:class:`~django_adobesign.exceptions.AdobeSignDeadlineExceeded` once the
+budget is spent::
+
+    with deadline(10):
+        backend.create_signature(signature, webhook_handler_url)
+
+A deadline is also checked before waiting for the API quota of a client
+``dispatcher`` and between the chunks of streamed downloads, the timeout
+of a request applying to each read only.
+
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django_adobesign.exceptions import AdobeSignDeadlineExceeded
+
+_deadline = contextvars.ContextVar('adobesign_deadline', default=None)
+
+
+@contextmanager
+def deadline(seconds):
+    """Bound calls made in the block to ``seconds`` from now, as a context
+    manager or a decorator.
+
+    A nested deadline never extends the current one, ``None`` keeps the
+    current deadline.
+    """
+    if seconds is None:
+        yield
+        return
+    expires_at = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        expires_at = min(expires_at, current)
+    token = _deadline.set(expires_at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def no_deadline():
+    """Run the block without deadline, e.g. background work started by a
+    bounded operation."""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def get_remaining():
+    """Return the seconds left before the current deadline, ``None``
+    without deadline."""
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return None
+    return expires_at - time.monotonic()
+
+
+def check_deadline():
+    """Raise :class:`~django_adobesign.exceptions.AdobeSignDeadlineExceeded`
+    when the current deadline has passed."""
+    remaining = get_remaining()
+    if remaining is not None and remaining <= 0:
+        raise AdobeSignDeadlineExceeded(
+            'AdobeSign deadline exceeded by {:.3f}s'.format(-remaining))
+
+
+def get_timeout(timeout):
+    """Return ``timeout`` (seconds, or a ``(connect, read)`` tuple) capped
+    by the time left before the current deadline.
+
+    Raise :class:`~django_adobesign.exceptions.AdobeSignDeadlineExceeded`
+    when the deadline has passed.
+    """
+    remaining = get_remaining()
+    if remaining is None:
+        return timeout
+    if remaining <= 0:
+        raise AdobeSignDeadlineExceeded(
+            'AdobeSign deadline exceeded by {:.3f}s'.format(-remaining))
+    if isinstance(timeout, tuple):
+        return tuple(remaining if value is None else min(value, remaining)
+                     for value in timeout)
+    if timeout is None:
+        return remaining
+    return min(timeout, remaining)
+
+
+def bounded(function):
+    """Run backend method ``function`` within the backend ``deadline``."""
+    @wraps(function)
+    def wrapper(self, *args, **kwargs):
+        with deadline(self.deadline):
+            return function(self, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,55 @@
+"""Cache of AdobeSign API access points per account."""
+import threading
+import time
+from collections import OrderedDict
+
+#: Endpoint returning the API access point of the token account
+BASE_URIS_URL = 'https://api.adobesign.com/api/rest/v6/baseUris'
+
+#: Error codes of a call sent to the wrong shard
+SHARD_ERROR_CODES = ('INVALID_API_ACCESS_POINT',)
+
+
+class BaseUriCache(object):
+    """Cache of API access points, kept ``ttl`` seconds.
+
+    At most ``max_accounts`` access points are kept, least recently used
+    ones are evicted.
+
+    """
+
+    def __init__(self, ttl=24 * 3600, max_accounts=1000, clock=time.time):
+        self.ttl = ttl
+        self.max_accounts = max_accounts
+        self.clock = clock
+        self._base_uris = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the access point cached for ``key``, ``None`` if there is
+        none or it expired."""
+        with self._lock:
+            entry = self._base_uris.get(key)
+            if entry is None:
+                return None
+            base_uri, cached_at = entry
+            if self.clock() - cached_at >= self.ttl:
+                del self._base_uris[key]
+                return None
+            self._base_uris.move_to_end(key)
+            return base_uri
+
+    def set(self, key, base_uri):
+        with self._lock:
+            self._base_uris[key] = (base_uri, self.clock())
+            self._base_uris.move_to_end(key)
+            while len(self._base_uris) > self.max_accounts:
+                self._base_uris.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._base_uris.pop(key, None)
+
+
+#: Cache shared by the process
+base_uri_cache = BaseUriCache()
@@ -0,0 +1,97 @@
+"""Priority-aware sharing of the AdobeSign API quota.
+
+Calls are interactive (a user is waiting) unless made in a
+``priority(BACKGROUND)`` block, e.g. synchronizations and bulk sends::
+
+    with priority(BACKGROUND):
+        AgreementSync(backend).run()
+
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+from django_adobesign.ratelimit import RateLimiter
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+_priority = contextvars.ContextVar('adobesign_priority', default=INTERACTIVE)
+
+
+def get_priority():
+    """Return the priority class of calls made in the current context."""
+    return _priority.get()
+
+
+@contextmanager
+def priority(priority_class):
+    """Make calls with ``priority_class``, as a context manager or a
+    decorator."""
+    token = _priority.set(priority_class)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class PriorityDispatcher(RateLimiter):
+    """:class:`~django_adobesign.ratelimit.RateLimiter` of ``rate`` calls
+    per second, in bursts of at most ``burst`` calls, shared by interactive
+    and background calls.
+
+    Background calls never use the last ``interactive_reserve`` fraction of
+    the bucket, capped so that a background call still fits in a burst, and
+    wait while interactive calls are waiting: they only fill
+    the capacity left by interactive traffic. :meth:`pause` suspends all
+    calls, e.g. after a rate limit error.
+
+    """
+
+    def __init__(self, rate, burst=None, interactive_reserve=0.2,
+                 clock=time.monotonic, sleep=time.sleep):
+        super(PriorityDispatcher, self).__init__(rate, burst=burst,
+                                                 clock=clock, sleep=sleep)
+        self.reserve = max(0, min(self.burst * interactive_reserve,
+                                  self.burst - 1))
+        self.interactive_waiting = 0
+        self.counts = {INTERACTIVE: 0, BACKGROUND: 0}
+
+    def try_acquire(self, priority_class=None, tokens=1):
+        priority_class = priority_class or get_priority()
+        if priority_class == INTERACTIVE:
+            wait = super(PriorityDispatcher, self).try_acquire(tokens)
+        elif self.interactive_waiting:
+            wait = max(1. / self.rate, self.paused_until - self.clock())
+        else:
+            wait = super(PriorityDispatcher, self).try_acquire(
+                tokens, reserve=min(self.reserve,
+                                    max(0, self.burst - tokens)))
+        if not wait:
+            with self._lock:
+                self.counts[priority_class] += tokens
+        return wait
+
+    @contextmanager
+    def waiting(self, priority_class=None):
+        if (priority_class or get_priority()) != INTERACTIVE:
+            yield
+            return
+        with self._lock:
+            self.interactive_waiting += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.interactive_waiting -= 1
+
+    def acquire(self, priority_class=None, tokens=1, timeout=None):
+        """Wait until a call of ``priority_class`` (the current priority by
+        default) is allowed, see :meth:`RateLimiter.acquire`."""
+        return super(PriorityDispatcher, self).acquire(
+            tokens=tokens, timeout=timeout, priority_class=priority_class)
+
+    def stats(self):
+        """Return the number of calls dispatched per priority class."""
+        with self._lock:
+            return dict(self.counts)
@@ -0,0 +1,136 @@
+"""Cache of AdobeSign agreement events."""
+import threading
+import time
+from collections import OrderedDict
+
+#: Event types after which an agreement has no new events
+TERMINAL_EVENT_TYPES = ('REJECTED', 'RECALLED', 'EXPIRED')
+
+
+def get_event_key(event):
+    """Return a key identifying ``event`` among the agreement events."""
+    if event.get('id'):
+        return event['id']
+    return (event.get('type'), event.get('date'),
+            event.get('participantEmail'), event.get('actingUserEmail'))
+
+
+def get_tenant_key(adobesign_client):
+    """Return the key of the account and user ``adobesign_client`` acts
+    as, so that tenants do not read each other's events."""
+    return adobesign_client.get_base_uri_key() + (
+        adobesign_client.on_behalf_of_user,)
+
+
+class AgreementEvents(object):
+    """Events of one agreement, indexed by type."""
+
+    def __init__(self):
+        self.events = []
+        self.keys = set()
+        self.by_type = {}
+        self.fetched_at = None
+
+    @property
+    def terminated(self):
+        return any(event_type in self.by_type
+                   for event_type in TERMINAL_EVENT_TYPES)
+
+    def merge(self, events):
+        """Add ``events`` not known yet, return the number of new ones."""
+        count = 0
+        for event in events:
+            key = get_event_key(event)
+            if key in self.keys:
+                continue
+            self.keys.add(key)
+            self.events.append(event)
+            self.by_type.setdefault(event.get('type'), []).append(event)
+            count += 1
+        return count
+
+
+class AgreementEventStore(object):
+    """Per-agreement cache of AdobeSign events.
+
+    Events are fetched at most once every ``ttl`` seconds per agreement, and
+    never again once the agreement has a terminal event (rejected,
+    recalled, expired). New events are merged in the per-type index, so
+    lookups by type do not scan the history. At most ``max_agreements``
+    agreements are kept, least recently used ones are evicted.
+
+    Lookups use ``adobesign_client``, or the one they are given: a store
+    may be shared by the clients of many tenants, agreements are cached
+    per tenant (see :func:`get_tenant_key`).
+
+    """
+
+    def __init__(self, adobesign_client=None, ttl=60, max_agreements=1000,
+                 clock=time.time):
+        self.adobesign_client = adobesign_client
+        self.ttl = ttl
+        self.max_agreements = max_agreements
+        self.clock = clock
+        self._agreements = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_agreement_events(self, agreement_id, refresh=False,
+                              adobesign_client=None):
+        adobesign_client = adobesign_client or self.adobesign_client
+        key = get_tenant_key(adobesign_client), agreement_id
+        with self._lock:
+            agreement_events = self._agreements.get(key)
+            if agreement_events is None:
+                agreement_events = AgreementEvents()
+                self._agreements[key] = agreement_events
+                while len(self._agreements) > self.max_agreements:
+                    self._agreements.popitem(last=False)
+            else:
+                self._agreements.move_to_end(key)
+            now = self.clock()
+            stale = agreement_events.fetched_at is None or refresh or (
+                not agreement_events.terminated and
+                now - agreement_events.fetched_at >= self.ttl)
+        if stale:
+            events = adobesign_client.get_events(agreement_id)
+            with self._lock:
+                agreement_events.merge(events.get('events') or [])
+                agreement_events.fetched_at = now
+        return agreement_events
+
+    def get_events(self, agreement_id, refresh=False,
+                   adobesign_client=None):
+        """Return all events of ``agreement_id``."""
+        return list(self._get_agreement_events(
+            agreement_id, refresh, adobesign_client).events)
+
+    def get_events_by_type(self, agreement_id, event_type, refresh=False,
+                           adobesign_client=None):
+        """Return events of ``agreement_id`` with ``event_type``."""
+        return list(self._get_agreement_events(
+            agreement_id, refresh,
+            adobesign_client).by_type.get(event_type, []))
+
+    def get_latest_event(self, agreement_id, event_type, refresh=False,
+                         adobesign_client=None):
+        """Return the most recent event of ``agreement_id`` with
+        ``event_type``, ``None`` if there is none."""
+        events = self._get_agreement_events(
+            agreement_id, refresh, adobesign_client).by_type.get(event_type)
+        return events[-1] if events else None
+
+    def invalidate(self, agreement_id, adobesign_client=None):
+        """Fetch events of ``agreement_id`` again on next lookup."""
+        adobesign_client = adobesign_client or self.adobesign_client
+        with self._lock:
+            self._agreements.pop(
+                (get_tenant_key(adobesign_client), agreement_id), None)
+
+    def clear(self):
+        """Forget all cached events."""
+        with self._lock:
+            self._agreements.clear()
+
+
+#: Store shared by the process
+agreement_event_store = AgreementEventStore()
@@ -55,6 +55,10 @@ class AdobeSignException(Exception):
         self.reason = reason
 
 
+class AdobeSignDeadlineExceeded(AdobeSignException):
+    """The time budget of the operation is spent."""
+
+
 class AdobeSignNoMoreSignerException(AdobeSignException):
     CODE_REASON = ('AGREEMENT_EXPIRED', 'AGREEMENT_NOT_SIGNABLE',
                    'AGREEMENT_NOT_VISIBLE')
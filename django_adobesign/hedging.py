@@ -0,0 +1,135 @@
+"""Hedged AdobeSign calls, for latency-critical idempotent lookups."""
+import contextvars
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import wraps
+
+#: Client methods safe to hedge: idempotent GET calls
+HEDGEABLE_METHODS = ('get_agreement', 'get_documents', 'get_events',
+                     'get_library_document', 'get_members', 'get_signer',
+                     'get_signing_url')
+
+
+class Hedger(object):
+    """Send a second request when the first one is slower than usual, take
+    the first response.
+
+    Only client ``methods`` are hedged. The hedge is sent after the
+    ``percentile`` latency of the last ``window`` calls of the method, or
+    ``initial_delay`` until ``min_samples`` calls were measured, and never
+    before ``min_delay``. :meth:`stats` counts calls, hedges and hedges
+    answering first, to check the extra load.
+
+    Calls run on a pool of ``max_workers`` threads. The delay starts when
+    the call starts running, not when it is queued, and no hedge is sent
+    while all workers are busy: a saturated pool does not trigger more
+    hedges.
+
+    """
+
+    def __init__(self, methods=('get_signing_url',), percentile=95,
+                 window=200, min_samples=20, initial_delay=1.,
+                 min_delay=0.05, max_workers=8):
+        if not set(methods) <= set(HEDGEABLE_METHODS):
+            raise ValueError('Only {} can be hedged'.format(
+                ', '.join(HEDGEABLE_METHODS)))
+        self.methods = frozenset(methods)
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.latencies = defaultdict(lambda: deque(maxlen=window))
+        self.counts = defaultdict(lambda: {'calls': 0, 'hedged': 0,
+                                           'hedge_wins': 0})
+        self.max_workers = max_workers
+        self.busy = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='adobesign')
+
+    def get_delay(self, method):
+        """Return the delay before hedging a call of ``method``."""
+        with self._lock:
+            latencies = sorted(self.latencies[method])
+        if len(latencies) < self.min_samples:
+            return self.initial_delay
+        index = min(len(latencies) - 1,
+                    len(latencies) * self.percentile // 100)
+        return max(self.min_delay, latencies[index])
+
+    def record(self, method, latency):
+        with self._lock:
+            self.latencies[method].append(latency)
+
+    def submit(self, method, function, *args, **kwargs):
+        """Run ``function(*args, **kwargs)`` on the pool, return its future
+        and an event set when it starts running."""
+        started = threading.Event()
+
+        def timed_call():
+            started.set()
+            start = time.monotonic()
+            result = function(*args, **kwargs)
+            self.record(method, time.monotonic() - start)
+            return result
+
+        def release(future):
+            with self._lock:
+                self.busy -= 1
+
+        with self._lock:
+            self.busy += 1
+        future = self._executor.submit(contextvars.copy_context().run,
+                                       timed_call)
+        future.add_done_callback(release)
+        return future, started
+
+    def call(self, method, function, *args, **kwargs):
+        """Return ``function(*args, **kwargs)``, hedged."""
+        with self._lock:
+            self.counts[method]['calls'] += 1
+        first, started = self.submit(method, function, *args, **kwargs)
+        started.wait()
+        done, _ = wait([first], timeout=self.get_delay(method))
+        if done:
+            return first.result()
+        with self._lock:
+            saturated = self.busy >= self.max_workers
+            if not saturated:
+                self.counts[method]['hedged'] += 1
+        if saturated:
+            return first.result()
+        hedge, _ = self.submit(method, function, *args, **kwargs)
+        pending = {first, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if first in done and first.exception() is None:
+                return first.result()
+            if hedge in done and hedge.exception() is None:
+                with self._lock:
+                    self.counts[method]['hedge_wins'] += 1
+                return hedge.result()
+        # Both calls failed
+        return first.result()
+
+    def stats(self):
+        """Return ``{method: {'calls', 'hedged', 'hedge_wins'}}``."""
+        with self._lock:
+            return {method: dict(counts)
+                    for method, counts in self.counts.items()}
+
+
+def hedged(function):
+    """Hedge calls of client method ``function`` if the client ``hedger``
+    selects it."""
+    @wraps(function)
+    def wrapper(self, *args, **kwargs):
+        hedger = self.hedger
+        if hedger is None or function.__name__ not in hedger.methods:
+            return function(self, *args, **kwargs)
+        return hedger.call(function.__name__, function, self, *args,
+                           **kwargs)
+
+    return wrapper
@@ -0,0 +1,108 @@
+"""Reconcile local signatures with AdobeSign."""
+import time
+
+from django.core.management.base import BaseCommand
+from django_anysign import api as django_anysign
+
+from django_adobesign.concurrency import map_in_threads
+from django_adobesign.dispatch import BACKGROUND, priority
+from django_adobesign.models import SyncCheckpoint
+from django_adobesign.ratelimit import RateLimiter, call_with_rate_limit
+
+#: AdobeSign calls made to refresh a signature
+CALLS_PER_SIGNATURE = 2
+
+
+class Command(BaseCommand):
+    help = ('Refresh the state of local signatures from AdobeSign, '
+            'resuming from the last processed signature.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Number of parallel workers.')
+        parser.add_argument('--rate', type=float, default=10,
+                            help='Maximum AdobeSign calls per second.')
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Signatures refreshed between checkpoints.')
+        parser.add_argument('--checkpoint', default='backfill',
+                            help='Name of the persisted progress.')
+        parser.add_argument('--restart', action='store_true',
+                            help='Start again from the first signature.')
+
+    def get_queryset(self):
+        return django_anysign.get_signature_model().objects.exclude(
+            signature_backend_id='').select_related('signature_type')
+
+    def refresh(self, signature):
+        try:
+            call_with_rate_limit(self.rate_limiter,
+                                 signature.signature_backend.refresh_signature,
+                                 signature, tokens=CALLS_PER_SIGNATURE)
+        except NotImplementedError:
+            # Misconfiguration, see update_signature_state
+            raise
+        except Exception as exception:
+            return exception
+        return None
+
+    def refresh_batch(self, batch, workers):
+        """Refresh signatures of ``batch``, return the primary keys of the
+        failed ones."""
+        failed = []
+        errors = map_in_threads(self.refresh, batch, workers)
+        for signature, error in zip(batch, errors):
+            if error is not None:
+                failed.append(str(signature.pk))
+                self.stderr.write('Signature {} ({}): {}'.format(
+                    signature.pk, signature.signature_backend_id, error))
+        return failed
+
+    @priority(BACKGROUND)
+    def handle(self, *args, **options):
+        self.rate_limiter = RateLimiter(options['rate'])
+        checkpoint, _ = SyncCheckpoint.objects.get_or_create(
+            name=options['checkpoint'])
+        if options['restart']:
+            checkpoint.cursor = ''
+        # Signatures which failed before the cursor are retried at the end,
+        # a new scan refreshes them anyway
+        failed_ids = checkpoint.failed.split(',') \
+            if checkpoint.cursor and checkpoint.failed else []
+        queryset = self.get_queryset().order_by('pk')
+        if checkpoint.cursor:
+            queryset = queryset.filter(pk__gt=checkpoint.cursor)
+        total = queryset.count()
+        done = failed = 0
+        start = time.monotonic()
+        while done < total:
+            batch = list(queryset[:options['batch_size']])
+            if not batch:
+                break
+            batch_failed_ids = self.refresh_batch(batch, options['workers'])
+            failed += len(batch_failed_ids)
+            failed_ids.extend(batch_failed_ids)
+            checkpoint.cursor = str(batch[-1].pk)
+            checkpoint.failed = ','.join(failed_ids)
+            checkpoint.save(update_fields=['cursor', 'failed', 'updated_at'])
+            queryset = queryset.filter(pk__gt=batch[-1].pk)
+            done += len(batch)
+            elapsed = time.monotonic() - start
+            throughput = done / elapsed if elapsed else 0
+            eta = (total - done) / throughput if throughput else 0
+            self.stdout.write(
+                '{}/{} signatures, {} failed, {:.1f}/s, ETA {:.0f}s'.format(
+                    done, total, failed, throughput, eta))
+        # Retry failed signatures once, those failing again are kept in the
+        # checkpoint and refreshed by the next scan
+        retried = self.get_queryset().filter(pk__in=failed_ids).order_by('pk')
+        retried_count = retried.count()
+        failed_ids = []
+        for index in range(0, retried_count, options['batch_size']):
+            batch = list(retried[index:index + options['batch_size']])
+            failed_ids.extend(self.refresh_batch(batch, options['workers']))
+        checkpoint.cursor = ''
+        checkpoint.failed = ','.join(failed_ids)
+        checkpoint.save(update_fields=['cursor', 'failed', 'updated_at'])
+        self.stdout.write('Refreshed {} signatures, {} failed'.format(
+            done - failed + retried_count - len(failed_ids),
+            len(failed_ids)))
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:55
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Agreement',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('agreement_id', models.CharField(max_length=100, unique=True, verbose_name='AdobeSign agreement id')),
+                ('name', models.CharField(blank=True, default='', max_length=255, verbose_name='name')),
+                ('status', models.CharField(blank=True, default='', max_length=50, verbose_name='AdobeSign status')),
+                ('display_date', models.DateTimeField(blank=True, null=True, verbose_name='AdobeSign display date')),
+                ('synced_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='synchronized at')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SyncCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='name')),
+                ('cursor', models.CharField(blank=True, default='', max_length=255, verbose_name='cursor of the next page of the current scan')),
+                ('watermark', models.DateTimeField(blank=True, null=True, verbose_name='most recent modification date of the last complete scan')),
+                ('scan_watermark', models.DateTimeField(blank=True, null=True, verbose_name='most recent modification date of the current scan')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+            ],
+        ),
+    ]
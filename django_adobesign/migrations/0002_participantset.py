@@ -0,0 +1,41 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_adobesign', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='agreement',
+            name='status',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=50, verbose_name='AdobeSign status'),
+        ),
+        migrations.CreateModel(
+            name='ParticipantSet',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('participant_set_id', models.CharField(max_length=100, unique=True, verbose_name='AdobeSign participant set id')),
+                ('email', models.EmailField(db_index=True, max_length=254, verbose_name='email of the first member')),
+                ('name', models.CharField(blank=True, default='', max_length=255, verbose_name='name')),
+                ('order', models.PositiveSmallIntegerField(default=0, verbose_name='signing order')),
+                ('role', models.CharField(blank=True, default='', max_length=50, verbose_name='role')),
+                ('status', models.CharField(blank=True, db_index=True, default='', max_length=50, verbose_name='AdobeSign status')),
+                ('synced_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='synchronized at')),
+                ('agreement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participant_sets', to='django_adobesign.agreement')),
+            ],
+            options={
+                'ordering': ['agreement', 'order'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='participantset',
+            index=models.Index(fields=['agreement', 'order'], name='adobesign_participant_order'),
+        ),
+    ]
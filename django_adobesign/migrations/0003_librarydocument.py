@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-19 14:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_adobesign', '0002_participantset'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LibraryDocument',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('template_key', models.CharField(max_length=255, unique=True, verbose_name='template identifier')),
+                ('library_document_id', models.CharField(max_length=100, verbose_name='AdobeSign library document id')),
+                ('checksum', models.CharField(blank=True, default='', max_length=64, verbose_name='checksum of the uploaded template')),
+                ('refreshed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='refreshed at')),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-19 14:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_adobesign', '0003_librarydocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SignatureCreation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('signature_key', models.CharField(max_length=255, unique=True, verbose_name='signature model and primary key')),
+                ('transient_document_id', models.CharField(blank=True, default='', max_length=255, verbose_name='AdobeSign transient document id')),
+                ('agreement_id', models.CharField(blank=True, default='', max_length=100, verbose_name='AdobeSign agreement id')),
+                ('signers_mapped', models.BooleanField(default=False, verbose_name='signers mapped to participant sets')),
+                ('webhook_posted', models.BooleanField(default=False, verbose_name='agreement webhook created')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-19 14:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_adobesign', '0004_signaturecreation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='signaturecreation',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='creation in progress since'),
+        ),
+    ]
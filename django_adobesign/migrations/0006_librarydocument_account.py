@@ -0,0 +1,27 @@
+# Generated by Django 3.2.25 on 2026-10-19 14:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_adobesign', '0005_signaturecreation_claimed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='librarydocument',
+            name='account',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='AdobeSign account and user'),
+        ),
+        migrations.AlterField(
+            model_name='librarydocument',
+            name='template_key',
+            field=models.CharField(max_length=255, verbose_name='template identifier'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='librarydocument',
+            unique_together={('account', 'template_key')},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-19 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_adobesign', '0006_librarydocument_account'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='synccheckpoint',
+            name='failed',
+            field=models.TextField(blank=True, default='', verbose_name='comma separated primary keys of the items to retry'),
+        ),
+    ]
@@ -0,0 +1,163 @@
+"""Local mirror of AdobeSign agreements and participant sets.
+
+Requires ``django_adobesign`` in ``INSTALLED_APPS``. The mirror is kept
+fresh by :class:`~django_adobesign.webhooks.WebhookEventApplier` (with
+``update_mirror``), :class:`~django_adobesign.sync.AgreementSync` (with
+``refresh_participants``) or :func:`refresh_agreement`, so that status
+screens query the local database instead of AdobeSign.
+
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from django_adobesign.models import Agreement, ParticipantSet
+from django_adobesign.webhooks import get_event_agreement, \
+    get_event_participant_sets
+
+#: Participant set status of the signers whose turn it is
+WAITING_STATUSES = ('WAITING_FOR_MY_SIGNATURE', 'WAITING_FOR_MY_APPROVAL',
+                    'WAITING_FOR_MY_ACKNOWLEDGEMENT',
+                    'WAITING_FOR_MY_ACCEPTANCE',
+                    'WAITING_FOR_MY_FORM_FILLING',
+                    'WAITING_FOR_MY_DELEGATION')
+
+
+def get_participant_set_values(participant_set):
+    member = (participant_set.get('memberInfos') or [{}])[0]
+    return {
+        'email': member.get('email', '').lower(),
+        'name': participant_set.get('name') or member.get('name', ''),
+        'order': participant_set.get('order', 0),
+        'role': participant_set.get('role', ''),
+        'status': participant_set.get('status', ''),
+    }
+
+
+@transaction.atomic
+def update_agreement(agreement_id, participant_sets=None, **values):
+    """Create or update mirror of ``agreement_id``.
+
+    ``values`` are :class:`~django_adobesign.models.Agreement` field values.
+    ``participant_sets`` are AdobeSign participant sets, as returned by
+    ``get_members`` or embedded in webhook payloads.
+
+    """
+    now = timezone.now()
+    values['synced_at'] = now
+    agreement, _ = Agreement.objects.update_or_create(
+        agreement_id=agreement_id, defaults=values)
+    if participant_sets is None:
+        return agreement
+
+    participants = {participant_set['id']:
+                    get_participant_set_values(participant_set)
+                    for participant_set in participant_sets
+                    if participant_set.get('id')}
+    existing = ParticipantSet.objects.in_bulk(
+        participants.keys(), field_name='participant_set_id')
+    for participant_set_id, participant_set in existing.items():
+        for field, value in participants[participant_set_id].items():
+            setattr(participant_set, field, value)
+        participant_set.agreement = agreement
+        participant_set.synced_at = now
+    ParticipantSet.objects.bulk_update(
+        existing.values(),
+        ['agreement', 'email', 'name', 'order', 'role', 'status',
+         'synced_at'])
+    ParticipantSet.objects.bulk_create([
+        ParticipantSet(agreement=agreement,
+                       participant_set_id=participant_set_id,
+                       synced_at=now, **value)
+        for participant_set_id, value in participants.items()
+        if participant_set_id not in existing])
+    return agreement
+
+
+def update_from_members(agreement_id, members, **values):
+    """Update mirror of ``agreement_id`` with ``get_members`` response."""
+    return update_agreement(agreement_id,
+                            participant_sets=members.get('participantSets',
+                                                         []),
+                            **values)
+
+
+def update_from_event(event):
+    """Update mirror with a webhook ``event`` payload."""
+    agreement = get_event_agreement(event)
+    if not agreement.get('id'):
+        return None
+    values = {field: agreement[key]
+              for field, key in (('name', 'name'), ('status', 'status'))
+              if agreement.get(key)}
+    return update_agreement(agreement['id'],
+                            participant_sets=get_event_participant_sets(
+                                event),
+                            **values)
+
+
+def update_statuses(pending):
+    """Bulk update mirror statuses with webhook transitions.
+
+    ``pending`` maps agreement ids to ``{participant_set_id: (order,
+    status)}``, ``participant_set_id`` being ``None`` for the agreement
+    status. Unknown agreements are created, unknown participant sets are
+    ignored.
+
+    """
+    now = timezone.now()
+    statuses = {agreement_id: transitions[None][1]
+                for agreement_id, transitions in pending.items()
+                if None in transitions}
+    agreements = Agreement.objects.in_bulk(statuses.keys(),
+                                           field_name='agreement_id')
+    for agreement_id, agreement in agreements.items():
+        agreement.status = statuses[agreement_id]
+        agreement.synced_at = now
+    Agreement.objects.bulk_update(agreements.values(),
+                                  ['status', 'synced_at'])
+    Agreement.objects.bulk_create([
+        Agreement(agreement_id=agreement_id, status=status, synced_at=now)
+        for agreement_id, status in statuses.items()
+        if agreement_id not in agreements])
+
+    participant_statuses = {
+        participant_set_id: status
+        for transitions in pending.values()
+        for participant_set_id, (_, status) in transitions.items()
+        if participant_set_id is not None}
+    participant_sets = ParticipantSet.objects.in_bulk(
+        participant_statuses.keys(), field_name='participant_set_id')
+    for participant_set_id, participant_set in participant_sets.items():
+        participant_set.status = participant_statuses[participant_set_id]
+        participant_set.synced_at = now
+    ParticipantSet.objects.bulk_update(participant_sets.values(),
+                                       ['status', 'synced_at'])
+
+
+def refresh_agreement(backend, agreement_id):
+    """Fetch members of ``agreement_id`` and update its mirror."""
+    return update_from_members(agreement_id,
+                               backend.get_all_signers(agreement_id))
+
+
+def get_participant_sets(agreement_id):
+    """Return mirrored participant sets of ``agreement_id`` in signing
+    order."""
+    return ParticipantSet.objects.filter(
+        agreement__agreement_id=agreement_id).order_by('order')
+
+
+def get_next_participant_set(agreement_id):
+    """Return the mirrored participant set whose turn it is, if any."""
+    return get_participant_sets(agreement_id).filter(
+        status__in=WAITING_STATUSES).first()
+
+
+def get_participant_sets_for_email(email):
+    """Return mirrored participant sets of ``email``, with agreements."""
+    return ParticipantSet.objects.filter(
+        email=email.lower()).select_related('agreement')
+
+
+def get_agreements_by_status(*statuses):
+    return Agreement.objects.filter(status__in=statuses)
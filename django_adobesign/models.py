@@ -0,0 +1,202 @@
+"""Optional models, available when ``django_adobesign`` is in
+``INSTALLED_APPS``."""
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class SyncCheckpoint(models.Model):
+    """Progress of an incremental synchronization with AdobeSign."""
+    name = models.CharField(
+        _('name'),
+        max_length=100,
+        unique=True)
+
+    cursor = models.CharField(
+        _('cursor of the next page of the current scan'),
+        max_length=255,
+        blank=True,
+        default='')
+
+    watermark = models.DateTimeField(
+        _('most recent modification date of the last complete scan'),
+        null=True,
+        blank=True)
+
+    scan_watermark = models.DateTimeField(
+        _('most recent modification date of the current scan'),
+        null=True,
+        blank=True)
+
+    failed = models.TextField(
+        _('comma separated primary keys of the items to retry'),
+        blank=True,
+        default='')
+
+    updated_at = models.DateTimeField(
+        _('updated at'),
+        auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Agreement(models.Model):
+    """Local copy of an AdobeSign agreement."""
+    agreement_id = models.CharField(
+        _('AdobeSign agreement id'),
+        max_length=100,
+        unique=True)
+
+    name = models.CharField(
+        _('name'),
+        max_length=255,
+        blank=True,
+        default='')
+
+    status = models.CharField(
+        _('AdobeSign status'),
+        max_length=50,
+        blank=True,
+        default='',
+        db_index=True)
+
+    display_date = models.DateTimeField(
+        _('AdobeSign display date'),
+        null=True,
+        blank=True)
+
+    synced_at = models.DateTimeField(
+        _('synchronized at'),
+        default=timezone.now)
+
+    def __str__(self):
+        return self.name or self.agreement_id
+
+
+class ParticipantSet(models.Model):
+    """Local copy of an AdobeSign agreement participant set."""
+    agreement = models.ForeignKey(
+        Agreement,
+        on_delete=models.CASCADE,
+        related_name='participant_sets')
+
+    participant_set_id = models.CharField(
+        _('AdobeSign participant set id'),
+        max_length=100,
+        unique=True)
+
+    email = models.EmailField(
+        _('email of the first member'),
+        db_index=True)
+
+    name = models.CharField(
+        _('name'),
+        max_length=255,
+        blank=True,
+        default='')
+
+    order = models.PositiveSmallIntegerField(
+        _('signing order'),
+        default=0)
+
+    role = models.CharField(
+        _('role'),
+        max_length=50,
+        blank=True,
+        default='')
+
+    status = models.CharField(
+        _('AdobeSign status'),
+        max_length=50,
+        blank=True,
+        default='',
+        db_index=True)
+
+    synced_at = models.DateTimeField(
+        _('synchronized at'),
+        default=timezone.now)
+
+    class Meta:
+        ordering = ['agreement', 'order']
+        indexes = [
+            models.Index(fields=['agreement', 'order'],
+                         name='adobesign_participant_order'),
+        ]
+
+    def __str__(self):
+        return self.email
+
+
+class LibraryDocument(models.Model):
+    """AdobeSign library document created for a local template."""
+    account = models.CharField(
+        _('AdobeSign account and user'),
+        max_length=255,
+        blank=True,
+        default='')
+
+    template_key = models.CharField(
+        _('template identifier'),
+        max_length=255)
+
+    library_document_id = models.CharField(
+        _('AdobeSign library document id'),
+        max_length=100)
+
+    checksum = models.CharField(
+        _('checksum of the uploaded template'),
+        max_length=64,
+        blank=True,
+        default='')
+
+    refreshed_at = models.DateTimeField(
+        _('refreshed at'),
+        default=timezone.now)
+
+    class Meta:
+        unique_together = [('account', 'template_key')]
+
+    def __str__(self):
+        return self.template_key
+
+
+class SignatureCreation(models.Model):
+    """Progress of the creation of a signature in AdobeSign, so that a
+    retry resumes from the last completed step."""
+    signature_key = models.CharField(
+        _('signature model and primary key'),
+        max_length=255,
+        unique=True)
+
+    transient_document_id = models.CharField(
+        _('AdobeSign transient document id'),
+        max_length=255,
+        blank=True,
+        default='')
+
+    agreement_id = models.CharField(
+        _('AdobeSign agreement id'),
+        max_length=100,
+        blank=True,
+        default='')
+
+    signers_mapped = models.BooleanField(
+        _('signers mapped to participant sets'),
+        default=False)
+
+    webhook_posted = models.BooleanField(
+        _('agreement webhook created'),
+        default=False)
+
+    claimed_at = models.DateTimeField(
+        _('creation in progress since'),
+        null=True,
+        blank=True)
+
+    updated_at = models.DateTimeField(
+        _('updated at'),
+        auto_now=True)
+
+    def __str__(self):
+        return self.signature_key
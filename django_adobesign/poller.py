@@ -0,0 +1,180 @@
+"""Polling of AdobeSign agreement statuses, for agreements without
+webhooks."""
+import time
+
+from django.utils.dateparse import parse_datetime
+
+from django_adobesign.dispatch import BACKGROUND, priority
+
+#: Agreement statuses after which an agreement is not polled anymore
+TERMINAL_AGREEMENT_STATUSES = ('SIGNED', 'APPROVED', 'ACCEPTED', 'DELIVERED',
+                               'FORM_FILLED', 'ACKNOWLEDGED', 'CANCELLED',
+                               'EXPIRED')
+
+
+def get_timestamp(date):
+    """Return ISO ``date`` string as a timestamp, ``None`` if invalid."""
+    try:
+        return parse_datetime(date).timestamp()
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class RequestBudget(object):
+    """Maximum number of AdobeSign requests allowed for one poll."""
+
+    def __init__(self, max_requests):
+        self.remaining = max_requests
+
+    def consume(self):
+        """Return True and count a request if the budget allows it."""
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+class AgreementPollState(object):
+    def __init__(self, agreement_id, created_at, next_poll_at):
+        self.agreement_id = agreement_id
+        self.created_at = created_at
+        self.next_poll_at = next_poll_at
+        self.status = None
+        self.display_date = None
+        self.checked_at = None
+        self.idle_polls = 0
+
+
+class AgreementStatusPoller(object):
+    """Poll the status of many open agreements within a request budget.
+
+    Each :meth:`poll` walks the agreement listing (one request per page of
+    :attr:`page_size` agreements) to find the tracked agreements whose status
+    or display date changed, then fetches members of changed agreements
+    only. The listing is sorted by most recent display date, so paging stops
+    at the first agreement older than the last check of all due agreements.
+
+    Agreements without activity are polled less and less often, see
+    :meth:`get_poll_interval`. Agreements reaching a terminal status are not
+    tracked anymore.
+
+    """
+
+    def __init__(self, backend, request_budget=100, page_size=100,
+                 min_interval=60, max_interval=6 * 3600, clock=time.time):
+        self.backend = backend
+        self.request_budget = request_budget
+        self.page_size = page_size
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.clock = clock
+        self.states = {}
+
+    def track(self, agreement_id, created_at=None):
+        """Poll ``agreement_id`` until it reaches a terminal status.
+
+        ``created_at`` is the agreement creation timestamp, used to poll old
+        agreements less often.
+
+        """
+        now = self.clock()
+        if agreement_id not in self.states:
+            self.states[agreement_id] = AgreementPollState(
+                agreement_id,
+                created_at if created_at is not None else now,
+                now)
+
+    def untrack(self, agreement_id):
+        self.states.pop(agreement_id, None)
+
+    def get_poll_interval(self, state, now):
+        """Return seconds to wait before polling ``state`` agreement again.
+
+        The interval doubles with each poll without activity and grows with
+        the agreement age (one more ``min_interval`` per day).
+
+        """
+        age_days = max(now - state.created_at, 0) / 86400.
+        interval = self.min_interval * (2 ** min(state.idle_polls, 16)) \
+            + self.min_interval * age_days
+        return min(interval, self.max_interval)
+
+    def get_due_agreements(self, now):
+        return {agreement_id for agreement_id, state in self.states.items()
+                if state.next_poll_at <= now}
+
+    def find_changed_agreements(self, due, budget, **extra_params):
+        """Return ``(changed, checked)`` sets of ``due`` agreement ids.
+
+        Due agreements missing from the listing are unchanged, unless the
+        budget was exhausted before the listing was complete.
+
+        """
+        changed = set()
+        seen = set()
+        cursor = None
+        checked_at = [self.states[agreement_id].checked_at
+                      for agreement_id in due]
+        since = None if None in checked_at else min(checked_at)
+        while seen != due:
+            if not budget.consume():
+                return changed, seen
+            agreements = self.backend.get_agreements(
+                self.page_size, cursor, **extra_params)
+            outdated = False
+            for agreement in agreements['userAgreementList']:
+                display_date = agreement.get('displayDate')
+                timestamp = get_timestamp(display_date)
+                if since is not None and timestamp is not None and \
+                        timestamp < since:
+                    outdated = True
+                state = self.states.get(agreement['id'])
+                if state is None or agreement['id'] not in due:
+                    continue
+                seen.add(agreement['id'])
+                if (agreement.get('status'), display_date) != \
+                        (state.status, state.display_date):
+                    state.status = agreement.get('status')
+                    state.display_date = display_date
+                    changed.add(agreement['id'])
+            cursor = agreements['page'].get('nextCursor')
+            if not cursor or outdated:
+                break
+        return changed, due
+
+    @priority(BACKGROUND)
+    def poll(self, **extra_params):
+        """Return ``{agreement_id: members}`` for changed due agreements.
+
+        ``extra_params`` are passed to the agreement listing. Due agreements
+        which could not be checked within the request budget stay due for
+        the next poll. Calls are made with background priority.
+
+        """
+        now = self.clock()
+        due = self.get_due_agreements(now)
+        if not due:
+            return {}
+        budget = RequestBudget(self.request_budget)
+        changed, checked = self.find_changed_agreements(due, budget,
+                                                        **extra_params)
+
+        results = {}
+        for agreement_id in checked:
+            state = self.states[agreement_id]
+            if agreement_id in changed:
+                if not budget.consume():
+                    # Check it again next poll
+                    state.status = state.display_date = None
+                    continue
+                results[agreement_id] = self.backend.get_all_signers(
+                    agreement_id)
+                state.idle_polls = 0
+            else:
+                state.idle_polls += 1
+            state.checked_at = now
+            if state.status in TERMINAL_AGREEMENT_STATUSES:
+                self.untrack(agreement_id)
+            else:
+                state.next_poll_at = now + self.get_poll_interval(state, now)
+        return results
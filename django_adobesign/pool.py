@@ -0,0 +1,126 @@
+"""Process-wide pool of AdobeSign clients, one per tenant."""
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from django_adobesign.client import AdobeSignClient, get_token_identity
+
+
+class AdobeSignClientPool(object):
+    """Registry of :class:`AdobeSignClient` reusing connections per tenant.
+
+    Clients are keyed by ``(root_url, token identity, api_user,
+    on_behalf_of_user)`` and share a ``requests`` session keeping at most
+    ``pool_maxsize`` connections alive. At most ``max_clients`` clients are
+    kept: the least recently used ones are evicted, as well as clients idle
+    for more than ``max_idle`` seconds. Evicted sessions are closed.
+
+    ``create_dispatcher`` returns the
+    :class:`~django_adobesign.dispatch.PriorityDispatcher` of a new client,
+    e.g. ``lambda: PriorityDispatcher(rate=5)``, so that each tenant
+    shares its own API quota.
+
+    """
+
+    def __init__(self, max_clients=100, max_idle=None, pool_maxsize=10,
+                 create_dispatcher=None, clock=time.time):
+        self.max_clients = max_clients
+        self.max_idle = max_idle
+        self.pool_maxsize = pool_maxsize
+        self.create_dispatcher = create_dispatcher
+        self.clock = clock
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_key(self, root_url, access_token, api_user=None,
+                on_behalf_of_user=None):
+        return ((root_url or '').strip('/'), get_token_identity(access_token),
+                api_user, on_behalf_of_user)
+
+    def create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=self.pool_maxsize)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def get_client(self, root_url, access_token, api_user=None,
+                   on_behalf_of_user=None, **client_kwargs):
+        """Return the client of this tenant, created on first use.
+
+        ``client_kwargs`` are passed to :class:`AdobeSignClient` when the
+        client is created.
+
+        """
+        key = self.get_key(root_url, access_token, api_user,
+                           on_behalf_of_user)
+        evicted = []
+        with self._lock:
+            now = self.clock()
+            evicted.extend(self._evict_idle(now))
+            entry = self._clients.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._clients.move_to_end(key)
+                entry[1] = now
+                client = entry[0]
+            else:
+                self.misses += 1
+                if self.create_dispatcher is not None:
+                    client_kwargs.setdefault('dispatcher',
+                                             self.create_dispatcher())
+                client = AdobeSignClient(
+                    root_url, access_token, api_user=api_user,
+                    on_behalf_of_user=on_behalf_of_user,
+                    session=self.create_session(), **client_kwargs)
+                self._clients[key] = [client, now]
+                while len(self._clients) > self.max_clients:
+                    evicted.append(self._clients.popitem(last=False)[1][0])
+                    self.evictions += 1
+        for evicted_client in evicted:
+            evicted_client.session.close()
+        return client
+
+    def _evict_idle(self, now):
+        if self.max_idle is None:
+            return []
+        evicted = []
+        while self._clients:
+            key, (client, used_at) = next(iter(self._clients.items()))
+            if now - used_at <= self.max_idle:
+                break
+            del self._clients[key]
+            evicted.append(client)
+            self.evictions += 1
+        return evicted
+
+    def clear(self):
+        """Evict all clients."""
+        with self._lock:
+            clients = [client for client, _ in self._clients.values()]
+            self._clients.clear()
+        for client in clients:
+            client.session.close()
+
+    def stats(self):
+        """Return pool statistics."""
+        with self._lock:
+            return {'size': len(self._clients), 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
+
+
+#: Pool shared by the process, see :func:`get_client`
+client_pool = AdobeSignClientPool()
+
+
+def get_client(root_url, access_token, api_user=None, on_behalf_of_user=None,
+               **client_kwargs):
+    """Return a pooled client from the process-wide :data:`client_pool`."""
+    return client_pool.get_client(root_url, access_token, api_user,
+                                  on_behalf_of_user, **client_kwargs)
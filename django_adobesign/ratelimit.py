@@ -0,0 +1,114 @@
+"""Client-side rate limiting of AdobeSign API calls."""
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+
+from django_adobesign.exceptions import AdobeSignMaxApiRateLimitException
+
+
+class RateLimiter(object):
+    """Token bucket allowing ``rate`` calls per second, in bursts of at
+    most ``burst`` calls, shared by threads.
+
+    :meth:`pause` suspends all calls, e.g. for the ``retryAfter`` delay of
+    an AdobeSign rate limit error.
+
+    """
+
+    def __init__(self, rate, burst=None, clock=time.monotonic,
+                 sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst or max(1, rate)
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.burst
+        self.updated_at = clock()
+        self.paused_until = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens +
+                          (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self, tokens=1, reserve=0):
+        """Take ``tokens`` calls if they are allowed now, leaving at least
+        ``reserve`` tokens in the bucket, else return the seconds to wait.
+        """
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            if self.paused_until > now:
+                return self.paused_until - now
+            if self.tokens >= tokens + reserve:
+                self.tokens -= tokens
+                return 0
+            return (tokens + reserve - self.tokens) / self.rate
+
+    @contextmanager
+    def waiting(self, **kwargs):
+        """Context of a call waiting in :meth:`acquire`, ``kwargs`` being
+        the :meth:`try_acquire` arguments."""
+        yield
+
+    def acquire(self, tokens=1, timeout=None, **kwargs):
+        """Wait until ``tokens`` calls are allowed, return True.
+
+        With ``timeout``, return False without waiting when calls are not
+        allowed within ``timeout`` seconds.
+        """
+        wait = self.try_acquire(tokens=tokens, **kwargs)
+        if not wait:
+            return True
+        give_up_at = None if timeout is None else self.clock() + timeout
+        with self.waiting(**kwargs):
+            while wait:
+                if give_up_at is not None and \
+                        self.clock() + wait > give_up_at:
+                    return False
+                self.sleep(wait)
+                wait = self.try_acquire(tokens=tokens, **kwargs)
+        return True
+
+    async def acquire_async(self, tokens=1, timeout=None, **kwargs):
+        """Async :meth:`acquire`, waiting without blocking the event
+        loop."""
+        wait = self.try_acquire(tokens=tokens, **kwargs)
+        if not wait:
+            return True
+        give_up_at = None if timeout is None else self.clock() + timeout
+        with self.waiting(**kwargs):
+            while wait:
+                if give_up_at is not None and \
+                        self.clock() + wait > give_up_at:
+                    return False
+                await asyncio.sleep(wait)
+                wait = self.try_acquire(tokens=tokens, **kwargs)
+        return True
+
+    def pause(self, seconds):
+        """Suspend calls for ``seconds``."""
+        with self._lock:
+            self.paused_until = max(self.paused_until,
+                                    self.clock() + seconds)
+
+
+def call_with_rate_limit(rate_limiter, function, *args, tokens=1,
+                         max_retries=3, **kwargs):
+    """Call ``function`` within ``rate_limiter``.
+
+    ``tokens`` is the number of API calls made by ``function``. On
+    :class:`AdobeSignMaxApiRateLimitException`, calls are paused for its
+    ``retry_after`` seconds and ``function`` is retried, at most
+    ``max_retries`` times.
+
+    """
+    for attempt in range(max_retries + 1):
+        rate_limiter.acquire(tokens=tokens)
+        try:
+            return function(*args, **kwargs)
+        except AdobeSignMaxApiRateLimitException as exception:
+            if attempt == max_retries:
+                raise
+            rate_limiter.pause(exception.retry_after or 1)
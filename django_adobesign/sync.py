@@ -0,0 +1,125 @@
+"""Incremental synchronization of AdobeSign agreements.
+
+Requires ``django_adobesign`` in ``INSTALLED_APPS``.
+
+"""
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from django_adobesign.dispatch import BACKGROUND, priority
+from django_adobesign.mirror import update_from_members
+from django_adobesign.models import Agreement, SyncCheckpoint
+
+
+def get_display_date(agreement):
+    try:
+        return parse_datetime(agreement['displayDate'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class AgreementSync(object):
+    """Copy agreements changed since the last run in :class:`Agreement`.
+
+    The agreement listing is sorted by most recent display date: a run
+    stops at the first agreement not more recent than the watermark of the
+    last complete run. Each page is upserted in the same transaction as the
+    cursor of the next page, so a crashed run resumes from that page.
+
+    With ``refresh_participants``, members of changed agreements are fetched
+    to refresh the participant sets of the mirror
+    (:mod:`django_adobesign.mirror`).
+
+    """
+    fields = ('name', 'status', 'display_date')
+
+    def __init__(self, backend, name='agreements', page_size=100,
+                 refresh_participants=False, **extra_params):
+        self.backend = backend
+        self.refresh_participants = refresh_participants
+        self.name = name
+        self.page_size = page_size
+        self.extra_params = extra_params
+
+    def get_checkpoint(self):
+        checkpoint, _ = SyncCheckpoint.objects.get_or_create(name=self.name)
+        return checkpoint
+
+    def get_agreement_values(self, agreement):
+        """Return :class:`Agreement` field values for ``agreement`` listing
+        item."""
+        return {
+            'name': agreement.get('name', ''),
+            'status': agreement.get('status', ''),
+            'display_date': get_display_date(agreement),
+        }
+
+    def upsert(self, agreements):
+        """Create or update :class:`Agreement` rows for ``agreements``."""
+        now = timezone.now()
+        values = {agreement['id']: self.get_agreement_values(agreement)
+                  for agreement in agreements}
+        existing = Agreement.objects.in_bulk(values.keys(),
+                                             field_name='agreement_id')
+        for agreement_id, agreement in existing.items():
+            for field, value in values[agreement_id].items():
+                setattr(agreement, field, value)
+            agreement.synced_at = now
+        Agreement.objects.bulk_update(existing.values(),
+                                      list(self.fields) + ['synced_at'])
+        Agreement.objects.bulk_create([
+            Agreement(agreement_id=agreement_id, synced_at=now, **value)
+            for agreement_id, value in values.items()
+            if agreement_id not in existing])
+
+    @priority(BACKGROUND)
+    def run(self, max_pages=None):
+        """Synchronize agreements, return the number of upserted ones.
+
+        ``max_pages`` limits the pages fetched by this call, the next call
+        resumes the scan. Calls are made with background priority.
+
+        """
+        checkpoint = self.get_checkpoint()
+        upserted = 0
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            agreements = self.backend.get_agreements(
+                self.page_size, checkpoint.cursor or None,
+                **self.extra_params)
+            pages += 1
+            changed = []
+            complete = not agreements['page'].get('nextCursor')
+            for agreement in agreements['userAgreementList']:
+                display_date = get_display_date(agreement)
+                if checkpoint.watermark and display_date and \
+                        display_date <= checkpoint.watermark:
+                    complete = True
+                    break
+                changed.append(agreement)
+                if display_date and (checkpoint.scan_watermark is None or
+                                     display_date >
+                                     checkpoint.scan_watermark):
+                    checkpoint.scan_watermark = display_date
+
+            members = {}
+            if self.refresh_participants:
+                members = {agreement['id']: self.backend.get_all_signers(
+                    agreement['id']) for agreement in changed}
+            with transaction.atomic():
+                self.upsert(changed)
+                for agreement_id, agreement_members in members.items():
+                    update_from_members(agreement_id, agreement_members)
+                if complete:
+                    checkpoint.cursor = ''
+                    checkpoint.watermark = checkpoint.scan_watermark or \
+                        checkpoint.watermark
+                    checkpoint.scan_watermark = None
+                else:
+                    checkpoint.cursor = agreements['page']['nextCursor']
+                checkpoint.save()
+            upserted += len(changed)
+            if complete:
+                break
+        return upserted
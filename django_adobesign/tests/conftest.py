@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from adobesign.models import Signer, Signature, SignatureType
+
+from django_adobesign.backend import AdobeSignBackend
+from django_adobesign.client import AdobeSignClient
+from django_adobesign.events import agreement_event_store
+
+
+class StubServer(object):
+    """Local HTTP server answering AdobeSign API paths with canned
+    responses, after an optional delay."""
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.uploads = []
+        self.connections = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                server.connections += 1
+                super().setup()
+
+            def do_GET(self):
+                server.requests.append(self.path)
+                path = self.path.split('?')[0]
+                status, body, delay = server.routes.get(
+                    path, (404, {'code': 'NOT_FOUND', 'message': ''}, 0))
+                if callable(delay):
+                    delay = delay()
+                time.sleep(delay)
+                if not isinstance(body, bytes):
+                    body = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                # Read the body by chunks, only keep its size
+                length = int(self.headers.get('Content-Length', 0))
+                size = 0
+                while size < length:
+                    size += len(self.rfile.read(min(64 * 1024,
+                                                    length - size)))
+                server.uploads.append((self.path, size))
+                self.do_GET()
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.root_url = 'http://127.0.0.1:{}'.format(
+            self.httpd.server_address[1])
+
+    def add(self, path, body, status=200, delay=0):
+        self.routes['/api/rest/v6/' + path] = (status, body, delay)
+
+
+@pytest.fixture(autouse=True)
+def clear_agreement_event_store():
+    """Do not share cached events between tests."""
+    yield
+    agreement_event_store.clear()
+
+
+@pytest.fixture()
+def adobe_sign_backend():
+    adobe_sign_client = AdobeSignClient(root_url='http://fake',
+                                        access_token='ThisIsAToken')
+    return AdobeSignBackend(adobe_sign_client)
+
+
+@pytest.fixture()
+def stub_server():
+    server = StubServer()
+    thread = threading.Thread(target=server.httpd.serve_forever,
+                              daemon=True)
+    thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture()
+def signature():
+    """Signature of agreement ``a1`` with signers ``p1`` and ``p2``."""
+    signature_type = SignatureType.objects.create(
+        signature_backend_code='adobesign')
+    signature = Signature.objects.create(signature_type=signature_type,
+                                         signature_backend_id='a1')
+    for order in (1, 2):
+        Signer.objects.create(signature=signature, signing_order=order,
+                              full_name='Poney', email='poney@plop.com',
+                              signature_backend_id='p{}'.format(order))
+    signature._signature_backend = AdobeSignBackend(
+        AdobeSignClient(root_url='http://fake', access_token='token'))
+    return signature
@@ -1,18 +1,23 @@
+import io
+import time
+from datetime import timedelta
+
 import pytest
 from adobesign.models import Signer, Signature, SignatureType
+from django.core.cache import caches
 from django.core.files import File
+from django.db import transaction
 from django.db.models import FileField
+from django.utils import timezone
 
 from django_adobesign.backend import AdobeSignBackend
 from django_adobesign.client import AdobeSignClient
-from django_adobesign.exceptions import AdobeSignNoMoreSignerException
-
-
-@pytest.fixture()
-def adobe_sign_backend():
-    adobe_sign_client = AdobeSignClient(root_url='http://fake',
-                                        access_token='ThisIsAToken')
-    return AdobeSignBackend(adobe_sign_client)
+from django_adobesign.concurrency import BACKGROUND_WORKERS, \
+    run_in_background
+from django_adobesign.exceptions import AdobeSignException, \
+    AdobeSignNoMoreSignerException
+from django_adobesign.models import LibraryDocument, SignatureCreation
+from django_adobesign.ratelimit import RateLimiter
 
 
 @pytest.fixture()
@@ -221,3 +226,516 @@ def test_map_adobe_signer_to_signer(mocker, adobe_sign_backend,
     assert signer1.current_status == "NOT_YET_VISIBLE"
     assert signer2.current_status == "NOT_YET_VISIBLE"
     assert signer3.current_status == "NOT_YET_VISIBLE"
+
+
+@pytest.mark.django_db
+def test_create_signature_webhook_options(mocker, minimal_signature,
+                                          adobe_sign_backend):
+    mocker.patch.object(AdobeSignClient, 'upload_document',
+                        return_value={'transientDocumentId': 'doc_id'})
+    mocker.patch.object(AdobeSignClient, 'post_agreement',
+                        return_value={'id': 'test_agreement_id'})
+    mocker.patch.object(AdobeSignClient, 'get_members', return_value={})
+    mocked_post_webhooks = mocker.patch.object(
+        AdobeSignClient, 'post_webhooks')
+
+    adobe_sign_backend.create_signature(
+        minimal_signature, 'https://test.com/handler',
+        webhook_events=['AGREEMENT_WORKFLOW_COMPLETED'],
+        webhook_options={'include_participants_info': True})
+
+    mocked_post_webhooks.assert_called_once_with(
+        agreement_id='test_agreement_id',
+        webhook_handler_url='https://test.com/handler',
+        events=['AGREEMENT_WORKFLOW_COMPLETED'],
+        include_participants_info=True,
+    )
+
+
+@pytest.mark.django_db
+def test_map_adobe_signer_to_signer_from_payload(mocker, adobe_sign_backend,
+                                                 minimal_signature):
+    signer = Signer(full_name='Poney poney', email='poney@plop.com',
+                    signing_order=1, signature=minimal_signature)
+    signer.save()
+    mocked_get_members = mocker.patch.object(AdobeSignClient, 'get_members')
+
+    adobe_sign_backend.map_adobe_signer_to_signer(
+        minimal_signature,
+        participant_sets=[{'memberInfos': [{'email': 'Poney@plop.com'}],
+                           'id': 'foo1',
+                           'order': 1}])
+
+    signer.refresh_from_db()
+    assert signer.signature_backend_id == 'foo1'
+    assert not mocked_get_members.called
+
+
+def test_get_documents_concurrently_speed_up(stub_server):
+    delay = 0.2
+    stub_server.add('agreements/a1/documents', {'documents': [
+        {'id': 'doc{}'.format(index)} for index in range(4)]})
+    for index in range(4):
+        stub_server.add('agreements/a1/documents/doc{}'.format(index),
+                        'content {}'.format(index).encode(), delay=delay)
+    backend = AdobeSignBackend(AdobeSignClient(
+        root_url=stub_server.root_url, access_token='ThisIsAToken'))
+    expected = [b'content 0', b'content 1', b'content 2', b'content 3']
+
+    start = time.perf_counter()
+    assert list(backend.get_documents('a1')) == expected
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assert backend.get_documents_concurrently('a1', max_workers=4) == \
+        expected
+    concurrent = time.perf_counter() - start
+
+    assert sequential >= 4 * delay
+    assert concurrent < 2 * delay
+
+
+def test_get_documents_concurrently_streams_to_files(stub_server):
+    stub_server.add('agreements/a1/documents', {'documents': [
+        {'id': 'doc1'}, {'id': 'doc2'}]})
+    stub_server.add('agreements/a1/documents/doc1', b'first', delay=0.05)
+    stub_server.add('agreements/a1/documents/doc2', b'second')
+    backend = AdobeSignBackend(AdobeSignClient(
+        root_url=stub_server.root_url, access_token='ThisIsAToken'))
+
+    files = backend.get_documents_concurrently(
+        'a1', open_file=lambda doc_info: io.BytesIO())
+    assert [fileobj.getvalue() for fileobj in files] == [
+        b'first', b'second']
+
+
+def test_get_refuse_comment_is_cached(mocker, adobe_sign_backend):
+    mocked_get_events = mocker.patch.object(
+        AdobeSignClient, 'get_events',
+        return_value={'events': [{'type': 'CREATED'},
+                                 {'type': 'REJECTED', 'comment': 'no'}]})
+    assert adobe_sign_backend.get_refuse_comment('12') == 'no'
+    assert adobe_sign_backend.get_refuse_comment('12') == 'no'
+    assert len(adobe_sign_backend.get_events('12')) == 2
+    assert mocked_get_events.call_count == 1
+
+
+def test_events_are_shared_by_backends_of_a_tenant(mocker):
+    mocked_get_events = mocker.patch.object(
+        AdobeSignClient, 'get_events',
+        return_value={'events': [{'type': 'REJECTED', 'comment': 'no'}]})
+
+    def get_backend(access_token):
+        # django-anysign creates a backend per signature type instance
+        return AdobeSignBackend(AdobeSignClient(root_url='http://fake',
+                                                access_token=access_token))
+
+    assert get_backend('ThisIsAToken').get_refuse_comment('12') == 'no'
+    assert get_backend('ThisIsAToken').get_refuse_comment('12') == 'no'
+    assert mocked_get_events.call_count == 1
+    # Other tenants do not read cached events
+    get_backend('OtherToken').get_events('12')
+    assert mocked_get_events.call_count == 2
+
+
+def test_get_refuse_comment_without_rejection(mocker, adobe_sign_backend):
+    mocked_get_events = mocker.patch.object(
+        AdobeSignClient, 'get_events',
+        return_value={'events': [{'id': 'e1', 'type': 'CREATED'}]})
+    assert adobe_sign_backend.get_refuse_comment('12') is None
+
+    # Events cached before the rejection are fetched again
+    mocked_get_events.return_value = {'events': [
+        {'id': 'e1', 'type': 'CREATED'},
+        {'id': 'e2', 'type': 'REJECTED', 'comment': 'first'},
+        {'id': 'e3', 'type': 'REJECTED', 'comment': 'second'}]}
+    assert adobe_sign_backend.get_refuse_comment('12') == 'first'
+
+
+def test_get_agreement_snapshot(stub_server):
+    delay = 0.2
+    stub_server.add('agreements/a1/members',
+                    {'participantSets': [{'id': 'p1'}]}, delay=delay)
+    stub_server.add('agreements/a1/signingUrls',
+                    {'code': 'AGREEMENT_NOT_SIGNABLE', 'message': 'signed'},
+                    status=404, delay=delay)
+    stub_server.add('agreements/a1/events',
+                    {'events': [{'type': 'CREATED'}]}, delay=delay)
+    stub_server.add('agreements/a1/documents',
+                    {'documents': [{'id': 'doc1'}]}, delay=delay)
+    backend = AdobeSignBackend(AdobeSignClient(
+        root_url=stub_server.root_url, access_token='ThisIsAToken'))
+
+    start = time.perf_counter()
+    snapshot = backend.get_agreement_snapshot('a1')
+    duration = time.perf_counter() - start
+
+    assert snapshot['agreement_id'] == 'a1'
+    assert snapshot['members'] == {'participantSets': [{'id': 'p1'}]}
+    assert snapshot['events'] == [{'type': 'CREATED'}]
+    assert snapshot['documents'] == [{'id': 'doc1'}]
+    # Partial failure
+    assert snapshot['signing_urls'] is None
+    assert isinstance(snapshot['errors']['signing_urls'],
+                      AdobeSignNoMoreSignerException)
+    assert set(snapshot['errors']) == {'signing_urls'}
+    assert set(snapshot['timings']) == {'members', 'signing_urls', 'events',
+                                        'documents'}
+    assert all(timing >= delay for timing in snapshot['timings'].values())
+    # Calls are concurrent: max() latency instead of sum()
+    assert duration < 2 * delay
+
+
+@pytest.mark.django_db
+def test_create_mega_signature(mocker, adobe_sign_backend,
+                               minimal_signature):
+    signatures = []
+    for index in range(3):
+        signature = Signature.objects.create(
+            signature_type=minimal_signature.signature_type,
+            document=minimal_signature.document)
+        Signer.objects.create(signature=signature, signing_order=1,
+                              full_name='Poney',
+                              email='poney{}@plop.com'.format(index % 2))
+        signatures.append(signature)
+    mocked_upload = mocker.patch.object(
+        AdobeSignClient, 'upload_document',
+        side_effect=[{'transientDocumentId': 'doc_id'},
+                     {'transientDocumentId': 'csv_id'}])
+    mocked_post_mega_sign = mocker.patch.object(
+        AdobeSignClient, 'post_mega_sign', return_value={'id': 'mega_id'})
+    mocker.patch.object(
+        AdobeSignClient, 'get_mega_sign_agreements',
+        return_value={'agreementList': [{'id': 'child0'}, {'id': 'child1'}],
+                      'page': {}})
+    members = {
+        'child0': 'Poney0@plop.com',
+        'child1': 'poney1@plop.com',
+        'child2': 'poney0@plop.com',
+    }
+    mocked_get_members = mocker.patch.object(
+        AdobeSignClient, 'get_members',
+        side_effect=lambda agreement_id, include_next_participant_set: {
+            'participantSets': [{
+                'id': 'participant-' + agreement_id,
+                'memberInfos': [{'email': members[agreement_id]}]}]})
+
+    mega_sign_id = adobe_sign_backend.create_mega_signature(
+        signatures, name='Contract')
+
+    assert mega_sign_id == 'mega_id'
+    assert mocked_upload.call_count == 2
+    recipients = mocked_upload.call_args_list[1][0][0]
+    assert recipients.bytes == \
+        b'email\r\nponey0@plop.com\r\nponey1@plop.com\r\nponey0@plop.com\r\n'
+    assert mocked_upload.call_args_list[1][1] == {'mime_type': 'text/csv'}
+    assert mocked_post_mega_sign.call_args[1][
+        'recipients_transient_document_id'] == 'csv_id'
+    for signature in signatures:
+        signature.refresh_from_db()
+    assert [signature.signature_backend_id for signature in signatures] == \
+        ['child0', 'child1', '']
+    assert signatures[1].signers.get().signature_backend_id == \
+        'participant-child1'
+
+    # Child agreements created later are mapped on next call
+    mocker.patch.object(
+        AdobeSignClient, 'get_mega_sign_agreements',
+        return_value={'agreementList': [{'id': 'child0'}, {'id': 'child1'},
+                                        {'id': 'child2'}],
+                      'page': {}})
+    assert adobe_sign_backend.map_mega_sign_agreements(
+        'mega_id', signatures) == 1
+    assert mocked_get_members.call_count == 3
+    signatures[2].refresh_from_db()
+    assert signatures[2].signature_backend_id == 'child2'
+
+
+@pytest.mark.django_db
+def test_create_mega_signature_requires_one_signer(mocker, adobe_sign_backend,
+                                                   minimal_signature):
+    signature = Signature.objects.create(
+        signature_type=minimal_signature.signature_type,
+        document=minimal_signature.document)
+    for index in range(2):
+        Signer.objects.create(signature=signature, signing_order=index + 1,
+                              full_name='Poney', email='poney@plop.com')
+    mocked_upload = mocker.patch.object(AdobeSignClient, 'upload_document')
+    with pytest.raises(AdobeSignException) as excinfo:
+        adobe_sign_backend.create_mega_signature([signature],
+                                                 name='Contract')
+    assert 'MegaSign signature {} has 2 signers'.format(signature.pk) in \
+        str(excinfo.value)
+    assert not mocked_upload.called
+
+
+@pytest.mark.django_db
+def test_create_signature_from_library_document(mocker, minimal_signature,
+                                                adobe_sign_backend):
+    mocked_upload = mocker.patch.object(
+        AdobeSignClient, 'upload_document',
+        return_value={'transientDocumentId': 'doc_id'})
+    mocked_post_library_document = mocker.patch.object(
+        AdobeSignClient, 'post_library_document',
+        side_effect=[{'id': 'library_id'}, {'id': 'library_id2'}])
+    mocked_post_agreement = mocker.patch.object(
+        AdobeSignClient, 'post_agreement',
+        return_value={'id': 'test_agreement_id'})
+    mocker.patch.object(AdobeSignClient, 'get_members', return_value={})
+    mocker.patch.object(AdobeSignClient, 'post_webhooks')
+    document = File(io.BytesIO(b'%PDF-1.4'), name='contract.pdf')
+    document.bytes = document
+    mocker.patch.object(Signature, 'signature_documents',
+                        side_effect=lambda: iter([document]))
+    users = {'Bearer ThisIsAToken': {'id': 'u1', 'accountId': 'acc1'},
+             'Bearer OtherToken': {'id': 'u2', 'accountId': 'acc2'}}
+    mocked_get = mocker.patch('requests.get', side_effect=lambda url, headers,
+                              timeout: mocker.Mock(
+                                  status_code=200, headers={},
+                                  json=lambda: users[headers[
+                                      'Authorization']]))
+
+    for _ in range(2):
+        adobe_sign_backend.create_signature(
+            minimal_signature, 'https://test.com/handler',
+            template_key='contract')
+    # The template is uploaded once
+    assert mocked_upload.call_count == 1
+    assert mocked_post_library_document.call_count == 1
+    assert mocked_post_agreement.call_args[1]['transient_document_id'] is None
+    assert mocked_post_agreement.call_args[1]['library_document_id'] == \
+        'library_id'
+
+    # A new library document is created when the template changed
+    assert adobe_sign_backend.get_library_document_id(
+        'contract', document, checksum='changed') == 'library_id2'
+    assert LibraryDocument.objects.get().checksum == 'changed'
+
+    # Library documents of another tenant on the same access point are not
+    # reused
+    mocked_post_library_document.side_effect = [{'id': 'other_id'}]
+    other_backend = AdobeSignBackend(AdobeSignClient(
+        root_url='http://fake', access_token='OtherToken'))
+    assert other_backend.get_library_document_id(
+        'contract', document, checksum='changed') == 'other_id'
+    assert LibraryDocument.objects.get(
+        account='acc2:u2').library_document_id == 'other_id'
+    assert adobe_sign_backend.get_library_document_id(
+        'contract', document, checksum='changed') == 'library_id2'
+    # The user is fetched once per client
+    assert mocked_get.call_count == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_create_signature_resumes(mocker, minimal_signature,
+                                  adobe_sign_backend):
+    mocked_upload = mocker.patch.object(
+        AdobeSignClient, 'upload_document',
+        return_value={'transientDocumentId': 'doc_id'})
+    mocked_post_agreement = mocker.patch.object(
+        AdobeSignClient, 'post_agreement',
+        side_effect=[AdobeSignException('outage'),
+                     {'id': 'test_agreement_id'},
+                     {'id': 'test_agreement_id2'}])
+    mocked_get_members = mocker.patch.object(
+        AdobeSignClient, 'get_members', return_value={})
+    mocked_post_webhooks = mocker.patch.object(
+        AdobeSignClient, 'post_webhooks',
+        side_effect=[AdobeSignException('outage'), None, None])
+
+    for _ in range(2):
+        with pytest.raises(AdobeSignException):
+            adobe_sign_backend.create_signature(
+                minimal_signature, 'https://test.com/handler')
+    progress = SignatureCreation.objects.get()
+    assert progress.transient_document_id == 'doc_id'
+    assert progress.agreement_id == 'test_agreement_id'
+    assert progress.signers_mapped
+    assert not progress.webhook_posted
+
+    # Retries resume from the last completed step
+    for _ in range(2):
+        adobe_sign_backend.create_signature(
+            minimal_signature, 'https://test.com/handler')
+    minimal_signature.refresh_from_db()
+    assert minimal_signature.signature_backend_id == 'test_agreement_id'
+    assert mocked_upload.call_count == 1
+    assert mocked_post_agreement.call_count == 2
+    assert mocked_get_members.call_count == 1
+    assert mocked_post_webhooks.call_count == 2
+
+    # The signature is sent again once its agreement id is cleared
+    minimal_signature.signature_backend_id = ''
+    adobe_sign_backend.create_signature(
+        minimal_signature, 'https://test.com/handler')
+    assert minimal_signature.signature_backend_id == 'test_agreement_id2'
+    assert mocked_upload.call_count == 2
+
+
+@pytest.mark.django_db
+def test_create_signature_in_atomic_block(mocker, minimal_signature,
+                                          adobe_sign_backend):
+    mocker.patch.object(AdobeSignClient, 'upload_document',
+                        return_value={'transientDocumentId': 'doc_id'})
+    mocker.patch.object(AdobeSignClient, 'post_agreement',
+                        return_value={'id': 'test_agreement_id'})
+    mocker.patch.object(AdobeSignClient, 'get_members', return_value={})
+    mocker.patch.object(AdobeSignClient, 'post_webhooks')
+    # Tests run in a transaction, like requests with ATOMIC_REQUESTS:
+    # progress would be rolled back with it, so it is not recorded
+    assert transaction.get_connection().in_atomic_block
+    adobe_sign_backend.create_signature(minimal_signature,
+                                        'https://test.com/handler')
+    assert minimal_signature.signature_backend_id == 'test_agreement_id'
+    assert not SignatureCreation.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_create_signature(mocker, minimal_signature,
+                                     adobe_sign_backend):
+    mocker.patch.object(AdobeSignClient, 'upload_document',
+                        return_value={'transientDocumentId': 'doc_id'})
+    mocker.patch.object(AdobeSignClient, 'get_members', return_value={})
+    mocker.patch.object(AdobeSignClient, 'post_webhooks')
+    concurrent_errors = []
+
+    def post_agreement(**kwargs):
+        # Another retry comes in while the agreement is being created
+        try:
+            adobe_sign_backend.create_signature(
+                minimal_signature, 'https://test.com/handler')
+        except AdobeSignException as exception:
+            concurrent_errors.append(exception)
+        return {'id': 'test_agreement_id'}
+
+    mocked_post_agreement = mocker.patch.object(
+        AdobeSignClient, 'post_agreement', side_effect=post_agreement)
+    adobe_sign_backend.create_signature(minimal_signature,
+                                        'https://test.com/handler')
+    assert mocked_post_agreement.call_count == 1
+    assert len(concurrent_errors) == 1
+    progress = SignatureCreation.objects.get()
+    assert progress.webhook_posted
+    assert progress.claimed_at is None
+
+    # The claim of a crashed creation expires
+    minimal_signature.signature_backend_id = ''
+    SignatureCreation.objects.update(
+        claimed_at=timezone.now() - timedelta(hours=1))
+    mocked_post_agreement.side_effect = None
+    mocked_post_agreement.return_value = {'id': 'test_agreement_id2'}
+    adobe_sign_backend.create_signature(minimal_signature,
+                                        'https://test.com/handler')
+    assert minimal_signature.signature_backend_id == 'test_agreement_id2'
+
+
+def test_prefetch_next_signer_url(mocker):
+    adobe_sign_client = AdobeSignClient(root_url='http://fake',
+                                        access_token='ThisIsAToken')
+    adobe_sign_backend = AdobeSignBackend(adobe_sign_client,
+                                          signing_url_cache='default')
+    signing_urls = {'signingUrlSetInfos': [{'signingUrls': [
+        {'email': 'poney@plop.com', 'esignUrl': 'https://sign'}]}]}
+    # AdobeSign does not know the agreement right after creation
+    mocked_get_signing_url = mocker.patch.object(
+        AdobeSignClient, 'get_signing_url',
+        side_effect=[AdobeSignException('not yet'), signing_urls])
+    future = adobe_sign_backend.prefetch_next_signer_url('a1', delay=0.01)
+    assert future.result() == ('poney@plop.com', 'https://sign')
+
+    # Served from cache
+    assert adobe_sign_backend.get_next_signer_url('a1') == \
+        ('poney@plop.com', 'https://sign')
+    assert mocked_get_signing_url.call_count == 2
+
+    adobe_sign_backend.invalidate_next_signer_url('a1')
+    mocked_get_signing_url.side_effect = None
+    mocked_get_signing_url.return_value = {'signingUrlSetInfos': []}
+    assert adobe_sign_backend.get_next_signer_url('a1') == (None, None)
+    assert mocked_get_signing_url.call_count == 3
+
+
+def test_prefetch_retries_do_not_hold_workers(mocker):
+    adobe_sign_client = AdobeSignClient(root_url='http://fake',
+                                        access_token='ThisIsAToken')
+    adobe_sign_backend = AdobeSignBackend(adobe_sign_client,
+                                          signing_url_cache='default')
+    mocker.patch.object(AdobeSignClient, 'get_signing_url',
+                        side_effect=AdobeSignException('not yet'))
+    futures = [adobe_sign_backend.prefetch_next_signer_url(
+        'a{}'.format(index), attempts=2, delay=1.)
+        for index in range(BACKGROUND_WORKERS + 1)]
+    # Other background tasks run while prefetches wait for their retry
+    assert run_in_background(sum, [1, 2]).result(timeout=0.5) == 3
+    with pytest.raises(AdobeSignException):
+        futures[0].result(timeout=5)
+
+
+def test_prefetch_stops_without_signer(mocker, adobe_sign_backend):
+    adobe_sign_backend.signing_url_cache = caches['default']
+    mocked_get_signing_url = mocker.patch.object(
+        AdobeSignClient, 'get_signing_url',
+        side_effect=AdobeSignNoMoreSignerException('completed'))
+    future = adobe_sign_backend.prefetch_next_signer_url('a1', delay=0.01)
+    assert future.result(timeout=5) == (None, None)
+    assert mocked_get_signing_url.call_count == 1
+
+
+def test_next_signer_url_is_not_cached_by_default(mocker,
+                                                  adobe_sign_backend):
+    assert adobe_sign_backend.prefetch_next_signer_url('a1') is None
+    mocked_get_signing_url = mocker.patch.object(
+        AdobeSignClient, 'get_signing_url', return_value={})
+    adobe_sign_backend.get_next_signer_url('a1')
+    adobe_sign_backend.get_next_signer_url('a1')
+    assert mocked_get_signing_url.call_count == 2
+
+
+def test_update_agreements_state(mocker, adobe_sign_backend):
+    errors = {'a2': AdobeSignException('not cancellable'),
+              'a4': ValueError('unexpected response')}
+
+    def update_agreement_state(agreement_id, *args, **kwargs):
+        if agreement_id in errors:
+            raise errors[agreement_id]
+
+    mocked_update = mocker.patch.object(
+        AdobeSignClient, 'update_agreement_state',
+        side_effect=update_agreement_state)
+    rate_limiter = RateLimiter(rate=100)
+    mocked_acquire = mocker.spy(rate_limiter, 'acquire')
+
+    outcome = adobe_sign_backend.update_agreements_state(
+        ['a1', 'a2', 'a3', 'a4'], 'CANCELLED', comment='Expired',
+        rate_limiter=rate_limiter)
+
+    assert outcome == {'results': {'a1': None, 'a3': None},
+                       'errors': errors}
+    assert mocked_update.call_count == 4
+    # Calls share the given rate limiter
+    assert mocked_acquire.call_count == 4
+    mocked_update.assert_any_call('a3', 'CANCELLED', comment='Expired',
+                                  notify_others=True)
+
+
+def test_remind_agreements(mocker, adobe_sign_backend):
+    members = {
+        'a1': {'participantSets': [
+            {'status': 'COMPLETED', 'memberInfos': [{'id': 'm1'}]},
+            {'status': 'WAITING_FOR_MY_SIGNATURE',
+             'memberInfos': [{'id': 'm2'}]}]},
+        'a2': {'participantSets': [
+            {'status': 'COMPLETED', 'memberInfos': [{'id': 'm3'}]}]},
+    }
+    mocker.patch.object(
+        AdobeSignClient, 'get_members',
+        side_effect=lambda agreement_id, **kwargs: members[agreement_id])
+    mocked_post_reminder = mocker.patch.object(
+        AdobeSignClient, 'post_reminder', return_value={'id': 'r1'})
+
+    outcome = adobe_sign_backend.remind_agreements(['a1', 'a2'],
+                                                   note='Please sign')
+
+    assert outcome == {'results': {'a1': 'r1', 'a2': None}, 'errors': {}}
+    mocked_post_reminder.assert_called_once_with('a1', ['m2'],
+                                                 note='Please sign')
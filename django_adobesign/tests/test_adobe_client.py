@@ -1,8 +1,15 @@
+import io
+import json
+import tracemalloc
+
 import pytest
 from requests import Response
 
 from django_adobesign.client import AdobeSignOAuthSession, \
-    ADOBE_OAUTH_TOKEN_URL, AdobeSignClient, ADOBE_OAUTH_REFRESH_TOKEN_URL
+    ADOBE_OAUTH_TOKEN_URL, AdobeSignClient, ADOBE_OAUTH_REFRESH_TOKEN_URL, \
+    WEBHOOK_EVENTS_COMPLETION, get_content_size
+from django_adobesign.concurrency import map_in_threads
+from django_adobesign.discovery import BASE_URIS_URL, BaseUriCache
 from django_adobesign.exceptions import AdobeSignException, \
     AdobeSignNoMoreSignerException, AdobeSignInvalidAccessTokenException, \
     AdobeSignInvalidUserException, AdobeSignMaxApiRateLimitException
@@ -481,6 +488,44 @@ def test_update_signer(mocker, adobe_sign_client, expected_headers):
     }
 
 
+def test_update_agreement_state(mocker, adobe_sign_client, expected_headers):
+    mocked_put = mocker.patch("requests.put")
+
+    adobe_sign_client.update_agreement_state(
+        agreement_id="42", state="CANCELLED", comment="Expired",
+        notify_others=False)
+
+    assert mocked_put.call_args[0] == (
+        "http://test/api/rest/v6/agreements/42/state",
+    )
+    assert mocked_put.call_args[1] == {
+        "headers": expected_headers,
+        "json": {"state": "CANCELLED",
+                 "agreementCancellationInfo": {"notifyOthers": False,
+                                               "comment": "Expired"}},
+        'timeout': 15
+    }
+
+
+def test_post_reminder(mocker, adobe_sign_client, expected_headers):
+    mocked_post = mocker.patch("requests.post")
+    mocked_post.return_value.json.return_value = {"id": "reminder_id"}
+
+    assert adobe_sign_client.post_reminder(
+        agreement_id="42", participant_ids=["m1"], note="Please sign"
+    ) == {"id": "reminder_id"}
+
+    assert mocked_post.call_args[0] == (
+        "http://test/api/rest/v6/agreements/42/reminders",
+    )
+    assert mocked_post.call_args[1] == {
+        "headers": expected_headers,
+        "json": {"recipientParticipantIds": ["m1"], "status": "ACTIVE",
+                 "note": "Please sign"},
+        'timeout': 15
+    }
+
+
 @pytest.mark.parametrize('error_code', (404, 500))
 def test_update_signer_client_or_server_error(
     error_code, mocker, response_with_error, adobe_sign_client
@@ -528,3 +573,310 @@ def test_post_webhooks(mocker, adobe_sign_client, expected_headers):
         },
         'timeout': 15
     }
+
+
+def test_post_webhooks_conditional_params(mocker, adobe_sign_client):
+    mocked_post = mocker.patch('requests.post')
+    adobe_sign_client.post_webhooks(
+        agreement_id='test-id',
+        webhook_handler_url='https://test.com/handler',
+        include_participants_info=True,
+        include_signed_documents=True,
+    )
+
+    data = mocked_post.call_args[1]['json']
+    assert data['webhookConditionalParams'] == {
+        'webhookAgreementEvents': {
+            'includeDetailedInfo': False,
+            'includeParticipantsInfo': True,
+            'includeSignedDocuments': True,
+        }
+    }
+
+
+def test_post_webhooks_events(mocker, adobe_sign_client):
+    mocked_post = mocker.patch('requests.post')
+    adobe_sign_client.post_webhooks(
+        agreement_id='test-id',
+        webhook_handler_url='https://test.com/handler',
+        events=WEBHOOK_EVENTS_COMPLETION,
+    )
+
+    data = mocked_post.call_args[1]['json']
+    assert data['webhookSubscriptionEvents'] == [
+        'AGREEMENT_WORKFLOW_COMPLETED', 'AGREEMENT_REJECTED',
+        'AGREEMENT_EXPIRED', 'AGREEMENT_RECALLED']
+
+
+def test_download_document(mocker, adobe_sign_client, expected_headers):
+    mocked_get = mocker.patch('requests.get')
+    response = mocked_get.return_value.__enter__.return_value
+    response.iter_content.return_value = [b'%PDF', b'-1.4']
+    fileobj = io.BytesIO()
+
+    size = adobe_sign_client.download_document('test_agreement_id',
+                                               'test_doc_id', fileobj)
+
+    assert size == 8
+    assert fileobj.getvalue() == b'%PDF-1.4'
+    mandatory_parameters = mocked_get.call_args[0]
+    assert mandatory_parameters == ('http://test/api/rest/v6/agreements/'
+                                    'test_agreement_id/documents/test_doc_id',)
+    kwargs_parameters = mocked_get.call_args[1]
+    assert kwargs_parameters == {'headers': expected_headers,
+                                 'stream': True,
+                                 'timeout': 15}
+
+
+def test_download_document_client_or_server_error(mocker, adobe_sign_client,
+                                                  response_with_error):
+    response = response_with_error(500)
+    response.raw = io.BytesIO()
+    mocker.patch('requests.get', return_value=response)
+    with pytest.raises(AdobeSignException):
+        adobe_sign_client.download_document('test_agreement_id',
+                                            'test_doc_id', io.BytesIO())
+
+
+def test_post_mega_sign(mocker, adobe_sign_client, expected_headers):
+    mocked_post = mocker.patch('requests.post')
+    adobe_sign_client.post_mega_sign(
+        transient_document_id='doc_id',
+        name='Contract',
+        recipients_transient_document_id='csv_id',
+        send_mail=False,
+        extra_param='plop')
+
+    assert mocked_post.call_args[0] == ('http://test/api/rest/v6/megaSigns',)
+    assert mocked_post.call_args[1] == {
+        'headers': expected_headers,
+        'json': {
+            'fileInfos': [{'transientDocumentId': 'doc_id'}],
+            'name': 'Contract',
+            'childAgreementsInfo': {
+                'fileInfo': {'transientDocumentId': 'csv_id'}},
+            'signatureType': 'ESIGN',
+            'state': 'IN_PROCESS',
+            'emailOption': {'sendOptions': {'completionEmails': 'NONE',
+                                            'inFlightEmails': 'NONE',
+                                            'initEmails': 'NONE'}},
+            'extra_param': 'plop',
+        },
+        'timeout': 15
+    }
+
+
+def test_get_mega_sign_agreements(mocker, adobe_sign_client,
+                                  expected_headers):
+    mocked_get = mocker.patch('requests.get')
+    adobe_sign_client.get_mega_sign_agreements('mega_id', cursor='next')
+
+    assert mocked_get.call_args[0] == (
+        'http://test/api/rest/v6/megaSigns/mega_id/agreements',)
+    assert mocked_get.call_args[1] == {
+        'headers': expected_headers,
+        'params': {'pageSize': 100, 'cursor': 'next'},
+        'timeout': 15
+    }
+
+
+def test_upload_document_mime_type(mocker, adobe_sign_client, test_document):
+    mocked_post = mocker.patch('requests.post')
+    adobe_sign_client.upload_document(test_document, mime_type='text/csv')
+    assert mocked_post.call_args[1]['data']['Mime-Type'] == 'text/csv'
+
+
+def test_post_library_document(mocker, adobe_sign_client, expected_headers):
+    mocked_post = mocker.patch('requests.post')
+    adobe_sign_client.post_library_document('doc_id', 'Contract')
+
+    assert mocked_post.call_args[0] == (
+        'http://test/api/rest/v6/libraryDocuments',)
+    assert mocked_post.call_args[1] == {
+        'headers': expected_headers,
+        'json': {
+            'fileInfos': [{'transientDocumentId': 'doc_id'}],
+            'name': 'Contract',
+            'sharingMode': 'USER',
+            'state': 'ACTIVE',
+            'templateTypes': ['DOCUMENT'],
+        },
+        'timeout': 15
+    }
+
+
+def test_post_agreement_from_library_document(mocker, adobe_sign_client):
+    mocked_post = mocker.patch('requests.post')
+    adobe_sign_client.post_agreement(
+        transient_document_id=None, name='Contract', participants=[],
+        post_sign_redirect_url=None, post_sign_redirect_delay=0,
+        send_mail=True, library_document_id='library_id')
+    assert mocked_post.call_args[1]['json']['fileInfos'] == [
+        {'libraryDocumentId': 'library_id'}]
+
+
+def test_upload_document_above_spool_threshold(mocker, adobe_sign_client,
+                                               expected_headers,
+                                               test_document):
+    adobe_sign_client.spool_threshold = 4
+    test_document.bytes = io.BytesIO(b'%PDF-1.4')
+    bodies = []
+
+    def post(url, data, **kwargs):
+        bodies.append(data.read())
+        return mocker.Mock()
+
+    mocked_post = mocker.patch('requests.post', side_effect=post)
+    adobe_sign_client.upload_document(test_document)
+
+    kwargs_params = mocked_post.call_args[1]
+    content_type = kwargs_params['headers'].pop('Content-Type')
+    assert kwargs_params['headers'] == expected_headers
+    assert 'files' not in kwargs_params
+    boundary = content_type.split('boundary=')[1]
+    assert bodies == [
+        '--{0}\r\nContent-Disposition: form-data; name="File-Name"\r\n\r\n'
+        'test_document.pdf\r\n'
+        '--{0}\r\nContent-Disposition: form-data; name="Mime-Type"\r\n\r\n'
+        'application/pdf\r\n'
+        '--{0}\r\nContent-Disposition: form-data; name="File"; '
+        'filename="test_document.pdf"\r\n\r\n%PDF-1.4\r\n'
+        '--{0}--\r\n'.format(boundary).encode()]
+
+
+def test_spooled_documents_memory_is_bounded(mocker, stub_server,
+                                             tmp_path):
+    size = 4 * 1024 * 1024
+    content = b'%PDF' * (size // 4)
+    stub_server.add('agreements/a1/documents/d1', content)
+    stub_server.add('transientDocuments', {'transientDocumentId': 'doc_id'})
+    adobe_sign_client = AdobeSignClient(root_url=stub_server.root_url,
+                                        access_token='ThisIsAToken',
+                                        spool_threshold=256 * 1024)
+    path = tmp_path / 'document.pdf'
+    path.write_bytes(content)
+
+    def process(_):
+        with adobe_sign_client.get_document('a1', 'd1', spool=True) as fd:
+            assert get_content_size(fd) == size
+        with open(path, 'rb') as fd:
+            document = mocker.Mock(bytes=fd)
+            document.name = 'document.pdf'
+            return adobe_sign_client.upload_document(document)
+
+    tracemalloc.start()
+    try:
+        results = map_in_threads(process, range(8), max_workers=8)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert results == [{'transientDocumentId': 'doc_id'}] * 8
+    assert [upload_size > size for _, upload_size in stub_server.uploads] == \
+        [True] * 8
+    # 8 documents downloaded and uploaded at once, without holding them
+    assert peak < 2 * size
+
+
+def json_response(status_code, data, url='http://test'):
+    response = Response()
+    response.status_code = status_code
+    response._content = json.dumps(data).encode()
+    response.url = url
+    return response
+
+
+def test_root_url_is_discovered_and_cached(mocker):
+    cache = BaseUriCache(ttl=60)
+    mocked_get = mocker.patch('requests.get', side_effect=[
+        json_response(200, {'apiAccessPoint': 'https://api.eu1.test/'}),
+        json_response(200, {'events': []}),
+        json_response(200, {'events': []}),
+    ])
+    for _ in range(2):
+        adobe_sign_client = AdobeSignClient(root_url=None,
+                                            access_token='TestToken',
+                                            base_uri_cache=cache)
+        assert adobe_sign_client.get_events('a1') == {'events': []}
+    urls = [call[0][0] for call in mocked_get.call_args_list]
+    assert urls == [BASE_URIS_URL,
+                    'https://api.eu1.test/api/rest/v6/agreements/a1/events',
+                    'https://api.eu1.test/api/rest/v6/agreements/a1/events']
+
+
+def test_base_uri_cache_ttl(mocker):
+    clock = mocker.Mock(return_value=0)
+    cache = BaseUriCache(ttl=60, clock=clock)
+    cache.set('key', 'https://api.eu1.test')
+    clock.return_value = 59
+    assert cache.get('key') == 'https://api.eu1.test'
+    clock.return_value = 60
+    assert cache.get('key') is None
+
+
+def test_root_url_is_rediscovered_on_shard_error(mocker):
+    cache = BaseUriCache()
+    mocked_get = mocker.patch('requests.get', side_effect=[
+        json_response(200, {'apiAccessPoint': 'https://api.na1.test/'}),
+        json_response(400, {'code': 'INVALID_API_ACCESS_POINT',
+                            'message': 'Wrong shard'}),
+        json_response(200, {'apiAccessPoint': 'https://api.eu1.test/'}),
+        json_response(200, {'events': []}),
+    ])
+    adobe_sign_client = AdobeSignClient(root_url=None,
+                                        access_token='TestToken',
+                                        base_uri_cache=cache)
+    assert adobe_sign_client.get_events('a1') == {'events': []}
+    assert mocked_get.call_args[0] == (
+        'https://api.eu1.test/api/rest/v6/agreements/a1/events',)
+    assert adobe_sign_client.root_url == 'https://api.eu1.test'
+    assert cache.get(adobe_sign_client.get_base_uri_key()) == \
+        'https://api.eu1.test'
+
+
+def test_redirected_call_is_not_sent_again(mocker):
+    redirected = json_response(
+        200, {'id': 'webhook_id'},
+        url='https://api.eu1.test/api/rest/v6/webhooks')
+    redirected.history = [json_response(307, {})]
+    mocked_post = mocker.patch('requests.post', return_value=redirected)
+    mocked_get = mocker.patch('requests.get')
+    adobe_sign_client = AdobeSignClient(root_url='https://api.na1.test',
+                                        access_token='TestToken',
+                                        rediscover=True,
+                                        base_uri_cache=BaseUriCache())
+    assert adobe_sign_client.post_webhooks('a1', 'https://test/hook') == \
+        {'id': 'webhook_id'}
+    assert mocked_post.call_count == 1
+    assert not mocked_get.called
+    assert adobe_sign_client.root_url == 'https://api.eu1.test'
+
+
+def test_root_url_is_not_rediscovered_by_default(mocker):
+    mocked_get = mocker.patch('requests.get', return_value=json_response(
+        400, {'code': 'INVALID_API_ACCESS_POINT', 'message': 'Wrong shard'}))
+    adobe_sign_client = AdobeSignClient(root_url='https://api.na1.test',
+                                        access_token='TestToken')
+    with pytest.raises(AdobeSignException):
+        adobe_sign_client.get_events('a1')
+    assert mocked_get.call_count == 1
+
+
+def test_get_current_user(mocker, adobe_sign_client, expected_headers):
+    mocked_get = mocker.patch('requests.get')
+    mocked_get.return_value.json.return_value = {'id': 'u1',
+                                                 'accountId': 'acc1'}
+    assert adobe_sign_client.get_current_user() == {'id': 'u1',
+                                                    'accountId': 'acc1'}
+    assert adobe_sign_client.get_current_user()['id'] == 'u1'
+    mocked_get.assert_called_once_with(
+        'http://test/api/rest/v6/users/me', headers=expected_headers,
+        timeout=15)
+
+
+def test_get_agreement(mocker, adobe_sign_client, expected_headers):
+    mocked_get = mocker.patch('requests.get')
+    adobe_sign_client.get_agreement('test_agreement_id')
+    assert mocked_get.call_args[0] == (
+        'http://test/api/rest/v6/agreements/test_agreement_id',)
+    assert mocked_get.call_args[1] == {'headers': expected_headers,
+                                       'timeout': 15}
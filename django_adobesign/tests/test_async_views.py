@@ -0,0 +1,95 @@
+import asyncio
+
+import django
+import pytest
+
+if django.VERSION < (3, 1):  # pragma: no cover
+    pytest.skip('Async views require Django 3.1', allow_module_level=True)
+
+from asgiref.sync import async_to_sync  # noqa: E402
+
+from django_adobesign.async_views import AsyncSignerReturnView  # noqa: E402
+from django_adobesign.backend import AdobeSignBackend  # noqa: E402
+from django_adobesign.client import AdobeSignClient  # noqa: E402
+from django_adobesign.dispatch import INTERACTIVE, \
+    PriorityDispatcher  # noqa: E402
+from django_adobesign.tests.test_views import StatusSignerReturnView, \
+    get_view  # noqa: E402
+
+
+class AsyncStatusSignerReturnView(AsyncSignerReturnView,
+                                  StatusSignerReturnView):
+    def get_signer_signed_url(self, status):
+        # Url hooks may query the database
+        return '/signed/{}'.format(self.signature.signers.count())
+
+
+@pytest.mark.django_db
+def test_async_signer_signed(mocker, stub_server, signature):
+    stub_server.add('agreements/a1/members/participantSets/p1',
+                    {'status': 'WAITING_FOR_OTHERS'})
+    stub_server.add('agreements/a1/documents', {'documents': [{'id': 'd1'}]})
+    stub_server.add('agreements/a1/documents/d1', b'signed')
+    signature._signature_backend = AdobeSignBackend(
+        AdobeSignClient(root_url=stub_server.root_url, access_token='token'))
+    mocked_prefetch = mocker.patch.object(AdobeSignBackend,
+                                          'prefetch_next_signer_url')
+    view = get_view(AsyncStatusSignerReturnView, signature)
+
+    assert async_to_sync(view.get_redirect_url_async)() == '/signed/2'
+    signature.refresh_from_db()
+    assert signature.document_title == 'signed'
+    assert signature.signers.get(signing_order=1).current_status == \
+        'WAITING_FOR_OTHERS'
+    mocked_prefetch.assert_called_once_with('a1')
+
+    stub_server.add('agreements/a1/members/participantSets/p2',
+                    {'status': 'CANCELLED'})
+    assert async_to_sync(view.get_redirect_url_async)() == '/canceled'
+
+
+def test_async_signer_return_view_is_async():
+    view = AsyncStatusSignerReturnView.as_view()
+    assert asyncio.iscoroutinefunction(view)
+    assert view.view_class is AsyncStatusSignerReturnView
+
+
+@pytest.mark.django_db
+def test_async_calls_share_sync_client_features(mocker, stub_server,
+                                                signature):
+    # Calls to the wrong shard are sent again on the discovered one
+    stub_server.routes[
+        '/shard1/api/rest/v6/agreements/a1/members/participantSets/p1'] = (
+        400, {'code': 'INVALID_API_ACCESS_POINT', 'message': ''}, 0)
+    stub_server.add('agreements/a1/members/participantSets/p1',
+                    {'status': 'NOT_YET_VISIBLE'})
+    dispatcher = PriorityDispatcher(rate=10)
+    client = AdobeSignClient(root_url=stub_server.root_url + '/shard1',
+                             access_token='token', rediscover=True,
+                             dispatcher=dispatcher)
+    mocker.patch.object(client, 'discover_root_url',
+                        return_value=stub_server.root_url)
+    signature._signature_backend = AdobeSignBackend(client)
+    view = get_view(AsyncStatusSignerReturnView, signature)
+
+    assert async_to_sync(view.get_redirect_url_async)() == '/error'
+    assert client.root_url == stub_server.root_url
+    assert dispatcher.stats()[INTERACTIVE] == 2
+    assert signature.signers.get(signing_order=1).current_status == \
+        'NOT_YET_VISIBLE'
+
+
+class CancelledSignerReturnView(AsyncStatusSignerReturnView):
+    async def get_signer_status_async(self, signer):
+        return 'CANCELLED'
+
+
+@pytest.mark.django_db
+def test_async_view_status_hook(mocker, signature):
+    mocked_invalidate = mocker.patch.object(AdobeSignBackend,
+                                            'invalidate_next_signer_url')
+    view = get_view(CancelledSignerReturnView, signature)
+    assert async_to_sync(view.get_redirect_url_async)() == '/canceled'
+    signature.refresh_from_db()
+    assert signature.state == 'CANCELLED'
+    mocked_invalidate.assert_called_once_with('a1')
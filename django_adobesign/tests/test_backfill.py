@@ -0,0 +1,160 @@
+from io import StringIO
+
+import pytest
+from adobesign.models import Signature, SignatureType, Signer
+from django.core.management import call_command
+
+from django_adobesign import mirror
+from django_adobesign.client import AdobeSignClient
+from django_adobesign.exceptions import AdobeSignException, \
+    AdobeSignMaxApiRateLimitException
+from django_adobesign.models import Agreement, SyncCheckpoint
+from django_adobesign.ratelimit import RateLimiter, call_with_rate_limit
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture()
+def signatures():
+    signature_type = SignatureType.objects.create(
+        signature_backend_code='adobesign', access_token='token',
+        api_root_url='http://fake')
+    signatures = []
+    for index in range(3):
+        signature = Signature.objects.create(
+            signature_type=signature_type, document='doc.pdf',
+            document_title='doc', signature_backend_id='a{}'.format(index))
+        Signer.objects.create(signature=signature, full_name='Poney',
+                              email='poney@plop.com', signing_order=1,
+                              signature_backend_id='p{}'.format(index))
+        signatures.append(signature)
+    return signatures
+
+
+def mock_adobesign(mocker, fail=()):
+    def get_agreement(agreement_id):
+        if agreement_id in fail:
+            raise AdobeSignException('crash')
+        return {'id': agreement_id, 'name': 'doc', 'status': 'SIGNED'}
+
+    mocker.patch.object(AdobeSignClient, 'get_agreement',
+                        side_effect=get_agreement)
+    return mocker.patch.object(
+        AdobeSignClient, 'get_members',
+        side_effect=lambda agreement_id, **kwargs: {'participantSets': [
+            {'id': 'p' + agreement_id[1:], 'order': 1, 'status': 'COMPLETED',
+             'memberInfos': [{'email': 'poney@plop.com'}]}]})
+
+
+def test_rate_limiter():
+    clock = Clock()
+    rate_limiter = RateLimiter(rate=2, clock=clock, sleep=clock.sleep)
+    for _ in range(4):
+        rate_limiter.acquire()
+    # The burst of 2 calls is spent, then calls are spaced by 0.5s
+    assert clock.now == 1.
+    rate_limiter.pause(10)
+    rate_limiter.acquire()
+    assert clock.now == 11.
+
+
+def test_call_with_rate_limit_honors_retry_after(mocker):
+    clock = Clock()
+    rate_limiter = RateLimiter(rate=100, clock=clock, sleep=clock.sleep)
+    function = mocker.Mock(side_effect=[
+        AdobeSignMaxApiRateLimitException('slow down', retry_after=30),
+        'result'])
+    assert call_with_rate_limit(rate_limiter, function, 'a1') == 'result'
+    assert clock.now == 30.
+    assert function.call_count == 2
+
+
+@pytest.mark.django_db
+def test_backfill_refreshes_signatures(mocker, signatures):
+    mock_adobesign(mocker)
+    stdout = StringIO()
+    call_command('adobesign_backfill', workers=1, batch_size=2,
+                 stdout=stdout)
+    assert set(Signature.objects.values_list('state', flat=True)) == \
+        {'SIGNED'}
+    assert set(Signer.objects.values_list('current_status', flat=True)) == \
+        {'COMPLETED'}
+    assert Agreement.objects.get(agreement_id='a1').participant_sets.get(
+        ).status == 'COMPLETED'
+    output = stdout.getvalue()
+    assert '2/3 signatures, 0 failed' in output
+    assert '3/3 signatures, 0 failed' in output
+    assert 'ETA' in output
+    assert SyncCheckpoint.objects.get(name='backfill').cursor == ''
+
+
+@pytest.mark.django_db
+def test_backfill_resumes_from_checkpoint(mocker, signatures):
+    mocked_get_members = mock_adobesign(mocker, fail=('a1',))
+    SyncCheckpoint.objects.create(name='backfill',
+                                  cursor=str(signatures[0].pk))
+    stderr = StringIO()
+    call_command('adobesign_backfill', workers=1, stdout=StringIO(),
+                 stderr=stderr)
+    assert mocked_get_members.call_count == 1
+    assert 'a1' in stderr.getvalue()
+    assert Signature.objects.get(pk=signatures[0].pk).state == \
+        'DEMO_NOT_YET_SIGN'
+    assert Signature.objects.get(pk=signatures[2].pk).state == 'SIGNED'
+
+
+@pytest.mark.django_db
+def test_backfill_retries_failed_signatures(mocker, signatures):
+    mock_adobesign(mocker)
+    get_agreement = AdobeSignClient.get_agreement.side_effect
+    attempts = []
+
+    def flaky_get_agreement(agreement_id):
+        attempts.append(agreement_id)
+        if attempts.count(agreement_id) == 1 and agreement_id == 'a2':
+            raise AdobeSignException('outage')
+        return get_agreement(agreement_id)
+
+    AdobeSignClient.get_agreement.side_effect = flaky_get_agreement
+    # An interrupted run failed to refresh the first signature
+    SyncCheckpoint.objects.create(name='backfill',
+                                  cursor=str(signatures[0].pk),
+                                  failed=str(signatures[0].pk))
+    stdout = StringIO()
+    call_command('adobesign_backfill', workers=1, stdout=stdout,
+                 stderr=StringIO())
+    assert set(Signature.objects.values_list('state', flat=True)) == \
+        {'SIGNED'}
+    assert 'Refreshed 3 signatures, 0 failed' in stdout.getvalue()
+    checkpoint = SyncCheckpoint.objects.get(name='backfill')
+    assert checkpoint.cursor == checkpoint.failed == ''
+
+
+@pytest.mark.django_db
+def test_backfill_records_unexpected_errors(mocker, signatures):
+    mock_adobesign(mocker)
+    update_from_members = mirror.update_from_members
+
+    def unexpected_payload(agreement_id, members, **values):
+        if agreement_id == 'a1':
+            raise KeyError('participantSets')
+        return update_from_members(agreement_id, members, **values)
+
+    mocker.patch.object(mirror, 'update_from_members',
+                        side_effect=unexpected_payload)
+    stderr = StringIO()
+    call_command('adobesign_backfill', workers=1, stdout=StringIO(),
+                 stderr=stderr)
+    assert 'participantSets' in stderr.getvalue()
+    assert Signature.objects.get(pk=signatures[2].pk).state == 'SIGNED'
+    assert SyncCheckpoint.objects.get(name='backfill').failed == \
+        str(signatures[1].pk)
@@ -0,0 +1,97 @@
+import io
+import time
+
+import pytest
+
+from django_adobesign.backend import AdobeSignBackend
+from django_adobesign.client import AdobeSignClient
+from django_adobesign.concurrency import run_in_background
+from django_adobesign.deadline import deadline, get_remaining, get_timeout
+from django_adobesign.dispatch import PriorityDispatcher
+from django_adobesign.exceptions import AdobeSignDeadlineExceeded
+
+
+def test_timeout_is_capped_by_deadline():
+    assert get_timeout(15) == 15
+    with deadline(5):
+        assert 4 < get_timeout(15) <= 5
+        assert get_timeout(1) == 1
+        connect, read = get_timeout((3, 15))
+        assert connect == 3 and 4 < read <= 5
+        # A nested deadline does not extend the current one
+        with deadline(60):
+            assert get_remaining() <= 5
+        with deadline(None):
+            assert get_remaining() <= 5
+    assert get_remaining() is None
+
+    with deadline(0):
+        with pytest.raises(AdobeSignDeadlineExceeded):
+            get_timeout(15)
+
+
+def test_client_call_uses_remaining_time(mocker):
+    mocked_get = mocker.patch('requests.get')
+    client = AdobeSignClient(root_url='http://test', access_token='token')
+    with deadline(2):
+        client.get_events('a1')
+    assert mocked_get.call_args[1]['timeout'] <= 2
+
+    client.get_events('a1')
+    assert mocked_get.call_args[1]['timeout'] == 15
+
+
+def test_slow_operation_fails_fast(stub_server):
+    stub_server.add('agreements/a1/members/participantSets/p1',
+                    {'status': 'COMPLETED'}, delay=1)
+    backend = AdobeSignBackend(
+        AdobeSignClient(root_url=stub_server.root_url, access_token='token'),
+        deadline=0.2)
+    start = time.monotonic()
+    with pytest.raises(AdobeSignDeadlineExceeded):
+        backend.get_signer_status('a1', 'p1')
+    assert time.monotonic() - start < 0.9
+
+    # Calls are not sent once the deadline has passed
+    with deadline(0):
+        with pytest.raises(AdobeSignDeadlineExceeded):
+            backend.adobesign_client.get_signer('a1', 'p1')
+    assert len(stub_server.requests) == 1
+
+
+def test_background_work_is_not_bound_by_deadline():
+    with deadline(0.1):
+        future = run_in_background(get_remaining)
+    assert future.result(timeout=5) is None
+
+
+def test_quota_wait_fails_fast(mocker):
+    mocked_get = mocker.patch('requests.get')
+    dispatcher = PriorityDispatcher(rate=10)
+    client = AdobeSignClient(root_url='http://test', access_token='token',
+                             dispatcher=dispatcher)
+    # Rate limit error asking to retry after 30s
+    dispatcher.pause(30)
+    start = time.monotonic()
+    with deadline(2):
+        with pytest.raises(AdobeSignDeadlineExceeded):
+            client.get_events('a1')
+    assert time.monotonic() - start < 1
+    assert not mocked_get.called
+
+
+def test_streamed_download_is_bounded(stub_server):
+    stub_server.add('agreements/a1/documents/d1', b'x' * 1024)
+    client = AdobeSignClient(root_url=stub_server.root_url,
+                             access_token='token')
+    fileobj = io.BytesIO()
+
+    def write(chunk):
+        time.sleep(0.05)
+        return io.BytesIO.write(fileobj, chunk)
+
+    fileobj.write = write
+    with deadline(0.2):
+        with pytest.raises(AdobeSignDeadlineExceeded):
+            client.download_document('a1', 'd1', fileobj, chunk_size=64)
+    assert fileobj.tell() < 1024
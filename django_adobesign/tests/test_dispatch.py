@@ -0,0 +1,99 @@
+import threading
+import time
+
+from django_adobesign.client import AdobeSignClient
+from django_adobesign.dispatch import BACKGROUND, INTERACTIVE, \
+    PriorityDispatcher, get_priority, priority
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_priority_context():
+    assert get_priority() == INTERACTIVE
+    with priority(BACKGROUND):
+        assert get_priority() == BACKGROUND
+    assert get_priority() == INTERACTIVE
+
+
+def test_background_calls_leave_interactive_reserve():
+    clock = Clock()
+    dispatcher = PriorityDispatcher(rate=10, interactive_reserve=0.3,
+                                    clock=clock, sleep=clock.sleep)
+    for _ in range(7):
+        dispatcher.acquire(BACKGROUND)
+    assert clock.now == 0
+    # The reserve is left to interactive calls
+    for _ in range(3):
+        dispatcher.acquire(INTERACTIVE)
+    assert clock.now == 0
+    dispatcher.acquire(BACKGROUND)
+    assert clock.now > 0
+    assert dispatcher.stats() == {INTERACTIVE: 3, BACKGROUND: 8}
+
+
+def test_background_calls_fit_in_small_bursts():
+    clock = Clock()
+    dispatcher = PriorityDispatcher(rate=1, clock=clock, sleep=clock.sleep)
+    assert dispatcher.acquire(BACKGROUND, timeout=5)
+    assert dispatcher.acquire(BACKGROUND, timeout=5)
+    assert clock.now == 1.
+    # Calls of several tokens do not wait for the reserve either
+    dispatcher = PriorityDispatcher(rate=2, clock=clock, sleep=clock.sleep)
+    assert dispatcher.acquire(BACKGROUND, tokens=2, timeout=5)
+
+
+def test_interactive_calls_go_first():
+    dispatcher = PriorityDispatcher(rate=50, burst=1, interactive_reserve=0)
+    stop = threading.Event()
+
+    def background():
+        with priority(BACKGROUND):
+            while not stop.is_set():
+                dispatcher.acquire()
+
+    threads = [threading.Thread(target=background) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        time.sleep(0.1)
+        start = time.monotonic()
+        for _ in range(10):
+            dispatcher.acquire()
+        elapsed = time.monotonic() - start
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    # 10 calls at 50 calls per second, not slowed by background calls
+    assert elapsed < 0.4
+
+
+def test_client_calls_are_dispatched(mocker):
+    clock = Clock()
+    dispatcher = PriorityDispatcher(rate=10, clock=clock, sleep=clock.sleep)
+    adobe_sign_client = AdobeSignClient(root_url='http://test',
+                                        access_token='ThisIsAToken',
+                                        dispatcher=dispatcher)
+    mocked_get = mocker.patch('requests.get')
+    mocked_get.return_value.status_code = 200
+    adobe_sign_client.get_events('a1')
+    with priority(BACKGROUND):
+        adobe_sign_client.get_events('a1')
+    assert dispatcher.stats() == {INTERACTIVE: 1, BACKGROUND: 1}
+
+    # Rate limit errors pause all calls
+    mocked_get.return_value.status_code = 429
+    mocked_get.return_value.json.return_value = {
+        'code': 'THROTTLING_TOO_MANY_REQUESTS', 'retryAfter': 30}
+    adobe_sign_client.send('get', 'http://test')
+    adobe_sign_client.send('get', 'http://test')
+    assert clock.now == 30
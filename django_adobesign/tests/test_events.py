@@ -0,0 +1,83 @@
+import pytest
+
+from django_adobesign.client import AdobeSignClient
+from django_adobesign.events import AgreementEventStore
+
+
+class Clock(object):
+    now = 0.
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    return Clock()
+
+
+@pytest.fixture()
+def adobe_sign_client():
+    return AdobeSignClient(root_url='http://fake', access_token='token')
+
+
+def events(*types):
+    return {'events': [{'id': 'e{}'.format(index), 'type': event_type}
+                       for index, event_type in enumerate(types)]}
+
+
+def test_events_are_cached(mocker, adobe_sign_client, clock):
+    mocked_get_events = mocker.patch.object(
+        AdobeSignClient, 'get_events',
+        return_value=events('CREATED', 'ACTION_REQUESTED'))
+    store = AgreementEventStore(adobe_sign_client, ttl=60, clock=clock)
+
+    assert len(store.get_events('a1')) == 2
+    assert store.get_latest_event('a1', 'CREATED')['id'] == 'e0'
+    assert store.get_latest_event('a1', 'REJECTED') is None
+    assert mocked_get_events.call_count == 1
+
+    # New events are merged after the ttl
+    clock.now = 60
+    mocked_get_events.return_value = events('CREATED', 'ACTION_REQUESTED',
+                                            'ACTION_COMPLETED')
+    assert [event['id'] for event in
+            store.get_events_by_type('a1', 'ACTION_COMPLETED')] == ['e2']
+    assert len(store.get_events('a1')) == 3
+    assert mocked_get_events.call_count == 2
+
+    store.get_events('a1', refresh=True)
+    assert mocked_get_events.call_count == 3
+    store.invalidate('a1')
+    store.get_events('a1')
+    assert mocked_get_events.call_count == 4
+
+
+def test_terminated_agreement_is_not_fetched_again(mocker, adobe_sign_client,
+                                                   clock):
+    mocked_get_events = mocker.patch.object(
+        AdobeSignClient, 'get_events',
+        return_value=events('CREATED', 'REJECTED'))
+    store = AgreementEventStore(adobe_sign_client, ttl=60, clock=clock)
+    store.get_events('a1')
+    clock.now = 3600
+    assert store.get_latest_event('a1', 'REJECTED')['id'] == 'e1'
+    assert mocked_get_events.call_count == 1
+
+
+def test_least_recently_used_agreements_are_evicted(mocker,
+                                                    adobe_sign_client,
+                                                    clock):
+    mocked_get_events = mocker.patch.object(
+        AdobeSignClient, 'get_events', return_value=events('CREATED'))
+    store = AgreementEventStore(adobe_sign_client, max_agreements=2,
+                                clock=clock)
+    store.get_events('a1')
+    store.get_events('a2')
+    store.get_events('a1')
+    store.get_events('a3')
+    assert mocked_get_events.call_count == 3
+    store.get_events('a1')
+    assert mocked_get_events.call_count == 3
+    store.get_events('a2')
+    assert mocked_get_events.call_count == 4
@@ -0,0 +1,57 @@
+import threading
+import time
+
+import pytest
+
+from django_adobesign.client import AdobeSignClient
+from django_adobesign.hedging import Hedger
+
+
+def test_hedge_delay_follows_latency_percentile():
+    hedger = Hedger(min_samples=10, initial_delay=1., min_delay=0.05)
+    assert hedger.get_delay('get_signing_url') == 1.
+    for latency in range(1, 101):
+        hedger.record('get_signing_url', latency / 1000.)
+    assert hedger.get_delay('get_signing_url') == 0.096
+
+
+def test_only_idempotent_methods_are_hedged():
+    with pytest.raises(ValueError):
+        Hedger(methods=('post_agreement',))
+
+
+def test_slow_call_is_hedged(stub_server):
+    delays = iter([1, 0])
+    stub_server.add('agreements/a1/signingUrls', {'signingUrlSetInfos': []},
+                    delay=lambda: next(delays, 0))
+    hedger = Hedger(initial_delay=0.05)
+    adobe_sign_client = AdobeSignClient(root_url=stub_server.root_url,
+                                        access_token='ThisIsAToken',
+                                        hedger=hedger)
+    start = time.monotonic()
+    assert adobe_sign_client.get_signing_url('a1') == {
+        'signingUrlSetInfos': []}
+    assert time.monotonic() - start < 0.5
+    # Fast calls are not hedged
+    adobe_sign_client.get_signing_url('a1')
+    assert hedger.stats() == {'get_signing_url': {
+        'calls': 2, 'hedged': 1, 'hedge_wins': 1}}
+
+
+def test_queued_calls_are_not_hedged(stub_server):
+    stub_server.add('agreements/a1/signingUrls', {'signingUrlSetInfos': []},
+                    delay=0.05)
+    hedger = Hedger(initial_delay=0.1, max_workers=2)
+    adobe_sign_client = AdobeSignClient(root_url=stub_server.root_url,
+                                        access_token='ThisIsAToken',
+                                        hedger=hedger)
+    # 8 calls of 50ms on 2 workers: most of them wait more than the delay
+    # in the queue
+    threads = [threading.Thread(target=adobe_sign_client.get_signing_url,
+                                args=('a1',)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert hedger.stats() == {'get_signing_url': {
+        'calls': 8, 'hedged': 0, 'hedge_wins': 0}}
@@ -0,0 +1,102 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from django_adobesign import mirror
+from django_adobesign.client import AdobeSignClient
+from django_adobesign.models import Agreement, ParticipantSet
+from django_adobesign.webhooks import WebhookEventApplier
+
+
+def participant_set(participant_set_id, email, order, status):
+    return {'id': participant_set_id,
+            'memberInfos': [{'email': email, 'name': 'Poney'}],
+            'order': order,
+            'role': 'SIGNER',
+            'status': status}
+
+
+@pytest.mark.django_db
+def test_refresh_agreement(mocker, adobe_sign_backend):
+    mocker.patch.object(
+        AdobeSignClient, 'get_members',
+        return_value={'participantSets': [
+            participant_set('p2', 'pouet@plop.com', 2, 'NOT_YET_VISIBLE'),
+            participant_set('p1', 'Poney@plop.com', 1,
+                            'WAITING_FOR_MY_SIGNATURE')]})
+    mirror.refresh_agreement(adobe_sign_backend, 'a1')
+
+    assert [p.participant_set_id
+            for p in mirror.get_participant_sets('a1')] == ['p1', 'p2']
+    assert mirror.get_next_participant_set('a1').email == 'poney@plop.com'
+    assert [p.agreement.agreement_id for p in
+            mirror.get_participant_sets_for_email('PONEY@plop.com')] == \
+        ['a1']
+
+    # Refresh updates existing rows
+    mocker.patch.object(
+        AdobeSignClient, 'get_members',
+        return_value={'participantSets': [
+            participant_set('p2', 'pouet@plop.com', 2,
+                            'WAITING_FOR_MY_SIGNATURE'),
+            participant_set('p1', 'Poney@plop.com', 1, 'COMPLETED')]})
+    mirror.refresh_agreement(adobe_sign_backend, 'a1')
+    assert ParticipantSet.objects.count() == 2
+    assert mirror.get_next_participant_set('a1').participant_set_id == 'p2'
+
+
+@pytest.mark.django_db
+def test_update_from_event():
+    mirror.update_from_event({
+        'event': 'AGREEMENT_CREATED',
+        'agreement': {
+            'id': 'a1', 'name': 'Contract', 'status': 'OUT_FOR_SIGNATURE',
+            'participantSetsInfo': {'participantSets': [
+                participant_set('p1', 'poney@plop.com', 1,
+                                'WAITING_FOR_MY_SIGNATURE')]}}})
+    agreement = Agreement.objects.get()
+    assert (agreement.name, agreement.status) == ('Contract',
+                                                  'OUT_FOR_SIGNATURE')
+    assert list(mirror.get_agreements_by_status('OUT_FOR_SIGNATURE')) == \
+        [agreement]
+    assert agreement.participant_sets.get().status == \
+        'WAITING_FOR_MY_SIGNATURE'
+    assert mirror.update_from_event({'event': 'PING'}) is None
+
+
+class MirrorEventApplier(WebhookEventApplier):
+    update_mirror = True
+
+
+@pytest.mark.django_db
+def test_webhook_event_applier_updates_mirror():
+    mirror.update_agreement('a1', participant_sets=[
+        participant_set('p1', 'poney@plop.com', 1,
+                        'WAITING_FOR_MY_SIGNATURE')])
+    applier = MirrorEventApplier(max_delay=None)
+    applier.add({'agreement': {
+        'id': 'a1', 'status': 'SIGNED',
+        'participantSetsInfo': {'participantSets': [
+            {'id': 'p1', 'status': 'COMPLETED'}]}}})
+    applier.add({'agreement': {'id': 'a2', 'status': 'OUT_FOR_SIGNATURE'}})
+    applier.flush()
+
+    assert dict(Agreement.objects.values_list('agreement_id', 'status')) == \
+        {'a1': 'SIGNED', 'a2': 'OUT_FOR_SIGNATURE'}
+    assert ParticipantSet.objects.get().status == 'COMPLETED'
+
+
+@pytest.mark.django_db
+def test_mirror_lookups_do_not_call_adobe(mocker):
+    mocked_get = mocker.patch('requests.get')
+    for index in range(20):
+        mirror.update_agreement('a{}'.format(index), participant_sets=[
+            participant_set('p{}'.format(index), 'poney@plop.com', 1,
+                            'WAITING_FOR_MY_SIGNATURE')])
+    with CaptureQueriesContext(connection) as queries:
+        participant_sets = list(
+            mirror.get_participant_sets_for_email('poney@plop.com'))
+        [p.agreement.agreement_id for p in participant_sets]
+    assert len(participant_sets) == 20
+    assert len(queries) == 1
+    assert not mocked_get.called
@@ -0,0 +1,133 @@
+import pytest
+
+from django_adobesign.client import AdobeSignClient
+from django_adobesign.poller import AgreementStatusPoller, RequestBudget
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 1696586400.  # 2023-10-06T10:00:00Z
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    return Clock()
+
+
+def listing(*agreements, next_cursor=None):
+    return {
+        'userAgreementList': [
+            {'id': agreement_id, 'status': status, 'displayDate': date}
+            for agreement_id, status, date in agreements],
+        'page': {'nextCursor': next_cursor} if next_cursor else {},
+    }
+
+
+def test_request_budget():
+    budget = RequestBudget(2)
+    assert budget.consume()
+    assert budget.consume()
+    assert not budget.consume()
+
+
+def test_poll_fetches_changed_agreements_only(mocker, adobe_sign_backend,
+                                              clock):
+    mocked_get_agreements = mocker.patch.object(
+        AdobeSignClient, 'get_agreements',
+        return_value=listing(('a1', 'OUT_FOR_SIGNATURE',
+                              '2023-10-06T09:00:00Z'),
+                             ('a2', 'OUT_FOR_SIGNATURE',
+                              '2023-10-06T08:00:00Z')))
+    mocked_get_members = mocker.patch.object(
+        AdobeSignClient, 'get_members', return_value={'participantSets': []})
+    poller = AgreementStatusPoller(adobe_sign_backend, min_interval=60,
+                                   clock=clock)
+    poller.track('a1')
+    poller.track('a2')
+
+    assert set(poller.poll()) == {'a1', 'a2'}
+    assert mocked_get_members.call_count == 2
+
+    # Nothing is due before the poll interval
+    assert poller.poll() == {}
+    assert mocked_get_agreements.call_count == 1
+
+    clock.now += 60
+    mocked_get_agreements.return_value = listing(
+        ('a1', 'SIGNED', '2023-10-06T10:00:30Z'),
+        ('a2', 'OUT_FOR_SIGNATURE', '2023-10-06T08:00:00Z'))
+    assert set(poller.poll()) == {'a1'}
+    assert mocked_get_members.call_count == 3
+    # Signed agreement is not polled anymore
+    assert set(poller.states) == {'a2'}
+
+
+def test_poll_backs_off_idle_agreements(mocker, adobe_sign_backend, clock):
+    mocker.patch.object(
+        AdobeSignClient, 'get_agreements',
+        return_value=listing(('a1', 'OUT_FOR_SIGNATURE',
+                              '2023-10-06T09:00:00Z')))
+    mocker.patch.object(AdobeSignClient, 'get_members', return_value={})
+    poller = AgreementStatusPoller(adobe_sign_backend, min_interval=60,
+                                   clock=clock)
+    poller.track('a1', created_at=clock.now)
+    poller.poll()
+    intervals = []
+    for _ in range(3):
+        clock.now = poller.states['a1'].next_poll_at
+        before = clock.now
+        poller.poll()
+        intervals.append(poller.states['a1'].next_poll_at - before)
+    assert intervals[0] < intervals[1] < intervals[2]
+
+
+def test_poll_stops_paging_at_agreements_older_than_last_check(
+        mocker, adobe_sign_backend, clock):
+    mocked_get_agreements = mocker.patch.object(
+        AdobeSignClient, 'get_agreements',
+        return_value=listing(('a1', 'OUT_FOR_SIGNATURE',
+                              '2023-10-06T09:00:00Z'),
+                             next_cursor='next'))
+    mocker.patch.object(AdobeSignClient, 'get_members', return_value={})
+    poller = AgreementStatusPoller(adobe_sign_backend, min_interval=60,
+                                   clock=clock)
+    poller.track('a2')
+    # a2 is not listed on the first page, the whole listing is walked
+    mocked_get_agreements.side_effect = [
+        listing(('a1', 'OUT_FOR_SIGNATURE', '2023-10-06T09:00:00Z'),
+                next_cursor='next'),
+        listing(('a2', 'OUT_FOR_SIGNATURE', '2023-10-06T08:00:00Z'))]
+    assert set(poller.poll()) == {'a2'}
+    assert mocked_get_agreements.call_count == 2
+
+    # Then the listing stops at agreements older than the last check
+    clock.now += 3600
+    mocked_get_agreements.side_effect = None
+    assert poller.poll() == {}
+    assert mocked_get_agreements.call_count == 3
+    assert poller.states['a2'].idle_polls == 1
+
+
+def test_poll_respects_request_budget(mocker, adobe_sign_backend, clock):
+    mocker.patch.object(
+        AdobeSignClient, 'get_agreements',
+        return_value=listing(('a1', 'OUT_FOR_SIGNATURE',
+                              '2023-10-06T09:00:00Z'),
+                             ('a2', 'OUT_FOR_SIGNATURE',
+                              '2023-10-06T09:00:00Z')))
+    mocked_get_members = mocker.patch.object(AdobeSignClient, 'get_members',
+                                             return_value={})
+    poller = AgreementStatusPoller(adobe_sign_backend, request_budget=2,
+                                   clock=clock)
+    poller.track('a1')
+    poller.track('a2')
+
+    assert len(poller.poll()) == 1
+    assert mocked_get_members.call_count == 1
+    # The agreement left aside is still due
+    assert len(poller.get_due_agreements(clock.now)) == 1
+    assert len(poller.poll()) == 1
+    assert mocked_get_members.call_count == 2
@@ -0,0 +1,68 @@
+from django_adobesign.dispatch import PriorityDispatcher
+from django_adobesign.pool import AdobeSignClientPool
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+
+def test_client_is_reused_per_tenant():
+    pool = AdobeSignClientPool()
+    client = pool.get_client('http://test/', 'token', api_user='user')
+    assert pool.get_client('http://test', 'token', api_user='user') is client
+    assert pool.get_client('http://test', 'token') is not client
+    assert pool.get_client('http://test', 'other_token',
+                           api_user='user') is not client
+    assert client.session is not None
+    assert pool.stats() == {'size': 3, 'hits': 1, 'misses': 3,
+                            'evictions': 0}
+
+
+def test_least_recently_used_client_is_evicted(mocker):
+    pool = AdobeSignClientPool(max_clients=2)
+    client1 = pool.get_client('http://test', 'token1')
+    close = mocker.patch.object(client1.session, 'close')
+    client2 = pool.get_client('http://test', 'token2')
+    pool.get_client('http://test', 'token1')
+    pool.get_client('http://test', 'token3')
+    # client2 was the least recently used
+    assert pool.get_client('http://test', 'token1') is client1
+    assert pool.get_client('http://test', 'token2') is not client2
+    assert not close.called
+    assert pool.stats()['evictions'] == 2
+
+
+def test_idle_client_is_evicted(mocker):
+    clock = Clock()
+    pool = AdobeSignClientPool(max_idle=60, clock=clock)
+    client = pool.get_client('http://test', 'token1')
+    close = mocker.patch.object(client.session, 'close')
+    clock.now = 30
+    pool.get_client('http://test', 'token2')
+    clock.now = 61
+    pool.get_client('http://test', 'token2')
+    assert close.called
+    assert pool.stats()['size'] == 1
+
+
+def test_pooled_client_reuses_connections(stub_server):
+    stub_server.add('agreements/a1/events', {'events': []})
+    pool = AdobeSignClientPool()
+    client = pool.get_client(stub_server.root_url, 'token')
+    for _ in range(3):
+        assert client.get_events('a1') == {'events': []}
+    assert stub_server.connections == 1
+
+
+def test_client_dispatcher_per_tenant():
+    pool = AdobeSignClientPool(
+        create_dispatcher=lambda: PriorityDispatcher(rate=5))
+    client1 = pool.get_client('http://test', 'token1')
+    client2 = pool.get_client('http://test', 'token2')
+    assert client1.dispatcher is not client2.dispatcher
+    assert pool.get_client('http://test', 'token1').dispatcher is \
+        client1.dispatcher
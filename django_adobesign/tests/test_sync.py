@@ -0,0 +1,101 @@
+import pytest
+
+from django_adobesign.client import AdobeSignClient
+from django_adobesign.models import Agreement, SyncCheckpoint
+from django_adobesign.sync import AgreementSync
+
+
+def listing(*agreements, next_cursor=None):
+    return {
+        'userAgreementList': [
+            {'id': agreement_id, 'name': agreement_id, 'status': status,
+             'displayDate': date}
+            for agreement_id, status, date in agreements],
+        'page': {'nextCursor': next_cursor} if next_cursor else {},
+    }
+
+
+@pytest.mark.django_db
+def test_sync_upserts_agreements_changed_since_last_run(mocker,
+                                                        adobe_sign_backend):
+    mocked_get_agreements = mocker.patch.object(
+        AdobeSignClient, 'get_agreements',
+        side_effect=[
+            listing(('a3', 'OUT_FOR_SIGNATURE', '2023-10-06T12:00:00Z'),
+                    ('a2', 'SIGNED', '2023-10-06T11:00:00Z'),
+                    next_cursor='page2'),
+            listing(('a1', 'CANCELLED', '2023-10-06T10:00:00Z')),
+        ])
+    sync = AgreementSync(adobe_sign_backend)
+    assert sync.run() == 3
+    assert Agreement.objects.count() == 3
+    assert Agreement.objects.get(agreement_id='a2').status == 'SIGNED'
+    checkpoint = SyncCheckpoint.objects.get(name='agreements')
+    assert checkpoint.cursor == ''
+    assert checkpoint.watermark.isoformat() == '2023-10-06T12:00:00+00:00'
+
+    # Next run stops at the first agreement already synchronized
+    mocked_get_agreements.side_effect = [
+        listing(('a3', 'SIGNED', '2023-10-06T13:00:00Z'),
+                ('a2', 'SIGNED', '2023-10-06T11:00:00Z'),
+                next_cursor='page2'),
+    ]
+    assert sync.run() == 1
+    assert mocked_get_agreements.call_count == 3
+    assert Agreement.objects.get(agreement_id='a3').status == 'SIGNED'
+    assert Agreement.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_sync_resumes_from_checkpoint(mocker, adobe_sign_backend):
+    mocked_get_agreements = mocker.patch.object(
+        AdobeSignClient, 'get_agreements',
+        side_effect=[
+            listing(('a2', 'SIGNED', '2023-10-06T11:00:00Z'),
+                    next_cursor='page2'),
+            Exception('crash'),
+        ])
+    sync = AgreementSync(adobe_sign_backend, page_size=1)
+    with pytest.raises(Exception):
+        sync.run()
+    checkpoint = SyncCheckpoint.objects.get(name='agreements')
+    assert checkpoint.cursor == 'page2'
+    assert checkpoint.watermark is None
+
+    mocked_get_agreements.side_effect = [
+        listing(('a1', 'OUT_FOR_SIGNATURE', '2023-10-06T10:00:00Z')),
+    ]
+    assert sync.run() == 1
+    assert mocked_get_agreements.call_args[0] == (1, 'page2')
+    checkpoint.refresh_from_db()
+    assert checkpoint.cursor == ''
+    assert checkpoint.watermark.isoformat() == '2023-10-06T11:00:00+00:00'
+    assert set(Agreement.objects.values_list('agreement_id', flat=True)) == \
+        {'a1', 'a2'}
+
+
+@pytest.mark.django_db
+def test_sync_max_pages(mocker, adobe_sign_backend):
+    mocker.patch.object(
+        AdobeSignClient, 'get_agreements',
+        return_value=listing(('a1', 'SIGNED', '2023-10-06T11:00:00Z'),
+                             next_cursor='page2'))
+    assert AgreementSync(adobe_sign_backend).run(max_pages=1) == 1
+    assert SyncCheckpoint.objects.get().cursor == 'page2'
+
+
+@pytest.mark.django_db
+def test_sync_refresh_participants(mocker, adobe_sign_backend):
+    mocker.patch.object(
+        AdobeSignClient, 'get_agreements',
+        return_value=listing(('a1', 'OUT_FOR_SIGNATURE',
+                              '2023-10-06T11:00:00Z')))
+    mocker.patch.object(
+        AdobeSignClient, 'get_members',
+        return_value={'participantSets': [
+            {'id': 'p1', 'memberInfos': [{'email': 'poney@plop.com'}],
+             'order': 1, 'status': 'WAITING_FOR_MY_SIGNATURE'}]})
+    AgreementSync(adobe_sign_backend, refresh_participants=True).run()
+    agreement = Agreement.objects.get()
+    assert agreement.status == 'OUT_FOR_SIGNATURE'
+    assert agreement.participant_sets.get().participant_set_id == 'p1'
@@ -0,0 +1,83 @@
+import pytest
+
+from django_adobesign import tracing
+from django_adobesign.backend import AdobeSignBackend
+from django_adobesign.client import AdobeSignClient
+
+sdk_trace = pytest.importorskip('opentelemetry.sdk.trace')
+in_memory_span_exporter = pytest.importorskip(
+    'opentelemetry.sdk.trace.export.in_memory_span_exporter')
+export = pytest.importorskip('opentelemetry.sdk.trace.export')
+
+
+@pytest.fixture()
+def exporter(mocker):
+    exporter = in_memory_span_exporter.InMemorySpanExporter()
+    provider = sdk_trace.TracerProvider()
+    provider.add_span_processor(export.SimpleSpanProcessor(exporter))
+    mocker.patch.object(tracing, 'tracer', provider.get_tracer('test'))
+    return exporter
+
+
+def get_spans(exporter):
+    return {span.name: span for span in exporter.get_finished_spans()}
+
+
+def test_no_span_without_tracer(mocker):
+    mocker.patch.object(tracing, 'tracer', None)
+    with tracing.start_span('test', agreement_id='a1') as span:
+        assert span is tracing.NOOP_SPAN
+        assert not span.is_recording()
+
+
+def test_client_call_span(exporter, mocker):
+    mocked_put = mocker.patch('requests.put')
+    mocked_put.return_value.status_code = 200
+    mocked_put.return_value.headers = {'Content-Length': '42'}
+    client = AdobeSignClient(root_url='http://test',
+                             access_token='ThisIsAToken')
+    client.update_signer('a1', 'p1', {'email': 'poney@plop.com'})
+
+    span = get_spans(exporter)['adobesign.http']
+    assert dict(span.attributes) == {
+        'adobesign.method': 'PUT',
+        'adobesign.endpoint': 'agreements/{id}/members/participantSets/{id}',
+        'adobesign.agreement_id': 'a1',
+        'adobesign.request_size': 27,
+        'adobesign.status_code': 200,
+        'adobesign.response_size': 42,
+    }
+
+
+def test_backend_operation_span(exporter, stub_server):
+    stub_server.add('agreements/a1/members', {'participantSets': []})
+    stub_server.add('agreements/a1/signingUrls', {'signingUrlSetInfos': []})
+    stub_server.add('agreements/a1/events', {'events': []})
+    stub_server.add('agreements/a1/documents', {'documents': []})
+    backend = AdobeSignBackend(AdobeSignClient(
+        root_url=stub_server.root_url, access_token='ThisIsAToken'))
+    backend.get_agreement_snapshot('a1')
+
+    spans = exporter.get_finished_spans()
+    operation = get_spans(exporter)['adobesign.get_agreement_snapshot']
+    assert operation.attributes['adobesign.agreement_id'] == 'a1'
+    http_spans = [span for span in spans if span.name == 'adobesign.http']
+    assert sorted(span.attributes['adobesign.endpoint']
+                  for span in http_spans) == [
+        'agreements/{id}/documents', 'agreements/{id}/events',
+        'agreements/{id}/members', 'agreements/{id}/signingUrls']
+    # Calls made by worker threads belong to the operation trace
+    assert {span.context.trace_id for span in spans} == \
+        {operation.context.trace_id}
+
+
+def test_signer_status_span(exporter, mocker):
+    mocker.patch.object(AdobeSignClient, 'get_signer',
+                        return_value={'status': 'COMPLETED'})
+    backend = AdobeSignBackend(AdobeSignClient(
+        root_url='http://test', access_token='ThisIsAToken'))
+    assert backend.get_signer_status('a1', 'p1') == 'COMPLETED'
+
+    spans = get_spans(exporter)
+    for name in ('adobesign.get_signer_status', 'adobesign.get_signer'):
+        assert spans[name].attributes['adobesign.agreement_id'] == 'a1'
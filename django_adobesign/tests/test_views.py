@@ -0,0 +1,134 @@
+import pytest
+from django.db import connection
+from django.db.models import Q
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from django_adobesign.backend import AdobeSignBackend
+from django_adobesign.concurrency import run_in_background
+from django_adobesign.views import SignerReturnView
+
+
+class StatusSignerReturnView(SignerReturnView):
+    def replace_document(self, signed_document):
+        self.signature.document_title = signed_document.decode()
+        self.signature.save()
+
+    def update_signer(self, signer, status, message=''):
+        signer.current_status = status
+        signer.save()
+
+    def update_signature(self, status):
+        self.signature.state = status
+        self.signature.save()
+
+    def get_signer_signed_url(self, status):
+        return '/signed'
+
+    def get_signer_error_url(self, message=''):
+        return '/error'
+
+    def get_signer_canceled_url(self, status):
+        return '/canceled'
+
+    def has_already_signed(self, signer):
+        return signer.current_status in ('COMPLETED', 'WAITING_FOR_OTHERS')
+
+
+def get_view(view_class, signature, **initkwargs):
+    view = view_class(**initkwargs)
+    view.request = RequestFactory().get('/')
+    view.kwargs = {'pk': signature.pk}
+    view._signature = signature
+    view._backend = signature._signature_backend
+    return view
+
+
+@pytest.mark.django_db
+def test_signer_signed(mocker, signature):
+    mocker.patch.object(AdobeSignBackend, 'get_signer_status',
+                        return_value='WAITING_FOR_OTHERS')
+    mocker.patch.object(AdobeSignBackend, 'get_documents',
+                        return_value=iter([b'signed']))
+    mocked_prefetch = mocker.patch.object(AdobeSignBackend,
+                                          'prefetch_next_signer_url')
+    view = get_view(StatusSignerReturnView, signature)
+    assert view.get_redirect_url() == '/signed'
+    signature.refresh_from_db()
+    assert signature.document_title == 'signed'
+    assert signature.signers.get(signing_order=1).current_status == \
+        'WAITING_FOR_OTHERS'
+    # The next signer url is warmed up
+    mocked_prefetch.assert_called_once_with('a1')
+
+
+@pytest.mark.django_db
+def test_signer_cancelled_invalidates_next_signer_url(mocker, signature):
+    mocker.patch.object(AdobeSignBackend, 'get_signer_status',
+                        return_value='CANCELLED')
+    mocked_invalidate = mocker.patch.object(AdobeSignBackend,
+                                            'invalidate_next_signer_url')
+    view = get_view(StatusSignerReturnView, signature)
+    assert view.get_redirect_url() == '/canceled'
+    mocked_invalidate.assert_called_once_with('a1')
+
+
+@pytest.mark.django_db
+def test_signer_signed_deferred(mocker, signature):
+    mocker.patch.object(AdobeSignBackend, 'get_signer_status',
+                        return_value='WAITING_FOR_OTHERS')
+    mocked_get_documents = mocker.patch.object(
+        AdobeSignBackend, 'get_documents', return_value=iter([b'signed']))
+    mocked_run_in_background = mocker.patch.object(
+        StatusSignerReturnView, 'run_in_background')
+    mocked_replaced = mocker.patch.object(StatusSignerReturnView,
+                                          'signed_document_replaced')
+    view = get_view(StatusSignerReturnView, signature,
+                    defer_signed_document=True)
+
+    assert view.get_redirect_url() == '/signed'
+    # Status is recorded, download is left to the background
+    signer = signature.signers.get(signing_order=1)
+    assert signer.current_status == 'WAITING_FOR_OTHERS'
+    assert not mocked_get_documents.called
+
+    function, status, task_signer = mocked_run_in_background.call_args[0]
+    function(status, task_signer)
+    signature.refresh_from_db()
+    assert signature.document_title == 'signed'
+    mocked_replaced.assert_called_once_with('WAITING_FOR_OTHERS', signer)
+
+
+def test_run_in_background():
+    future = run_in_background(sum, [1, 2])
+    assert future.result(timeout=5) == 3
+
+    future = run_in_background(int, 'not a number')
+    with pytest.raises(ValueError):
+        future.result(timeout=5)
+
+
+class QuerySignerReturnView(StatusSignerReturnView):
+    def has_already_signed(self, signer):
+        raise AssertionError('Signers should not be checked one by one')
+
+    def get_already_signed_filter(self):
+        return Q(current_status__in=('COMPLETED', 'WAITING_FOR_OTHERS'))
+
+
+@pytest.mark.django_db
+def test_get_current_signer(signature):
+    view = get_view(StatusSignerReturnView, signature)
+    query_view = get_view(QuerySignerReturnView, signature)
+    assert view.get_current_signer().signing_order == 1
+
+    signature.signers.filter(signing_order=1).update(
+        current_status='WAITING_FOR_OTHERS')
+    with CaptureQueriesContext(connection) as queries:
+        assert query_view.get_current_signer().signing_order == 2
+    assert len(queries) == 1
+    assert view.get_current_signer().signing_order == 2
+
+    signature.signers.update(current_status='COMPLETED')
+    assert query_view.get_current_signer() is None
+    assert view.get_current_signer() is None
@@ -0,0 +1,273 @@
+import base64
+import json
+
+import pytest
+from adobesign.models import Signer, Signature, SignatureType
+from django.db import connection
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from django_adobesign.backend import get_signing_url_cache_key
+from django_adobesign.views import WebhookView
+from django_adobesign.webhooks import WebhookEventApplier, \
+    WebhookEventCounter, \
+    get_event_participant_sets, \
+    get_event_signed_document
+
+
+class StatusEventApplier(WebhookEventApplier):
+    signature_update_fields = ['state']
+    signer_update_fields = ['current_status']
+
+    def set_signature_status(self, signature, status):
+        signature.state = status
+
+    def set_signer_status(self, signer, status):
+        signer.current_status = status
+
+
+def make_event(agreement_id, status, participants=(),
+               event_date='2023-10-06T10:00:00Z'):
+    agreement = {'id': agreement_id, 'status': status}
+    if participants:
+        agreement['participantSetsInfo'] = {'participantSets': [
+            {'id': participant_id, 'status': participant_status}
+            for participant_id, participant_status in participants]}
+    return {'event': 'AGREEMENT_ACTION_COMPLETED',
+            'eventDate': event_date,
+            'agreement': agreement}
+
+
+def make_signatures(count, signers=2):
+    signature_type = SignatureType.objects.create()
+    for index in range(count):
+        signature = Signature.objects.create(
+            signature_type=signature_type,
+            signature_backend_id='agreement-{}'.format(index))
+        for order in range(1, signers + 1):
+            Signer.objects.create(
+                signature=signature, signing_order=order,
+                full_name='Poney', email='poney@plop.com',
+                signature_backend_id='participant-{}-{}'.format(index,
+                                                                order))
+
+
+@pytest.mark.django_db
+def test_flush_applies_latest_transitions():
+    make_signatures(1)
+    applier = StatusEventApplier(max_delay=None)
+    applier.add(make_event('agreement-0', 'SIGNED',
+                           [('participant-0-1', 'COMPLETED'),
+                            ('participant-0-2', 'COMPLETED')],
+                           event_date='2023-10-06T12:00:00Z'))
+    # Late delivery of an older event is superseded
+    applier.add(make_event('agreement-0', 'OUT_FOR_SIGNATURE',
+                           [('participant-0-2', 'WAITING_FOR_MY_SIGNATURE')],
+                           event_date='2023-10-06T11:00:00Z'))
+    assert Signature.objects.get().state == 'DEMO_NOT_YET_SIGN'
+
+    assert applier.flush() == 2
+    assert Signature.objects.get().state == 'SIGNED'
+    assert set(Signer.objects.values_list('current_status', flat=True)) == \
+        {'COMPLETED'}
+    assert applier.flush() == 0
+
+
+@pytest.mark.django_db
+def test_add_flushes_when_buffer_is_full():
+    make_signatures(1)
+    applier = StatusEventApplier(max_events=2, max_delay=None)
+    applier.add(make_event('agreement-0', 'OUT_FOR_SIGNATURE'))
+    assert Signature.objects.get().state == 'DEMO_NOT_YET_SIGN'
+    applier.add(make_event('agreement-0', 'SIGNED'))
+    assert Signature.objects.get().state == 'SIGNED'
+
+
+@pytest.mark.django_db
+def test_unknown_agreement_is_ignored():
+    make_signatures(1)
+    applier = StatusEventApplier(max_delay=None)
+    applier.apply_event(make_event('unknown', 'SIGNED',
+                                   [('participant-0-1', 'COMPLETED')]))
+    applier.apply_event({'event': 'AGREEMENT_CREATED'})
+    assert Signature.objects.get().state == 'DEMO_NOT_YET_SIGN'
+    assert not Signer.objects.filter(current_status='COMPLETED').exists()
+
+
+@pytest.mark.django_db
+def test_buffered_throughput_against_per_event_processing():
+    agreements = 50
+    make_signatures(agreements)
+    events = [make_event('agreement-{}'.format(index % agreements), status,
+                         [('participant-{}-1'.format(index % agreements),
+                           'COMPLETED')])
+              for index, status in enumerate(
+                  ['OUT_FOR_SIGNATURE'] * agreements +
+                  ['SIGNED'] * agreements)]
+    applier = StatusEventApplier(max_events=len(events), max_delay=None)
+
+    with CaptureQueriesContext(connection) as per_event_queries:
+        for event in events:
+            applier.apply_event(event)
+
+    with CaptureQueriesContext(connection) as buffered_queries:
+        for event in events:
+            applier.add(event)
+
+    # Per-event processing issues queries for each event, buffered
+    # processing a constant number of queries per flush.
+    assert len(per_event_queries) >= 4 * len(events)
+    assert len(buffered_queries) <= 8
+    assert set(Signature.objects.values_list('state', flat=True)) == \
+        {'SIGNED'}
+
+
+class ApplierWebhookView(WebhookView):
+    client_id = 'client'
+    event_applier = StatusEventApplier(max_delay=None)
+
+
+def test_webhook_view_verification():
+    request = RequestFactory().get('/webhook',
+                                   HTTP_X_ADOBESIGN_CLIENTID='client')
+    response = ApplierWebhookView.as_view()(request)
+    assert response.status_code == 200
+    assert response['X-AdobeSign-ClientId'] == 'client'
+    assert json.loads(response.content) == {'xAdobeSignClientId': 'client'}
+
+
+def test_webhook_view_rejects_missing_client_id():
+    request = RequestFactory().post('/webhook', data='{}',
+                                    content_type='application/json')
+    response = ApplierWebhookView.as_view()(request)
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_webhook_view_rejects_wrong_client_id():
+    make_signatures(1)
+    event = make_event('agreement-0', 'SIGNED',
+                       [('participant-0-1', 'COMPLETED')])
+    request = RequestFactory().post('/webhook', data=json.dumps(event),
+                                    content_type='application/json',
+                                    HTTP_X_ADOBESIGN_CLIENTID='attacker')
+    response = ApplierWebhookView.as_view()(request)
+    ApplierWebhookView.event_applier.flush()
+    assert response.status_code == 403
+    assert Signature.objects.get().state != 'SIGNED'
+    assert not Signer.objects.filter(current_status='COMPLETED').exists()
+
+
+def test_webhook_view_requires_client_id():
+    request = RequestFactory().get('/webhook',
+                                   HTTP_X_ADOBESIGN_CLIENTID='client')
+    with pytest.raises(ImproperlyConfigured):
+        WebhookView.as_view(event_applier=StatusEventApplier())(request)
+
+
+def test_webhook_view_buffers_event(mocker):
+    mocked_add = mocker.patch.object(StatusEventApplier, 'add')
+    event = make_event('agreement-0', 'SIGNED')
+    request = RequestFactory().post('/webhook', data=json.dumps(event),
+                                    content_type='application/json',
+                                    HTTP_X_ADOBESIGN_CLIENTID='client')
+    response = ApplierWebhookView.as_view()(request)
+    assert response.status_code == 200
+    mocked_add.assert_called_once_with(event)
+
+
+def test_webhook_view_invalid_payload():
+    request = RequestFactory().post('/webhook', data='not json',
+                                    content_type='application/json',
+                                    HTTP_X_ADOBESIGN_CLIENTID='client')
+    response = ApplierWebhookView.as_view()(request)
+    assert response.status_code == 400
+
+
+def test_event_payload_helpers():
+    event = make_event('agreement-0', 'SIGNED',
+                       [('participant-0-1', 'COMPLETED')])
+    event['agreement']['signedDocumentInfo'] = {
+        'document': base64.b64encode(b'%PDF').decode()}
+
+    assert get_event_participant_sets(event) == [
+        {'id': 'participant-0-1', 'status': 'COMPLETED'}]
+    assert get_event_signed_document(event) == b'%PDF'
+
+    minimal_event = make_event('agreement-0', 'SIGNED')
+    assert get_event_participant_sets(minimal_event) is None
+    assert get_event_signed_document(minimal_event) is None
+
+
+def test_webhook_view_signed_document(mocker):
+    mocker.patch.object(StatusEventApplier, 'add')
+    mocked_received = mocker.patch.object(ApplierWebhookView,
+                                          'signed_document_received')
+    event = make_event('agreement-0', 'SIGNED')
+    event['agreement']['signedDocumentInfo'] = {
+        'document': base64.b64encode(b'%PDF').decode()}
+    request = RequestFactory().post('/webhook', data=json.dumps(event),
+                                    content_type='application/json',
+                                    HTTP_X_ADOBESIGN_CLIENTID='client')
+    ApplierWebhookView.as_view()(request)
+    mocked_received.assert_called_once_with('agreement-0', b'%PDF')
+
+
+def test_webhook_view_unhandled_signed_document(mocker):
+    mocked_add = mocker.patch.object(StatusEventApplier, 'add')
+    mocker.patch.object(ApplierWebhookView, 'event_counter',
+                        WebhookEventCounter())
+    event = make_event('agreement-0', 'SIGNED')
+    event['agreement']['signedDocumentInfo'] = {
+        'document': base64.b64encode(b'%PDF').decode()}
+    request = RequestFactory().post('/webhook', data=json.dumps(event),
+                                    content_type='application/json',
+                                    HTTP_X_ADOBESIGN_CLIENTID='client')
+    response = ApplierWebhookView.as_view()(request)
+    # Not acknowledged, so that AdobeSign delivers it again
+    assert response.status_code == 503
+    assert not mocked_add.called
+    assert ApplierWebhookView.event_counter.stats()['handled'] == 0
+
+
+def test_webhook_view_invalidates_next_signer_url(mocker):
+    mocker.patch.object(StatusEventApplier, 'add')
+    cache = caches['default']
+    cache.set(get_signing_url_cache_key('agreement-0'),
+              ('poney@plop.com', 'https://sign'))
+    event = make_event('agreement-0', 'OUT_FOR_SIGNATURE',
+                       [('participant-0-1', 'COMPLETED')])
+    request = RequestFactory().post('/webhook', data=json.dumps(event),
+                                    content_type='application/json',
+                                    HTTP_X_ADOBESIGN_CLIENTID='client')
+    ApplierWebhookView.as_view(signing_url_cache='default')(request)
+    assert cache.get(get_signing_url_cache_key('agreement-0')) is None
+
+
+class CompletionWebhookView(ApplierWebhookView):
+    handled_events = ('AGREEMENT_WORKFLOW_COMPLETED',)
+    event_counter = WebhookEventCounter()
+
+
+def test_webhook_view_drops_unhandled_events(mocker):
+    mocked_add = mocker.patch.object(StatusEventApplier, 'add')
+    for event_type in ('AGREEMENT_EMAIL_VIEWED',
+                       'AGREEMENT_WORKFLOW_COMPLETED',
+                       'AGREEMENT_EMAIL_VIEWED'):
+        event = make_event('agreement-0', 'SIGNED')
+        event['event'] = event_type
+        request = RequestFactory().post('/webhook', data=json.dumps(event),
+                                        content_type='application/json',
+                                        HTTP_X_ADOBESIGN_CLIENTID='client')
+        response = CompletionWebhookView.as_view()(request)
+        assert response.status_code == 200
+
+    assert mocked_add.call_count == 1
+    assert CompletionWebhookView.event_counter.stats() == {
+        'handled': 1,
+        'dropped': 2,
+        'handled_by_type': {'AGREEMENT_WORKFLOW_COMPLETED': 1},
+        'dropped_by_type': {'AGREEMENT_EMAIL_VIEWED': 2},
+    }
@@ -0,0 +1,74 @@
+"""Optional OpenTelemetry tracing of AdobeSign calls.
+
+Spans are recorded when ``opentelemetry-api`` is installed and a tracer
+provider is configured, they cost nothing otherwise.
+
+"""
+from contextlib import contextmanager
+from functools import wraps
+from inspect import signature
+
+try:
+    from opentelemetry import trace
+except ImportError:  # pragma: no cover
+    trace = None
+
+#: Prefix of span names and attributes
+PREFIX = 'adobesign'
+
+tracer = trace.get_tracer(__name__) if trace is not None else None
+
+
+class NoopSpan(object):
+    """Span used without opentelemetry."""
+
+    def is_recording(self):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+@contextmanager
+def start_span(name, **attributes):
+    """Start a span named ``adobesign.<name>`` with ``attributes``,
+    ``None`` values are skipped."""
+    if tracer is None:
+        yield NOOP_SPAN
+        return
+    with tracer.start_as_current_span('{}.{}'.format(PREFIX, name)) as span:
+        if span.is_recording():
+            for key, value in attributes.items():
+                if value is not None:
+                    span.set_attribute('{}.{}'.format(PREFIX, key), value)
+        yield span
+
+
+def set_span_attribute(key, value):
+    """Set attribute ``adobesign.<key>`` on the current span."""
+    if trace is None or value is None:
+        return
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.set_attribute('{}.{}'.format(PREFIX, key), value)
+
+
+def traced(function):
+    """Run ``function`` in a span named after it, with its
+    ``agreement_id`` argument as attribute."""
+    parameters = list(signature(function).parameters)
+    index = parameters.index('agreement_id') \
+        if 'agreement_id' in parameters else None
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        agreement_id = kwargs.get('agreement_id')
+        if index is not None and index < len(args):
+            agreement_id = args[index]
+        with start_span(function.__name__, agreement_id=agreement_id):
+            return function(*args, **kwargs)
+
+    return wrapper
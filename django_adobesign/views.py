@@ -1,17 +1,52 @@
 from __future__ import unicode_literals
 
+import hmac
+import json
+import logging
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
 from django.db import transaction
-from django.views.generic.base import RedirectView
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+from django.views.generic.base import RedirectView, View
 from django.views.generic.detail import SingleObjectMixin
 from django_anysign import api as django_anysign
 
+from django_adobesign.backend import get_signing_url_cache_key
+from django_adobesign.concurrency import run_in_background
+from django_adobesign.deadline import deadline
 from django_adobesign.exceptions import AdobeSignException
+from django_adobesign.webhooks import WebhookEventCounter, \
+    get_event_agreement, get_event_signed_document
+
+logger = logging.getLogger(__name__)
 
 
 class SignerReturnView(SingleObjectMixin, RedirectView):
     """Handle return of signer on project after document signing/reject.
+
+    With :attr:`defer_signed_document`, the signer is redirected as soon as
+    its status is recorded, the signed document is downloaded and replaced
+    in the background, see :meth:`run_in_background`.
+
+    With :attr:`spool_signed_document`, :meth:`replace_document` receives
+    the signed document as a file object spooled to disk above the client
+    ``spool_threshold``, instead of its content.
+
+    :attr:`deadline` bounds, in seconds, the AdobeSign calls made before the
+    signer is redirected.
     """
     permanent = False
+    defer_signed_document = False
+    spool_signed_document = False
+    deadline = None
+
+    def get(self, request, *args, **kwargs):
+        with deadline(self.deadline):
+            return super(SignerReturnView, self).get(request, *args,
+                                                     **kwargs)
 
     def get_redirect_url(self, *args, **kwargs):
         """Route request to signer return view depending on status.
@@ -40,6 +75,7 @@ class SignerReturnView(SingleObjectMixin, RedirectView):
         if status == 'WAITING_FOR_MY_SIGNATURE':
             return self.get_signer_error_url('User mismatch')
         if status == 'CANCELLED':
+            self.next_signer_changed(status)
             self.signer_cancelled(signer, status)
             return self.get_signer_canceled_url(status)
 
@@ -48,21 +84,48 @@ class SignerReturnView(SingleObjectMixin, RedirectView):
                 raise AdobeSignException('Consistency issue, agreement {} '
                                          'is complete, remaining signers have '
                                          'been found'.format(agreement_id))
+            self.next_signer_changed(status)
             self.signer_signed(status, signer)
             self.update_signature(status)
             return self.get_signer_signed_url(status)
         if status == 'WAITING_FOR_OTHERS':
+            self.next_signer_changed(status)
             self.signer_signed(status, signer)
             return self.get_signer_signed_url(status)
 
         self.update_signer(signer, status)
         return self.get_signer_error_url()
 
+    def next_signer_changed(self, status):
+        """Refresh the cached next signer url once the current signer acted
+        with ``status``."""
+        agreement_id = self.signature.signature_backend_id
+        if status == 'WAITING_FOR_OTHERS':
+            # The cached url was the one of this signer
+            self.backend.prefetch_next_signer_url(agreement_id)
+        else:
+            self.backend.invalidate_next_signer_url(agreement_id)
+
     def get_current_signer(self):
-        for signer in self.signature.signers.all().order_by('signing_order'):
+        """Return the first signer, in signing order, who has not signed yet.
+
+        Uses a single query when :meth:`get_already_signed_filter` is
+        implemented, else calls :meth:`has_already_signed` on each signer.
+
+        """
+        signers = self.signature.signers.all().order_by('signing_order')
+        already_signed = self.get_already_signed_filter()
+        if already_signed is not None:
+            return signers.exclude(already_signed).first()
+        for signer in signers:
             if not self.has_already_signed(signer):
                 return signer
 
+    def get_already_signed_filter(self):
+        """Return a ``Q`` object matching signers who already signed, or
+        ``None`` to use :meth:`has_already_signed`."""
+        return None
+
     def get_queryset(self):
         model = django_anysign.get_signature_model()
         return model.objects.all()
@@ -70,7 +133,8 @@ class SignerReturnView(SingleObjectMixin, RedirectView):
     def get_signed_document(self):
         # In our model, there is only one doc.
         return next(
-            self.backend.get_documents(self.signature.signature_backend_id))
+            self.backend.get_documents(self.signature.signature_backend_id,
+                                       spool=self.spool_signed_document))
 
     def signer_cancelled(self, signer,  status):
         """Handle 'Cancel' status for signer."""
@@ -80,12 +144,41 @@ class SignerReturnView(SingleObjectMixin, RedirectView):
     def signer_signed(self, status, signer):
         """ Update signer status after he sign
         """
+        if self.defer_signed_document:
+            self.update_signer(signer, status)
+            self.run_in_background(self.retrieve_signed_document, status,
+                                   signer)
+            return
         # download signed document out of the atomic block
-        signed_document = self.get_signed_document()
+        self.save_signed_document(self.get_signed_document(), status, signer)
+
+    def save_signed_document(self, signed_document, status, signer):
+        """Replace the document by ``signed_document`` and update
+        ``signer``."""
         with transaction.atomic():
             self.replace_document(signed_document)
             self.update_signer(signer, status)
 
+    def retrieve_signed_document(self, status, signer):
+        """Download signed document and replace the original one."""
+        signed_document = self.get_signed_document()
+        with transaction.atomic():
+            self.replace_document(signed_document)
+        self.signed_document_replaced(status, signer)
+
+    def run_in_background(self, function, *args):
+        """Run ``function`` after the response.
+
+        Default implementation uses a process-wide thread pool. Override it
+        to use a task queue.
+
+        """
+        return run_in_background(function, *args)
+
+    def signed_document_replaced(self, status, signer):
+        """Called once the signed document replaced the original one in
+        background."""
+
     @property
     def signature(self):
         """Signature model instance.
@@ -135,3 +228,110 @@ class SignerReturnView(SingleObjectMixin, RedirectView):
     def replace_document(self, signed_document):
         """Replace original document by signed one."""
         raise NotImplementedError()
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class WebhookView(View):
+    """Receive AdobeSign webhook notifications.
+
+    AdobeSign checks the webhook url with a ``X-AdobeSign-ClientId`` header
+    that must be echoed back, on verification requests and on every
+    notification. Requests whose header is not :attr:`client_id`, the id of
+    the AdobeSign application which registered the webhook, are rejected
+    with a 403 error; :attr:`client_id` (or :meth:`get_client_id`) is
+    required.
+
+    Notifications are passed to :meth:`handle_event`, which by default
+    buffers them in :attr:`event_applier`, a
+    :class:`~django_adobesign.webhooks.WebhookEventApplier` instance shared by
+    all requests. When the webhook was registered with
+    ``include_signed_documents``, the signed document is passed to
+    :meth:`signed_document_received` instead of being downloaded again,
+    which must then be implemented. A notification which cannot be handled is
+    answered with a 503 error, so that AdobeSign delivers it again.
+
+    Events whose type is not in :attr:`handled_events` (all events if
+    ``None``) are acknowledged and dropped. Handled and dropped events are
+    counted in :attr:`event_counter`.
+
+    :attr:`signing_url_cache` is the alias of the backends
+    ``signing_url_cache``: handled events remove the cached next signer url
+    of their agreement, which may have changed.
+
+    """
+    client_id = None
+    event_applier = None
+    handled_events = None
+    signing_url_cache = None
+    event_counter = WebhookEventCounter()
+
+    def get(self, request, *args, **kwargs):
+        """Answer AdobeSign webhook url verification."""
+        return self.get_verification_response()
+
+    def post(self, request, *args, **kwargs):
+        response = self.get_verification_response()
+        if response.status_code != 200:
+            return response
+        try:
+            event = json.loads(request.body.decode('utf-8'))
+        except ValueError:
+            return HttpResponseBadRequest('Invalid JSON payload')
+        event_type = event.get('event')
+        handled = self.is_handled_event(event_type)
+        if handled:
+            try:
+                self.handle_event(event)
+            except Exception:
+                logger.exception('Unable to handle AdobeSign webhook event')
+                return HttpResponse(status=503)
+        self.event_counter.count(event_type, handled)
+        return response
+
+    def is_handled_event(self, event_type):
+        return self.handled_events is None or \
+            event_type in self.handled_events
+
+    def get_verification_response(self):
+        client_id = self.request.headers.get('X-AdobeSign-ClientId')
+        if not client_id or not self.is_valid_client_id(client_id):
+            return HttpResponse(status=403)
+        response = JsonResponse({'xAdobeSignClientId': client_id})
+        response['X-AdobeSign-ClientId'] = client_id
+        return response
+
+    def get_client_id(self):
+        """Return the id of our AdobeSign application."""
+        if not self.client_id:
+            raise ImproperlyConfigured(
+                '{} requires client_id'.format(type(self).__name__))
+        return self.client_id
+
+    def is_valid_client_id(self, client_id):
+        """Return True if ``client_id`` is the id of our AdobeSign
+        application."""
+        return hmac.compare_digest(client_id.encode('utf-8'),
+                                   self.get_client_id().encode('utf-8'))
+
+    def get_event_applier(self):
+        if self.event_applier is None:
+            raise NotImplementedError()
+        return self.event_applier
+
+    def handle_event(self, event):
+        """Handle webhook ``event`` payload."""
+        agreement_id = get_event_agreement(event).get('id')
+        if self.signing_url_cache and agreement_id:
+            caches[self.signing_url_cache].delete(
+                get_signing_url_cache_key(agreement_id))
+        signed_document = get_event_signed_document(event)
+        if signed_document is not None:
+            self.signed_document_received(
+                get_event_agreement(event)['id'], signed_document)
+        self.get_event_applier().add(event)
+
+    def signed_document_received(self, agreement_id, signed_document):
+        """Store ``signed_document`` content of agreement
+        ``agreement_id``, required when the webhook includes signed
+        documents."""
+        raise NotImplementedError()
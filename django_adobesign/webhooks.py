@@ -0,0 +1,240 @@
+"""Application of AdobeSign webhook events to signature models."""
+import base64
+import binascii
+import logging
+import threading
+from collections import Counter, OrderedDict
+
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+from django_anysign import api as django_anysign
+
+logger = logging.getLogger(__name__)
+
+
+def get_event_agreement(event):
+    """Return the agreement payload of a webhook ``event``."""
+    return event.get('agreement') or {}
+
+
+def get_event_participant_sets(event):
+    """Return participant sets embedded in ``event``, ``None`` if the webhook
+    does not include participant info."""
+    participants = get_event_agreement(event).get('participantSetsInfo')
+    if participants is None:
+        return None
+    return participants.get('participantSets', [])
+
+
+def get_event_signed_document(event):
+    """Return signed document content embedded in ``event``, ``None`` if
+    the webhook does not include signed documents."""
+    signed_document = get_event_agreement(event).get('signedDocumentInfo')
+    if not signed_document or not signed_document.get('document'):
+        return None
+    try:
+        return base64.b64decode(signed_document['document'])
+    except (TypeError, binascii.Error):
+        logger.warning('Invalid signed document in AdobeSign webhook event')
+        return None
+
+
+def get_event_timestamp(event):
+    """Return ``eventDate`` of ``event`` as a timestamp, 0 if unknown."""
+    try:
+        return parse_datetime(event['eventDate']).timestamp()
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return 0.
+
+
+class WebhookEventCounter(object):
+    """Thread-safe counters of handled and dropped webhook events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.handled = Counter()
+            self.dropped = Counter()
+
+    def count(self, event_type, handled):
+        with self._lock:
+            (self.handled if handled else self.dropped)[event_type] += 1
+
+    def stats(self):
+        """Return totals and per event type counts."""
+        with self._lock:
+            return {
+                'handled': sum(self.handled.values()),
+                'dropped': sum(self.dropped.values()),
+                'handled_by_type': dict(self.handled),
+                'dropped_by_type': dict(self.dropped),
+            }
+
+
+class WebhookEventApplier(object):
+    """Apply AdobeSign webhook events to Signature and Signer rows.
+
+    Events are buffered and grouped per agreement. Status transitions
+    superseded by a more recent event of the same agreement (or participant
+    set) are collapsed, so only the latest status is written. Buffered events
+    are written with ``bulk_update`` in one transaction when
+    :attr:`max_events` events are pending or :attr:`max_delay` seconds after
+    the first pending event.
+
+    Buffering trades durability for throughput: events acknowledged to
+    AdobeSign but not yet flushed are lost if the process dies. Call
+    :meth:`flush` on shutdown.
+
+    Subclasses implement :meth:`set_signature_status` and
+    :meth:`set_signer_status` and list the model fields they change in
+    :attr:`signature_update_fields` and :attr:`signer_update_fields`.
+
+    With :attr:`update_mirror`, statuses are also written to the local
+    mirror (see :mod:`django_adobesign.mirror`).
+
+    """
+    signature_update_fields = ()
+    signer_update_fields = ()
+    update_mirror = False
+
+    def __init__(self, max_events=500, max_delay=1., batch_size=None):
+        self.max_events = max_events
+        self.max_delay = max_delay
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()
+        self._pending_events = 0
+        self._sequence = 0
+        self._timer = None
+
+    def get_event_transitions(self, event):
+        """Yield ``(agreement_id, participant_set_id, status)`` for ``event``.
+
+        ``participant_set_id`` is ``None`` for the agreement status.
+        Participant statuses are only available when the webhook payload
+        includes participant info.
+
+        """
+        agreement = get_event_agreement(event)
+        agreement_id = agreement.get('id')
+        if not agreement_id:
+            return
+        if agreement.get('status'):
+            yield agreement_id, None, agreement['status']
+        for participant_set in get_event_participant_sets(event) or []:
+            if participant_set.get('id') and participant_set.get('status'):
+                yield (agreement_id, participant_set['id'],
+                       participant_set['status'])
+
+    def add(self, event):
+        """Buffer ``event``, flush if the buffer is full."""
+        timestamp = get_event_timestamp(event)
+        with self._lock:
+            self._sequence += 1
+            self._buffer(self._pending, event, (timestamp, self._sequence))
+            self._pending_events += 1
+            full = self._pending_events >= self.max_events
+            if not full and self._timer is None and self.max_delay:
+                self._timer = threading.Timer(self.max_delay,
+                                              self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def _buffer(self, pending, event, order):
+        for agreement_id, participant_set_id, status in \
+                self.get_event_transitions(event):
+            statuses = pending.setdefault(agreement_id, {})
+            current = statuses.get(participant_set_id)
+            # Keep the most recent transition only
+            if current is None or current[0] <= order:
+                statuses[participant_set_id] = (order, status)
+
+    def _flush_on_timer(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Unable to apply AdobeSign webhook events')
+        finally:
+            connection.close()
+
+    def flush(self):
+        """Write buffered transitions, return the number of events applied."""
+        with self._lock:
+            pending, self._pending = self._pending, OrderedDict()
+            count, self._pending_events = self._pending_events, 0
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if pending:
+            self.apply(pending)
+        return count
+
+    def apply_event(self, event):
+        """Write ``event`` immediately, without buffering."""
+        pending = OrderedDict()
+        self._buffer(pending, event, (get_event_timestamp(event), 0))
+        if pending:
+            self.apply(pending)
+
+    def apply(self, pending):
+        """Write ``pending`` transitions in one transaction.
+
+        ``pending`` maps agreement ids to ``{participant_set_id: (order,
+        status)}`` dictionaries.
+
+        """
+        signature_model = django_anysign.get_signature_model()
+        signer_model = django_anysign.get_signer_model()
+        agreement_ids = [agreement_id
+                         for agreement_id, statuses in pending.items()
+                         if None in statuses]
+        participants = {(agreement_id, participant_set_id): status
+                        for agreement_id, statuses in pending.items()
+                        for participant_set_id, (_, status)
+                        in statuses.items()
+                        if participant_set_id is not None}
+        with transaction.atomic():
+            if self.update_mirror:
+                from django_adobesign.mirror import update_statuses
+                update_statuses(pending)
+            if agreement_ids:
+                signatures = list(signature_model.objects.filter(
+                    signature_backend_id__in=agreement_ids))
+                for signature in signatures:
+                    self.set_signature_status(
+                        signature,
+                        pending[signature.signature_backend_id][None][1])
+                if signatures and self.signature_update_fields:
+                    signature_model.objects.bulk_update(
+                        signatures, self.signature_update_fields,
+                        batch_size=self.batch_size)
+            if participants:
+                signers = []
+                for signer in signer_model.objects.filter(
+                        signature__signature_backend_id__in=pending.keys(),
+                        signature_backend_id__in={
+                            key[1] for key in participants}
+                ).select_related('signature'):
+                    status = participants.get(
+                        (signer.signature.signature_backend_id,
+                         signer.signature_backend_id))
+                    if status is not None:
+                        self.set_signer_status(signer, status)
+                        signers.append(signer)
+                if signers and self.signer_update_fields:
+                    signer_model.objects.bulk_update(
+                        signers, self.signer_update_fields,
+                        batch_size=self.batch_size)
+
+    def set_signature_status(self, signature, status):
+        """Set ``status`` on ``signature``, without saving it."""
+        raise NotImplementedError()
+
+    def set_signer_status(self, signer, status):
+        """Set ``status`` on ``signer``, without saving it."""
+        raise NotImplementedError()
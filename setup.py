@@ -20,6 +20,11 @@ REQUIREMENTS = [
     'requests_oauthlib<1.2.0'
 ]
 
+EXTRAS_REQUIREMENTS = {
+    'async': ['httpx>=0.20'],
+    'tracing': ['opentelemetry-api'],
+}
+
 if __name__ == '__main__':  # Do not run setup() when we import this module.
     setup(
         name='django-adobesign',
@@ -44,4 +49,5 @@ if __name__ == '__main__':  # Do not run setup() when we import this module.
         include_package_data=True,
         zip_safe=True,
         install_requires=REQUIREMENTS,
+        extras_require=EXTRAS_REQUIREMENTS,
     )